@@ -1,26 +1,102 @@
 import heapq
+import mmap as mmap_module
+import os
+import pickle
+import struct
+import sys
 import time
 import random
-from typing import List, Tuple, Optional
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from multiprocessing import shared_memory
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Union
+
+# Наибольший вес ребра, при котором shortest_path выбирает алгоритм Дейкстры
+# с корзинами (Dial); см. run_dial_benchmark
+DIAL_MAX_WEIGHT = 1000
+
+
+def is_small_integer_weight(weight: float) -> bool:
+    """Целый вес из диапазона [0, DIAL_MAX_WEIGHT]."""
+    if isinstance(weight, float):
+        if not weight.is_integer():
+            return False
+    elif not isinstance(weight, int):
+        return False
+    return 0 <= weight <= DIAL_MAX_WEIGHT
+
 
 class Graph:
     def __init__(self):
         self._vertices = set()
         self._edges = {}  # vertex -> {adjacent_vertex: weight}
+        self._csr = None  # замороженный CSR-снимок, см. freeze()
+        self._version = 0  # растёт при каждом изменении графа
+        self._non_integer_edges = 0  # рёбра, вес которых не подходит для Dial
+        self._weight_counts = {}  # вес -> число рёбер с этим весом
+
+    def _changed(self) -> None:
+        self._version += 1
+        self._csr = None
+
+    def _count_weight(self, weight: float, delta: int) -> None:
+        count = self._weight_counts.get(weight, 0) + delta
+        if count:
+            self._weight_counts[weight] = count
+        else:
+            del self._weight_counts[weight]
+        if not is_small_integer_weight(weight):
+            self._non_integer_edges += delta
+
+    def get_version(self) -> int:
+        return self._version
 
     def add_vertex(self, v: int) -> None:
         self._vertices.add(v)
         if v not in self._edges:
             self._edges[v] = {}
+            self._changed()
 
     def has_vertex(self, v: int) -> bool:
         return v in self._vertices
 
     def add_edge(self, u: int, v: int, weight: float = 1.0) -> None:
-        self.add_vertex(u)
-        self.add_vertex(v)
-        self._edges[u][v] = weight
-        self._edges[v][u] = weight
+        self._put_edge(u, v, weight)
+        self._changed()
+
+    def add_edges(self, edges: Iterable[tuple]) -> None:
+        """
+        Добавляет рёбра (u, v) или (u, v, weight) за один проход;
+        версия графа меняется один раз на всю пачку (и не меняется для
+        пустой). Если пачка оборвалась на ошибке, уже добавленные рёбра
+        остаются, а версия всё равно меняется.
+        """
+        changed = False
+        try:
+            for edge in edges:
+                changed = True
+                self._put_edge(*edge)
+        finally:
+            if changed:
+                self._changed()
+
+    def _put_edge(self, u: int, v: int, weight: float = 1.0) -> None:
+        edges = self._edges
+        if u not in edges:
+            self._vertices.add(u)
+            edges[u] = {}
+        if v not in edges:
+            self._vertices.add(v)
+            edges[v] = {}
+        adj = edges[u]
+        if v in adj:
+            self._count_weight(adj[v], -1)
+        self._count_weight(weight, 1)
+        adj[v] = weight
+        edges[v][u] = weight
 
     def has_edge(self, u: int, v: int) -> bool:
         return u in self._edges and v in self._edges[u]
@@ -45,28 +121,362 @@ class Graph:
         return sorted(edges)
 
     def remove_vertex(self, v: int) -> None:
+        if self._drop_vertex(v):
+            self._changed()
+
+    def remove_vertices(self, vertices: Iterable[int]) -> None:
+        """Удаляет вершины пачкой; отсутствующие вершины пропускаются."""
+        changed = False
+        try:
+            for v in vertices:
+                changed |= self._drop_vertex(v)
+        finally:
+            if changed:
+                self._changed()
+
+    def _drop_vertex(self, v: int) -> bool:
         if v not in self._vertices:
-            return
+            return False
         self._vertices.remove(v)
-        if v in self._edges:
-            del self._edges[v]
-        # Remove v from all other vertices' adjacency lists
-        for vertex in list(self._edges.keys()):
-            if v in self._edges[vertex]:
-                del self._edges[vertex][v]
+        # Граф неориентированный: v есть только в списках своих соседей,
+        # поэтому обходим смежность v, а не все вершины графа
+        adj = self._edges.pop(v)
+        for u, weight in adj.items():
+            self._count_weight(weight, -1)
+            if u != v:
+                del self._edges[u][v]
+        return True
 
     def remove_edge(self, u: int, v: int) -> None:
-        if self.has_edge(u, v):
-            del self._edges[u][v]
+        if self._drop_edge(u, v):
+            self._changed()
+
+    def remove_edges(self, edges: Iterable[tuple]) -> None:
+        """Удаляет рёбра (u, v) пачкой; отсутствующие рёбра пропускаются."""
+        changed = False
+        try:
+            for edge in edges:
+                changed |= self._drop_edge(edge[0], edge[1])
+        finally:
+            if changed:
+                self._changed()
+
+    def _drop_edge(self, u: int, v: int) -> bool:
+        if not self.has_edge(u, v):
+            return False
+        self._count_weight(self._edges[u][v], -1)
+        del self._edges[u][v]
+        if u != v:
             del self._edges[v][u]
+        return True
+
+    def has_small_integer_weights(self) -> bool:
+        """Все веса — целые из [0, DIAL_MAX_WEIGHT]; счётчик ведётся при изменениях."""
+        return self._non_integer_edges == 0
+
+    def has_uniform_weights(self) -> bool:
+        """Все рёбра имеют одинаковый вес (в том числе если рёбер нет)."""
+        return len(self._weight_counts) <= 1
+
+    def to_csr(self) -> "CSRGraph":
+        """Упаковывает граф в компактное CSR-представление."""
+        return CSRGraph.from_graph(self)
+
+    def freeze(self) -> "CSRGraph":
+        """
+        Строит CSR-снимок графа и закрепляет его за графом: пока граф
+        не изменится, shortest_path работает по снимку, а не по словарям.
+        Любая мутация сбрасывает снимок.
+        """
+        if self._csr is None:
+            self._csr = self.to_csr()
+        return self._csr
+
+    def is_frozen(self) -> bool:
+        return self._csr is not None
+
+    def save(self, path: str) -> None:
+        """Записывает граф в двоичный CSR-файл (см. CSRGraph.save)."""
+        as_csr(self).save(path)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> "CSRGraph":
+        """
+        Загружает граф, сохранённый Graph.save. Возвращает неизменяемый
+        CSRGraph — его можно сразу передавать в shortest_path; изменяемый
+        Graph можно получить через to_graph().
+        """
+        return CSRGraph.load(path, mmap=mmap)
+
+
+# Двоичный формат CSR-файла (все числа little-endian):
+#   заголовок: magic (8 байт), версия (u32), флаги (u32), n (u64), m (u64);
+#   затем int64 vertex_ids[n], int64 offsets[n + 1], int64 neighbors[m],
+#   float64 weights[m]. Все секции выровнены по 8 байт.
+GRAPH_FILE_MAGIC = b'LAB4CSR\0'
+GRAPH_FILE_VERSION = 1
+GRAPH_FILE_HEADER = struct.Struct('<8sIIQQ')
+_FLAG_DENSE_IDS = 1  # vertex_ids == 0..n-1
+
+
+class _RangeIndex:
+    """Отображение v -> v для вершин 0..n-1 без словаря на n записей."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __contains__(self, v) -> bool:
+        return type(v) is int and 0 <= v < self.n
+
+    def __getitem__(self, v) -> int:
+        if v not in self:
+            raise KeyError(v)
+        return v
+
+    def get(self, v, default=None):
+        return v if v in self else default
 
 
-def shortest_path(graph: Graph, start: int, end: int) -> Optional[List[int]]:
+class CSRGraph:
+    """
+    Неизменяемое представление графа в формате CSR (compressed sparse row).
+    Вершины перенумерованы в 0..n-1 по возрастанию идентификаторов.
+    Соседи вершины i лежат в neighbors[offsets[i]:offsets[i + 1]]
+    по возрастанию, их веса — в weights на тех же позициях.
+    """
+
+    def __init__(self, vertex_ids: List[int], offsets: array, neighbors: array,
+                 weights: array, index: Optional[dict] = None):
+        self.vertex_ids = vertex_ids
+        self.index = index if index is not None else {v: i for i, v in enumerate(vertex_ids)}
+        self.offsets = offsets      # array('q'), длина n + 1
+        self.neighbors = neighbors  # array('q'), индексы соседей
+        self.weights = weights      # array('d'), веса рёбер
+        self._int_weights = None
+        self._int_weights_checked = False
+        self._path = None  # (файл, размер, mtime_ns) для отображённого снимка, см. load()
+
+    def __reduce__(self):
+        # Снимок, отображённый из файла, передаётся в другие процессы
+        # по имени файла: они отображают те же страницы, а не копию.
+        # Размер и время изменения файла проверяются при загрузке.
+        if self._path is not None:
+            return (_load_mapped_csr, self._path)
+        return (CSRGraph, (self.vertex_ids, self.offsets, self.neighbors,
+                           self.weights, self.index))
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "CSRGraph":
+        vertex_ids = graph.get_vertices()
+        index = {v: i for i, v in enumerate(vertex_ids)}
+        offsets = array('q', [0])
+        neighbors = array('q')
+        weights = array('d')
+        for v in vertex_ids:
+            adj = graph._edges[v]
+            row = sorted(adj)
+            neighbors.extend(index[u] for u in row)
+            weights.extend(adj[u] for u in row)
+            offsets.append(len(neighbors))
+        return cls(vertex_ids, offsets, neighbors, weights, index)
+
+    def num_vertices(self) -> int:
+        return len(self.vertex_ids)
+
+    def get_version(self) -> int:
+        """Снимок неизменяем, поэтому версия всегда 0 (для ShortestPathCache)."""
+        return 0
+
+    def has_vertex(self, v: int) -> bool:
+        return v in self.index
+
+    def get_adjacent_edges(self, v: int) -> List[Tuple[int, float]]:
+        i = self.index.get(v)
+        if i is None:
+            return []
+        ids = self.vertex_ids
+        return [(ids[self.neighbors[k]], self.weights[k])
+                for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def nbytes(self) -> int:
+        """Размер буферов смежности (offsets, neighbors, weights) в байтах."""
+        return sum(buf.itemsize * len(buf) for buf in (self.offsets, self.neighbors, self.weights))
+
+    def to_graph(self) -> Graph:
+        """Изменяемая копия снимка в виде Graph."""
+        g = Graph()
+        ids, offsets, neighbors, weights = self.vertex_ids, self.offsets, self.neighbors, self.weights
+        for u in range(self.num_vertices()):
+            g.add_vertex(ids[u])
+            for k in range(offsets[u], offsets[u + 1]):
+                if u <= neighbors[k]:
+                    g.add_edge(ids[u], ids[neighbors[k]], weights[k])
+        return g
+
+    def save(self, path: str) -> None:
+        """Записывает снимок в двоичный файл версии GRAPH_FILE_VERSION."""
+        ids = self.vertex_ids
+        if not all(type(v) is int for v in ids):
+            raise ValueError("Only integer vertex ids can be saved to a graph file")
+        n, m = self.num_vertices(), len(self.neighbors)
+        flags = _FLAG_DENSE_IDS if all(v == i for i, v in enumerate(ids)) else 0
+        with open(path, 'wb') as f:
+            f.write(GRAPH_FILE_HEADER.pack(GRAPH_FILE_MAGIC, GRAPH_FILE_VERSION, flags, n, m))
+            for buf, typecode in ((ids, 'q'), (self.offsets, 'q'),
+                                  (self.neighbors, 'q'), (self.weights, 'd')):
+                data = array(typecode, buf)
+                if sys.byteorder != 'little':
+                    data.byteswap()
+                data.tofile(f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CSRGraph":
+        """
+        Читает файл, записанный save(). При mmap=True файл отображается
+        в память только для чтения: буферы — memoryview без копирования,
+        и процессы, загрузившие один файл, делят одни и те же страницы.
+        При mmap=False данные копируются в array.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(GRAPH_FILE_HEADER.size)
+            if len(header) != GRAPH_FILE_HEADER.size:
+                raise ValueError(f"{path} is too short to be a graph file")
+            magic, version, flags, n, m = GRAPH_FILE_HEADER.unpack(header)
+            if magic != GRAPH_FILE_MAGIC:
+                raise ValueError(f"{path} is not a graph file")
+            if version != GRAPH_FILE_VERSION:
+                raise ValueError(f"Unsupported graph file version {version} in {path}")
+            sizes = ((n, 'q'), (n + 1, 'q'), (m, 'q'), (m, 'd'))
+            expected = GRAPH_FILE_HEADER.size + 8 * sum(count for count, _ in sizes)
+            st = os.fstat(f.fileno())
+            if st.st_size != expected:
+                raise ValueError(f"{path} has a wrong size for a graph with {n} vertices and {m} entries")
+
+            buffers = []
+            if mmap:
+                if sys.byteorder != 'little':
+                    raise ValueError("Memory-mapped loading needs a little-endian machine")
+                view = memoryview(mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ))
+                offset = GRAPH_FILE_HEADER.size
+                for count, typecode in sizes:
+                    buffers.append(view[offset:offset + 8 * count].cast(typecode))
+                    offset += 8 * count
+            else:
+                for count, typecode in sizes:
+                    data = array(typecode)
+                    data.fromfile(f, count)
+                    if sys.byteorder != 'little':
+                        data.byteswap()
+                    buffers.append(data)
+
+        vertex_ids, offsets, neighbors, weights = buffers
+        index = _RangeIndex(n) if flags & _FLAG_DENSE_IDS else None
+        if not mmap:
+            vertex_ids = vertex_ids.tolist()
+        csr = cls(vertex_ids, offsets, neighbors, weights, index)
+        if mmap:
+            csr._path = (path, st.st_size, st.st_mtime_ns)
+        return csr
+
+    def integer_weights(self) -> Optional[array]:
+        """
+        Веса в виде array('q'), если все они целые из [0, DIAL_MAX_WEIGHT],
+        иначе None. Результат вычисляется один раз.
+        """
+        if not self._int_weights_checked:
+            self._int_weights_checked = True
+            if all(map(is_small_integer_weight, self.weights)):
+                self._int_weights = array('q', map(int, self.weights))
+        return self._int_weights
+
+
+def _load_mapped_csr(path: str, size: int, mtime_ns: int) -> CSRGraph:
+    """Распаковка отображённого снимка: файл не должен был измениться."""
+    st = os.stat(path)
+    if st.st_size != size or st.st_mtime_ns != mtime_ns:
+        raise ValueError(f"{path} changed since the graph was loaded")
+    return CSRGraph.load(path, mmap=True)
+
+
+def as_csr(graph: Union[Graph, CSRGraph]) -> CSRGraph:
+    """CSR-представление графа: сам CSRGraph, снимок замороженного графа или новый снимок."""
+    if isinstance(graph, CSRGraph):
+        return graph
+    return graph._csr if graph._csr is not None else graph.to_csr()
+
+
+def choose_engine(graph: Graph) -> str:
+    """
+    Алгоритм, который shortest_path выберет при engine='auto':
+    'bfs' — все веса одинаковы, 'dial' — все веса целые
+    из [0, DIAL_MAX_WEIGHT], иначе 'heap'. Работает за O(1).
+    """
+    if graph.has_uniform_weights():
+        return 'bfs'
+    if graph.has_small_integer_weights():
+        return 'dial'
+    return 'heap'
+
+
+def shortest_path(graph: Union[Graph, CSRGraph], start: int, end: int, bidirectional: bool = False,
+                  stats: Optional[dict] = None,
+                  cache: Optional["ShortestPathCache"] = None,
+                  engine: str = 'auto') -> Optional[List[int]]:
     """
     Реализация алгоритма Дейкстры для поиска кратчайшего пути.
     Возвращает список вершин, составляющих путь от start до end,
     или None, если путь не существует.
+    bidirectional=True включает двунаправленный поиск.
+    Если передан словарь stats, в stats['settled'] записывается
+    число окончательно обработанных вершин.
+    Если передан cache, ответ берётся из дерева путей от start
+    (stats['engine'] == 'cache'); bidirectional и явный engine с ним
+    несовместимы — ValueError.
+    engine выбирает очередь с приоритетами: 'heap' — heapq с ленивым
+    удалением устаревших записей, 'indexed' — IndexedHeap с decrease_key,
+    'dial' — корзины по целым расстояниям (все три по CSR-снимку, если
+    граф заморожен, иначе по словарям смежности; снимок не строится),
+    'bfs' — двунаправленный поиск в ширину для графов с одинаковыми
+    весами. 'auto' выбирает
+    алгоритм через choose_engine. Выбранный алгоритм записывается
+    в stats['engine'].
+    graph может быть и CSRGraph (например, из Graph.load): тогда
+    доступны 'heap', 'indexed' и 'dial', а 'auto' выбирает 'dial' при
+    подходящих целых весах; bidirectional и 'bfs' требуют Graph.
     """
+    if cache is not None:
+        if bidirectional or engine != 'auto':
+            raise ValueError("cache cannot be combined with bidirectional or an explicit engine")
+        if stats is not None:
+            stats['engine'] = 'cache'
+        return cache.shortest_path(graph, start, end)
+    if isinstance(graph, CSRGraph):
+        return _shortest_path_snapshot(graph, start, end, bidirectional, stats, engine)
+    if bidirectional:
+        return bidirectional_shortest_path(graph, start, end, stats)
+    if engine == 'auto':
+        engine = choose_engine(graph)
+    if stats is not None:
+        stats['engine'] = engine
+    if engine == 'bfs':
+        return bfs_shortest_path(graph, start, end, stats)
+    if engine == 'dial':
+        if graph._csr is not None:
+            return dial_shortest_path(graph._csr, start, end, stats)
+        return dial_shortest_path_dict(graph, start, end, stats)
+    if engine == 'indexed':
+        if graph._csr is not None:
+            return shortest_path_indexed_heap(graph._csr, start, end, stats)
+        return shortest_path_indexed_heap_dict(graph, start, end, stats)
+    if engine != 'heap':
+        raise ValueError(f"Unknown shortest path engine: {engine}")
+
+    if graph._csr is not None:
+        return shortest_path_csr(graph._csr, start, end, stats)
+
     if not graph.has_vertex(start) or not graph.has_vertex(end):
         return None
 
@@ -102,6 +512,9 @@ def shortest_path(graph: Graph, start: int, end: int) -> Optional[List[int]]:
                 previous[neighbor] = current_vertex
                 heapq.heappush(pq, (new_dist, neighbor))
 
+    if stats is not None:
+        stats['settled'] = len(visited)
+
     # Проверяем, найден ли путь
     if distances[end] == float('inf'):
         return None
@@ -117,202 +530,3577 @@ def shortest_path(graph: Graph, start: int, end: int) -> Optional[List[int]]:
     return path
 
 
-# --- Генератор связного графа ---
-def generate_connected_graph(n: int, avg_degree: int = 4) -> Graph:
+def _shortest_path_snapshot(csr: CSRGraph, start: int, end: int, bidirectional: bool,
+                            stats: Optional[dict], engine: str) -> Optional[List[int]]:
+    """Ветка shortest_path для неизменяемого CSRGraph."""
+    if bidirectional or engine == 'bfs':
+        raise ValueError("bidirectional and 'bfs' searches need a mutable Graph")
+    if engine == 'auto':
+        engine = 'dial' if csr.integer_weights() is not None else 'heap'
+    if stats is not None:
+        stats['engine'] = engine
+    if engine == 'dial':
+        return dial_shortest_path(csr, start, end, stats)
+    if engine == 'indexed':
+        return shortest_path_indexed_heap(csr, start, end, stats)
+    if engine != 'heap':
+        raise ValueError(f"Unknown shortest path engine: {engine}")
+    return shortest_path_csr(csr, start, end, stats)
+
+
+def shortest_path_csr(csr: CSRGraph, start: int, end: int,
+                      stats: Optional[dict] = None) -> Optional[List[int]]:
     """
-    Генерирует связный взвешенный граф с n вершинами.
-    Средняя степень вершин ~ avg_degree.
+    Алгоритм Дейкстры, работающий напрямую по буферам CSRGraph.
+    Внутри только целые индексы и массивы: нет сортировки соседей
+    и повторных поисков по словарям. Порядок обхода совпадает
+    с shortest_path, поэтому и путь получается тем же.
     """
-    g = Graph()
-    # Добавляем все вершины
-    for i in range(n):
-        g.add_vertex(i)
+    s = csr.index.get(start)
+    t = csr.index.get(end)
+    if s is None or t is None:
+        return None
 
-    # Гарантируем связность: строим цепочку
-    for i in range(n - 1):
-        g.add_edge(i, i + 1, random.uniform(0.5, 5.0))
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    n = csr.num_vertices()
+    inf = float('inf')
+    dist = array('d', [inf]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    dist[s] = 0.0
+    pq = [(0.0, s)]
+    settled = 0
+    max_heap = 1
 
-    # Добавляем дополнительные рёбра для нужной плотности
-    total_edges_needed = n * avg_degree // 2 - (n - 1)  # минус цепочка
-    added = 0
-    attempts = 0
-    max_attempts = n * n
+    while pq:
+        d, u = heapq.heappop(pq)
+        if visited[u]:
+            continue
+        visited[u] = 1
+        settled += 1
+        if u == t:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            if visited[v]:
+                continue
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+                if len(pq) > max_heap:
+                    max_heap = len(pq)
 
-    while added < total_edges_needed and attempts < max_attempts:
-        u = random.randint(0, n - 1)
-        v = random.randint(0, n - 1)
-        if u != v and not g.has_edge(u, v):
-            g.add_edge(u, v, random.uniform(0.5, 5.0))
-            added += 1
-        attempts += 1
+    if stats is not None:
+        stats['settled'] = settled
+        stats['max_heap_size'] = max_heap
+    if dist[t] == inf:
+        return None
+    return unwind_path(csr, prev, t)
 
-    return g
 
+class IndexedHeap:
+    """
+    Двоичная min-куча вершин 0..n-1 с настоящей операцией decrease_key.
+    Каждая вершина лежит в куче не более одного раза: pos[v] — её позиция
+    в heap (-1, если её там нет), keys[v] — текущий ключ. При равных
+    ключах первой извлекается вершина с меньшим номером, как у heapq
+    с кортежами (ключ, вершина).
+    """
 
-# --- Встроенные тесты ---
-def test_empty_graph():
-    g = Graph()
-    assert not g.has_vertex(0)
-    assert not g.has_edge(0, 1)
+    def __init__(self, n: int):
+        self.heap = array('q')
+        self.pos = array('q', [-1]) * n
+        self.keys = array('d', [float('inf')]) * n
 
-def test_one_vertex():
-    g = Graph()
-    g.add_vertex(0)
-    assert g.has_vertex(0)
-    assert not g.has_vertex(1)
-    assert not g.has_edge(0, 1)
+    def __len__(self) -> int:
+        return len(self.heap)
 
-def test_two_vertices():
-    g = Graph()
-    g.add_vertex(0)
-    g.add_vertex(1)
-    assert g.has_vertex(0)
-    assert g.has_vertex(1)
-    assert not g.has_edge(0, 1)
+    def __contains__(self, v: int) -> bool:
+        return self.pos[v] != -1
 
-def test_one_edge():
-    g = Graph()
-    g.add_edge(0, 1, 5.0)
-    assert g.has_vertex(0)
-    assert g.has_vertex(1)
-    assert g.has_edge(0, 1)
-    assert g.has_edge(1, 0)
-    assert g.edge_weight(0, 1) == 5.0
-    assert not g.has_edge(0, 0)
+    def push(self, v: int, key: float) -> None:
+        if self.pos[v] != -1:
+            raise ValueError(f"Vertex {v} is already in the heap")
+        self.keys[v] = key
+        self.heap.append(v)
+        self._sift_up(len(self.heap) - 1)
 
-def test_loop():
-    g = Graph()
-    g.add_edge(0, 0)
-    g.add_edge(1, 1)
-    assert g.has_vertex(0)
-    assert g.has_vertex(1)
-    assert g.has_edge(0, 0)
-    assert g.has_edge(1, 1)
+    def decrease_key(self, v: int, key: float) -> None:
+        if self.pos[v] == -1:
+            raise ValueError(f"Vertex {v} is not in the heap")
+        if key > self.keys[v]:
+            raise ValueError(f"New key {key} is greater than current key {self.keys[v]}")
+        self.keys[v] = key
+        self._sift_up(self.pos[v])
 
-def test_two_edges():
-    g = Graph()
-    g.add_edge(0, 1)
-    g.add_edge(0, 3)
-    assert g.has_vertex(0)
-    assert g.has_vertex(1)
-    assert g.has_vertex(3)
-    assert g.has_edge(0, 1)
-    assert g.has_edge(0, 3)
-    assert g.has_edge(1, 0)
-    assert g.has_edge(3, 0)
-    assert not g.has_edge(1, 3)
+    def push_or_decrease(self, v: int, key: float) -> None:
+        if self.pos[v] == -1:
+            self.push(v, key)
+        elif key < self.keys[v]:
+            self.decrease_key(v, key)
 
-def test_get_vertices():
-    g = Graph()
-    g.add_vertex(0)
-    g.add_edge(0, 1)
-    g.add_vertex(3)
-    assert g.get_vertices() == [0, 1, 3]
+    def peek(self) -> Tuple[float, int]:
+        v = self.heap[0]
+        return self.keys[v], v
 
-def test_get_adjacent_vertices():
-    g = Graph()
-    g.add_vertex(0)
-    g.add_edge(0, 1)
-    g.add_edge(0, 2, 4.5)
-    g.add_edge(1, 2, 3.0)
-    g.add_edge(1, 3)
-    assert g.get_adjacent_vertices(0) == [1, 2]
-    assert g.get_adjacent_vertices(1) == [0, 2, 3]
-    assert g.get_adjacent_vertices(2) == [0, 1]
-    assert g.get_adjacent_vertices(3) == [1]
-    assert g.get_adjacent_vertices(4) == []
-    assert g.edge_weight(1, 2) == 3.0
-    assert g.edge_weight(2, 0) == 4.5
-    try:
-        g.edge_weight(0, 3)
-        assert False, "Expected ValueError"
-    except ValueError:
-        pass
+    def pop(self) -> Tuple[float, int]:
+        heap = self.heap
+        if not heap:
+            raise IndexError("pop from empty heap")
+        root = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        self.pos[root] = -1
+        return self.keys[root], root
 
-def test_get_adjacent_edges():
-    g = Graph()
-    g.add_edge(0, 1)
-    g.add_edge(0, 2, 4.5)
-    g.add_edge(1, 2, 3.0)
-    g.add_edge(3, 1, 7.2)
-    edges_0 = set(g.get_adjacent_edges(0))
-    assert edges_0 == {(1, 1.0), (2, 4.5)}
-    edges_1 = set(g.get_adjacent_edges(1))
-    assert edges_1 == {(0, 1.0), (2, 3.0), (3, 7.2)}
-    edges_2 = set(g.get_adjacent_edges(2))
-    assert edges_2 == {(0, 4.5), (1, 3.0)}
-    edges_3 = set(g.get_adjacent_edges(3))
-    assert edges_3 == {(1, 7.2)}
-    assert g.get_adjacent_edges(4) == []
+    def _sift_up(self, i: int) -> None:
+        heap, pos, keys = self.heap, self.pos, self.keys
+        item = heap[i]
+        key = keys[item]
+        while i > 0:
+            p = (i - 1) >> 1
+            parent = heap[p]
+            pkey = keys[parent]
+            if key < pkey or (key == pkey and item < parent):
+                heap[i] = parent
+                pos[parent] = i
+                i = p
+            else:
+                break
+        heap[i] = item
+        pos[item] = i
 
-def test_replace_an_edge():
-    g = Graph()
-    g.add_edge(1, 5, 3.5)
-    g.add_edge(5, 1, 4.7)
-    assert g.has_edge(1, 5)
-    assert g.has_edge(5, 1)
-    assert g.edge_weight(1, 5) == 4.7
-    assert g.edge_weight(5, 1) == 4.7
+    def _sift_down(self, i: int) -> None:
+        heap, pos, keys = self.heap, self.pos, self.keys
+        size = len(heap)
+        item = heap[i]
+        key = keys[item]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            c, ckey = heap[child], keys[heap[child]]
+            right = child + 1
+            if right < size:
+                r, rkey = heap[right], keys[heap[right]]
+                if rkey < ckey or (rkey == ckey and r < c):
+                    child, c, ckey = right, r, rkey
+            if ckey < key or (ckey == key and c < item):
+                heap[i] = c
+                pos[c] = i
+                i = child
+            else:
+                break
+        heap[i] = item
+        pos[item] = i
 
-def test_remove_vertices_and_edges():
-    g = Graph()
-    g.add_edge(0, 1)
-    g.add_edge(0, 2)
-    g.add_edge(0, 3)
-    g.add_edge(0, 4)
-    g.add_edge(1, 2)
-    g.add_edge(1, 3)
-    g.add_edge(2, 3)
-    g.add_edge(2, 4)
-    g.remove_vertex(2)
-    assert not g.has_vertex(2)
-    assert not g.has_edge(1, 2)
-    assert not g.has_edge(3, 2)
-    assert not g.has_edge(4, 2)
-    assert g.has_edge(0, 1)
-    assert g.has_edge(0, 4)
-    assert g.has_edge(1, 3)
-    g.remove_edge(0, 1)
-    assert not g.has_edge(0, 1)
-    assert g.has_vertex(0)
-    assert g.has_vertex(1)
 
+def shortest_path_indexed_heap(csr: CSRGraph, start: int, end: int,
+                               stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    Дейкстра по CSR-снимку с IndexedHeap: вместо повторной вставки
+    вершина в куче переупорядочивается через decrease_key, поэтому
+    размер кучи не превышает V, а устаревших извлечений нет.
+    Порядок обработки совпадает с shortest_path_csr.
+    """
+    s = csr.index.get(start)
+    t = csr.index.get(end)
+    if s is None or t is None:
+        return None
 
-# --- Замер времени и вывод таблицы ---
-def run_benchmark():
-    print("\n" + "="*80)
-    print("ЗАМЕРЫ ВРЕМЕНИ АЛГОРИТМА ДЕЙКСТРЫ")
-    print("="*80)
-    print(f"{'Размер графа':<12} {'Время (сек)':<12} {'Число рёбер':<12} {'Плотность':<10}")
-    print("-"*80)
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    n = csr.num_vertices()
+    inf = float('inf')
+    dist = array('d', [inf]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    dist[s] = 0.0
+    pq = IndexedHeap(n)
+    pq.push(s, 0.0)
+    settled = 0
+    max_heap = 1
 
-    sizes = [10, 50, 100, 200, 500, 1000, 10000]
-    runs_per_size = 5  # количество запусков для усреднения
+    while pq:
+        d, u = pq.pop()
+        visited[u] = 1
+        settled += 1
+        if u == t:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            if visited[v]:
+                continue
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                if v in pq:
+                    pq.decrease_key(v, nd)
+                else:
+                    pq.push(v, nd)
+                    if len(pq) > max_heap:
+                        max_heap = len(pq)
 
-    for n in sizes:
-        g = generate_connected_graph(n, avg_degree=5)  # средняя степень 5
-        total_time = 0.0
-        num_edges = sum(len(g._edges[v]) for v in g._edges) // 2  # так как граф неориентированный
-        density = num_edges / (n * (n - 1) / 2) if n > 1 else 0
+    if stats is not None:
+        stats['settled'] = settled
+        stats['max_heap_size'] = max_heap
+    if dist[t] == inf:
+        return None
+    return unwind_path(csr, prev, t)
 
-        for _ in range(runs_per_size):
-            start, end = random.choice(g.get_vertices()), random.choice(g.get_vertices())
-            start_time = time.perf_counter()
-            path = shortest_path(g, start, end)
-            end_time = time.perf_counter()
-            total_time += end_time - start_time
 
-        avg_time = total_time / runs_per_size
-        print(f"{n:<12} {avg_time:<12.6f} {num_edges:<12} {density:<10.3f}")
+def _dense_ids(graph: Graph) -> Tuple[List[int], dict]:
+    """
+    Вершины по возрастанию и их номера 0..n-1 — то же упорядочение,
+    что у CSR-снимка, но без упаковки рёбер. O(V log V), граф не меняется.
+    """
+    ids = sorted(graph._vertices)
+    return ids, {v: i for i, v in enumerate(ids)}
 
-    print("\n" + "="*80)
-    print("ВЫВОДЫ:")
-    print("- Алгоритм Дейкстры работает за O((V + E) log V) в худшем случае.")
-    print("- На практике время растёт примерно линейно с числом рёбер при фиксированной плотности.")
-    print("- Для больших графов (n > 1000) время возрастает заметно, но остаётся приемлемым.")
-    print("- Увеличение плотности графа (больше рёбер) увеличивает время выполнения.")
-    print("- При n=1000 алгоритм выполняется за доли секунды — подходит для реального времени.")
 
+def shortest_path_indexed_heap_dict(graph: Graph, start: int, end: int,
+                                    stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    То же, что shortest_path_indexed_heap, но прямо по словарям
+    смежности незамороженного графа: вершины нумеруются как в CSR,
+    и порядок обработки совпадает, а снимок не строится.
+    """
+    if not graph.has_vertex(start) or not graph.has_vertex(end):
+        return None
+    ids, index = _dense_ids(graph)
+    edges = graph._edges
+    n = len(ids)
+    s, t = index[start], index[end]
+    inf = float('inf')
+    dist = array('d', [inf]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    dist[s] = 0.0
+    pq = IndexedHeap(n)
+    pq.push(s, 0.0)
+    settled = 0
+    max_heap = 1
+
+    while pq:
+        d, u = pq.pop()
+        visited[u] = 1
+        settled += 1
+        if u == t:
+            break
+        for vertex, w in edges[ids[u]].items():
+            v = index[vertex]
+            if visited[v]:
+                continue
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                if v in pq:
+                    pq.decrease_key(v, nd)
+                else:
+                    pq.push(v, nd)
+                    if len(pq) > max_heap:
+                        max_heap = len(pq)
+
+    if stats is not None:
+        stats['settled'] = settled
+        stats['max_heap_size'] = max_heap
+    if dist[t] == inf:
+        return None
+    return _unwind_ids(ids, prev, t)
+
+
+def bfs_shortest_path(graph: Graph, start: int, end: int,
+                      stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    Двунаправленный поиск в ширину по словарям смежности, O(V + E)
+    без кучи. При одинаковых весах кратчайший путь — путь с наименьшим
+    числом рёбер. За шаг целиком раскрывается уровень меньшего
+    фронта; первая вершина, уже достигнутая встречным поиском, даёт
+    кратчайший путь. Среди равных путей может выбрать не тот, что
+    вернул бы Дейкстра. В stats['settled'] — число достигнутых вершин.
+    """
+    if not graph.has_vertex(start) or not graph.has_vertex(end):
+        return None
+    if start == end:
+        if stats is not None:
+            stats['settled'] = 1
+        return [start]
+
+    adj = graph._edges
+    parents = ({start: None}, {end: None})
+    frontiers = [[start], [end]]
+    meet = None
+
+    while meet is None and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen, other = parents[side], parents[1 - side]
+        next_frontier = []
+        for u in frontiers[side]:
+            for v in adj[u]:
+                if v in seen:
+                    continue
+                seen[v] = u
+                if v in other:
+                    meet = v
+                    break
+                next_frontier.append(v)
+            if meet is not None:
+                break
+        frontiers[side] = next_frontier
+
+    if stats is not None:
+        stats['settled'] = len(parents[0]) + len(parents[1])
+    if meet is None:
+        return None
+
+    path = []
+    current = meet
+    while current is not None:
+        path.append(current)
+        current = parents[0][current]
+    path.reverse()
+    current = parents[1][meet]
+    while current is not None:
+        path.append(current)
+        current = parents[1][current]
+    return path
+
+
+def dial_shortest_path(csr: CSRGraph, start: int, end: int,
+                       stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    Алгоритм Дейкстры с корзинами (Dial) для целых весов из
+    [0, DIAL_MAX_WEIGHT]. Вершина с расстоянием d лежит в корзине
+    d mod (C + 1), где C — наибольший вес: все ожидающие расстояния
+    лежат в [d, d + C], поэтому C + 1 корзин по кругу хватает.
+    Корзина — куча номеров вершин, так что вершины с равным
+    расстоянием обрабатываются по возрастанию номера, как в
+    shortest_path, и пути (включая выбор среди равных) совпадают.
+    """
+    int_weights = csr.integer_weights()
+    if int_weights is None:
+        raise ValueError(f"Dial's algorithm needs integer weights in [0, {DIAL_MAX_WEIGHT}]")
+    s = csr.index.get(start)
+    t = csr.index.get(end)
+    if s is None or t is None:
+        return None
+
+    offsets, neighbors = csr.offsets, csr.neighbors
+    n = csr.num_vertices()
+    inf = float('inf')
+    dist = array('d', [inf]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    num_buckets = max(int_weights, default=0) + 1
+    buckets = [[] for _ in range(num_buckets)]
+    dist[s] = 0
+    buckets[0].append(s)
+    pending = 1
+    settled = 0
+    d = 0
+    found = False
+
+    while pending and not found:
+        bucket = buckets[d % num_buckets]
+        while bucket:
+            u = heapq.heappop(bucket)
+            pending -= 1
+            if visited[u]:
+                continue
+            visited[u] = 1
+            settled += 1
+            if u == t:
+                found = True
+                break
+            for k in range(offsets[u], offsets[u + 1]):
+                v = neighbors[k]
+                if visited[v]:
+                    continue
+                nd = d + int_weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(buckets[nd % num_buckets], v)
+                    pending += 1
+        d += 1
+
+    if stats is not None:
+        stats['settled'] = settled
+    if dist[t] == inf:
+        return None
+    return unwind_path(csr, prev, t)
+
+
+def dial_shortest_path_dict(graph: Graph, start: int, end: int,
+                            stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    Алгоритм Dial по словарям смежности незамороженного графа: вершины
+    нумеруются как в CSR-снимке, поэтому пути совпадают с
+    dial_shortest_path, но снимок не строится. Число корзин берётся
+    из счётчика весов графа.
+    """
+    if not graph.has_small_integer_weights():
+        raise ValueError(f"Dial's algorithm needs integer weights in [0, {DIAL_MAX_WEIGHT}]")
+    if not graph.has_vertex(start) or not graph.has_vertex(end):
+        return None
+    ids, index = _dense_ids(graph)
+    edges = graph._edges
+    n = len(ids)
+    s, t = index[start], index[end]
+    inf = float('inf')
+    dist = array('d', [inf]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    num_buckets = int(max(graph._weight_counts, default=0)) + 1
+    buckets = [[] for _ in range(num_buckets)]
+    dist[s] = 0
+    buckets[0].append(s)
+    pending = 1
+    settled = 0
+    d = 0
+    found = False
+
+    while pending and not found:
+        bucket = buckets[d % num_buckets]
+        while bucket:
+            u = heapq.heappop(bucket)
+            pending -= 1
+            if visited[u]:
+                continue
+            visited[u] = 1
+            settled += 1
+            if u == t:
+                found = True
+                break
+            for vertex, w in edges[ids[u]].items():
+                v = index[vertex]
+                if visited[v]:
+                    continue
+                nd = d + int(w)
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(buckets[nd % num_buckets], v)
+                    pending += 1
+        d += 1
+
+    if stats is not None:
+        stats['settled'] = settled
+    if dist[t] == inf:
+        return None
+    return _unwind_ids(ids, prev, t)
+
+
+def unwind_path(csr: CSRGraph, prev: array, t: int) -> List[int]:
+    """Восстанавливает путь до индекса t по массиву предков (-1 — корень)."""
+    return _unwind_ids(csr.vertex_ids, prev, t)
+
+
+def _unwind_ids(ids, prev: array, t: int) -> List[int]:
+    """То же, что unwind_path, по списку идентификаторов вершин ids."""
+    path = []
+    u = t
+    while u != -1:
+        path.append(ids[u])
+        u = prev[u]
+    path.reverse()
+    return path
+
+
+def shortest_path_tree_csr(csr: CSRGraph, source: int,
+                           targets: Optional[set] = None) -> Tuple[array, array]:
+    """
+    Дейкстра от индекса source по CSR-буферам.
+    Возвращает массивы расстояний и предков (-1 — нет предка).
+    Если задано множество индексов targets, поиск прекращается, как только
+    все они обработаны; расстояния до остальных вершин тогда неокончательные.
+    """
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    n = csr.num_vertices()
+    dist = array('d', [float('inf')]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    dist[source] = 0.0
+    pq = [(0.0, source)]
+    remaining = len(targets) if targets is not None else -1
+
+    while pq:
+        d, u = heapq.heappop(pq)
+        if visited[u]:
+            continue
+        visited[u] = 1
+        if remaining > 0 and u in targets:
+            remaining -= 1
+            if remaining == 0:
+                break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+
+    return dist, prev
+
+
+def bidirectional_shortest_path(graph: Graph, start: int, end: int,
+                                stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    Двунаправленный Дейкстра: прямой поиск от start и обратный от end
+    идут поочерёдно (шаг делает сторона с меньшим ключом в куче).
+    mu — длина лучшего найденного пути через ребро между двумя
+    поисками. Остановка, когда сумма минимальных ключей обеих куч
+    не меньше mu: более короткого пути уже не существует.
+    При равных по длине путях может вернуть другой из них.
+    """
+    if not graph.has_vertex(start) or not graph.has_vertex(end):
+        return None
+    if start == end:
+        if stats is not None:
+            stats['settled'] = 1
+        return [start]
+
+    adj = graph._edges
+    inf = float('inf')
+    dist = ({start: 0.0}, {end: 0.0})
+    previous = ({start: None}, {end: None})
+    visited = (set(), set())
+    pqs = ([(0.0, start)], [(0.0, end)])
+    mu = inf
+    meet = None
+
+    while pqs[0] and pqs[1]:
+        top_f, top_b = pqs[0][0][0], pqs[1][0][0]
+        if top_f + top_b >= mu:
+            break
+        side = 0 if top_f <= top_b else 1
+        pq, dist_s, dist_o = pqs[side], dist[side], dist[1 - side]
+        d, u = heapq.heappop(pq)
+        if u in visited[side]:
+            continue
+        visited[side].add(u)
+
+        for v, w in adj[u].items():
+            nd = d + w
+            if nd < dist_s.get(v, inf):
+                dist_s[v] = nd
+                previous[side][v] = u
+                heapq.heappush(pq, (nd, v))
+            if v in dist_o and nd + dist_o[v] < mu:
+                mu = nd + dist_o[v]
+                meet = (u, v) if side == 0 else (v, u)
+
+    if stats is not None:
+        stats['settled'] = len(visited[0]) + len(visited[1])
+    if meet is None:
+        return None
+
+    # meet = (x, y): ребро x-y, где x достигнута прямым поиском, y — обратным
+    x, y = meet
+    path = []
+    current = x
+    while current is not None:
+        path.append(current)
+        current = previous[0][current]
+    path.reverse()
+    current = y
+    while current is not None:
+        path.append(current)
+        current = previous[1][current]
+    return path
+
+
+# --- ALT: A* с ориентирами и неравенством треугольника ---
+class LandmarkIndex:
+    """
+    Предвычисленные расстояния от k ориентиров до всех вершин
+    CSR-снимка: tables[i][v] — расстояние от landmarks[i] до v.
+    Для неориентированного графа |d(L, t) - d(L, v)| — нижняя оценка
+    d(v, t), а максимум по ориентирам — допустимая эвристика A*.
+    Индекс строится для статического графа; после его изменений
+    индекс нужно построить заново.
+    """
+
+    def __init__(self, csr: CSRGraph, landmarks: List[int], tables: List[array]):
+        self.csr = csr
+        self.landmarks = landmarks  # индексы вершин в csr
+        self.tables = tables
+
+    def nbytes(self) -> int:
+        """Размер таблиц расстояний в байтах."""
+        return sum(t.itemsize * len(t) for t in self.tables)
+
+
+def build_landmarks(graph: Union[Graph, "CSRGraph"], k: int = 8, method: str = 'farthest') -> LandmarkIndex:
+    """
+    Выбирает k ориентиров и считает от каждого полный Дейкстра.
+    method='farthest' — каждый следующий ориентир самый далёкий от уже
+    выбранных (недостижимые вершины считаются бесконечно далёкими,
+    так что ориентиры попадают и в другие компоненты);
+    method='random' — случайные вершины.
+    """
+    if method not in ('farthest', 'random'):
+        raise ValueError(f"Unknown landmark selection method: {method}")
+    csr = as_csr(graph)
+    n = csr.num_vertices()
+    k = min(k, n)
+    landmarks = []
+    tables = []
+    if k == 0:
+        return LandmarkIndex(csr, landmarks, tables)
+
+    if method == 'random':
+        for L in random.sample(range(n), k):
+            landmarks.append(L)
+            tables.append(shortest_path_tree_csr(csr, L)[0])
+        return LandmarkIndex(csr, landmarks, tables)
+
+    # Первый ориентир — самая далёкая вершина от случайной
+    seed_dist = shortest_path_tree_csr(csr, random.randrange(n))[0]
+    closest = seed_dist
+    while len(landmarks) < k:
+        L = max(range(n), key=closest.__getitem__)
+        if landmarks and closest[L] == 0.0:
+            break  # все вершины уже совпадают с ориентирами
+        dist = shortest_path_tree_csr(csr, L)[0]
+        landmarks.append(L)
+        tables.append(dist)
+        if len(landmarks) == 1:
+            closest = array('d', dist)
+        else:
+            for v in range(n):
+                if dist[v] < closest[v]:
+                    closest[v] = dist[v]
+    return LandmarkIndex(csr, landmarks, tables)
+
+
+def alt_shortest_path(index: LandmarkIndex, start: int, end: int,
+                      stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    A* по CSR-снимку с эвристикой ALT. Эвристика согласованная, поэтому
+    каждая вершина обрабатывается не более одного раза, а найденный путь
+    кратчайший (при равных длинах может отличаться от shortest_path).
+    """
+    csr = index.csr
+    s = csr.index.get(start)
+    t = csr.index.get(end)
+    if s is None or t is None:
+        return None
+
+    inf = float('inf')
+    # Ориентиры, из которых t недостижима, ничего не дают оценке
+    terms = [(table, table[t]) for table in index.tables if table[t] != inf]
+
+    def heuristic(v: int) -> float:
+        h = 0.0
+        for table, dt in terms:
+            dv = table[v]
+            if dv == inf:
+                return inf  # v в другой компоненте, чем t
+            diff = dt - dv if dt > dv else dv - dt
+            if diff > h:
+                h = diff
+        return h
+
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    n = csr.num_vertices()
+    dist = array('d', [inf]) * n
+    prev = array('q', [-1]) * n
+    visited = bytearray(n)
+    h_cache = {}
+    dist[s] = 0.0
+    pq = [(heuristic(s), s)]
+    settled = 0
+
+    while pq:
+        _, u = heapq.heappop(pq)
+        if visited[u]:
+            continue
+        visited[u] = 1
+        settled += 1
+        if u == t:
+            break
+        d = dist[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            if visited[v]:
+                continue
+            nd = d + weights[k]
+            if nd < dist[v]:
+                h = h_cache.get(v)
+                if h is None:
+                    h = h_cache[v] = heuristic(v)
+                if h == inf:
+                    continue
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd + h, v))
+
+    if stats is not None:
+        stats['settled'] = settled
+    if dist[t] == inf:
+        return None
+    return unwind_path(csr, prev, t)
+
+
+# --- Contraction hierarchies ---
+# Двоичный формат файла иерархии: тот же заголовок, что у CSR-файла
+# (magic, версия, флаги, n, m), но со своим magic.
+CH_FILE_MAGIC = b'LAB4CH\0\0'
+CH_FILE_HEADER = GRAPH_FILE_HEADER
+
+
+class ContractionHierarchy:
+    """
+    Результат стягивания вершин. Вершины пронумерованы как в CSR-снимке,
+    rank[v] — порядковый номер стягивания. Хранится только «восходящий»
+    граф: для каждой вершины рёбра к вершинам с большим рангом
+    (исходные и шорткаты) в CSR-буферах. middle[k] — вершина, через
+    которую проходит шорткат, или -1 для исходного ребра.
+    """
+
+    FORMAT_VERSION = 2  # версия 1 хранилась через pickle
+
+    def __init__(self, vertex_ids: List[int], rank: array, offsets: array,
+                 neighbors: array, weights: array, middle: array):
+        self.vertex_ids = vertex_ids
+        self.index = {v: i for i, v in enumerate(vertex_ids)}
+        self.rank = rank
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.weights = weights
+        self.middle = middle
+
+    def num_shortcuts(self) -> int:
+        return sum(1 for m in self.middle if m != -1)
+
+    def nbytes(self) -> int:
+        return sum(buf.itemsize * len(buf) for buf in
+                   (self.rank, self.offsets, self.neighbors, self.weights, self.middle))
+
+    def edge_middle(self, a: int, b: int) -> int:
+        """Средняя вершина ребра a-b восходящего графа (-1 — исходное ребро)."""
+        if self.rank[a] > self.rank[b]:
+            a, b = b, a
+        for k in range(self.offsets[a], self.offsets[a + 1]):
+            if self.neighbors[k] == b:
+                return self.middle[k]
+        raise ValueError(f"Edge ({a}, {b}) does not exist")
+
+    def save(self, path: str) -> None:
+        """
+        Сохраняет иерархию в двоичный файл, чтобы строить её один раз.
+        Формат как у графа (little-endian): заголовок CH_FILE_HEADER,
+        затем int64 vertex_ids[n], rank[n], offsets[n + 1], neighbors[m],
+        float64 weights[m], int64 middle[m].
+        """
+        if not all(type(v) is int for v in self.vertex_ids):
+            raise ValueError("Only integer vertex ids can be saved to a contraction hierarchy file")
+        n, m = len(self.vertex_ids), len(self.neighbors)
+        with open(path, 'wb') as f:
+            f.write(CH_FILE_HEADER.pack(CH_FILE_MAGIC, self.FORMAT_VERSION, 0, n, m))
+            for buf, typecode in ((self.vertex_ids, 'q'), (self.rank, 'q'), (self.offsets, 'q'),
+                                  (self.neighbors, 'q'), (self.weights, 'd'), (self.middle, 'q')):
+                data = array(typecode, buf)
+                if sys.byteorder != 'little':
+                    data.byteswap()
+                data.tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> "ContractionHierarchy":
+        """Читает файл, записанный save(); код из файла не выполняется."""
+        with open(path, 'rb') as f:
+            header = f.read(CH_FILE_HEADER.size)
+            if len(header) != CH_FILE_HEADER.size:
+                raise ValueError(f"{path} is too short to be a contraction hierarchy file")
+            magic, version, _, n, m = CH_FILE_HEADER.unpack(header)
+            if magic != CH_FILE_MAGIC or version != cls.FORMAT_VERSION:
+                raise ValueError(f"{path} is not a contraction hierarchy file of version {cls.FORMAT_VERSION}")
+            sizes = ((n, 'q'), (n, 'q'), (n + 1, 'q'), (m, 'q'), (m, 'd'), (m, 'q'))
+            expected = CH_FILE_HEADER.size + 8 * sum(count for count, _ in sizes)
+            if os.fstat(f.fileno()).st_size != expected:
+                raise ValueError(f"{path} has a wrong size for a hierarchy with {n} vertices and {m} edges")
+            buffers = []
+            for count, typecode in sizes:
+                data = array(typecode)
+                data.fromfile(f, count)
+                if sys.byteorder != 'little':
+                    data.byteswap()
+                buffers.append(data)
+        vertex_ids, rank, offsets, neighbors, weights, middle = buffers
+        return cls(vertex_ids.tolist(), rank, offsets, neighbors, weights, middle)
+
+
+def _witness_search(adj: List[dict], source: int, skip: int, targets: set,
+                    limit: float, max_settled: int) -> dict:
+    """
+    Локальный Дейкстра от source в ещё не стянутом графе без вершины skip.
+    Останавливается, когда обработаны все targets, на расстоянии limit
+    или после max_settled вершин.
+    """
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    visited = set()
+    remaining = len(targets)
+    while pq and len(visited) < max_settled:
+        d, u = heapq.heappop(pq)
+        if d > limit:
+            break
+        if u in visited:
+            continue
+        visited.add(u)
+        if u in targets:
+            remaining -= 1
+            if remaining == 0:
+                break
+        for v, (w, _) in adj[u].items():
+            if v == skip:
+                continue
+            nd = d + w
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def build_contraction_hierarchy(graph: Union[Graph, "CSRGraph"], max_settled: int = 100) -> ContractionHierarchy:
+    """
+    Стягивает вершины в порядке edge difference: число добавляемых
+    шорткатов минус число удаляемых рёбер плюс число уже стянутых соседей
+    (чтобы стягивание шло равномерно). Приоритеты обновляются лениво:
+    вершина с вершины кучи пересчитывается и стягивается, только если
+    осталась минимальной. Шорткат u-w через v не нужен, если поиск
+    свидетеля нашёл путь не длиннее w(u, v) + w(v, w); при исчерпании
+    лимита max_settled шорткат добавляется — это всегда корректно.
+    """
+    csr = as_csr(graph)
+    n = csr.num_vertices()
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    inf = float('inf')
+
+    # Рабочий граф: adj[u] = {v: (вес, средняя вершина или -1)}
+    adj = [{} for _ in range(n)]
+    for u in range(n):
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            if v != u:
+                adj[u][v] = (weights[k], -1)
+
+    def needed_shortcuts(v: int) -> List[Tuple[int, int, float]]:
+        nbrs = [(u, w) for u, (w, _) in adj[v].items()]
+        shortcuts = []
+        for i, (u, wu) in enumerate(nbrs):
+            targets = [(x, wu + wx) for x, wx in nbrs[i + 1:]]
+            if not targets:
+                continue
+            limit = max(via for _, via in targets)
+            dist = _witness_search(adj, u, v, {x for x, _ in targets}, limit, max_settled)
+            for x, via in targets:
+                if dist.get(x, inf) > via:
+                    shortcuts.append((u, x, via))
+        return shortcuts
+
+    deleted_neighbors = [0] * n
+    rank = array('q', [0]) * n
+    up = [None] * n
+    pq = []
+    for v in range(n):
+        pq.append((len(needed_shortcuts(v)) - len(adj[v]), v))
+    heapq.heapify(pq)
+
+    order = 0
+    while pq:
+        _, v = heapq.heappop(pq)
+        shortcuts = needed_shortcuts(v)
+        priority = len(shortcuts) - len(adj[v]) + deleted_neighbors[v]
+        if pq and priority > pq[0][0]:
+            heapq.heappush(pq, (priority, v))
+            continue
+
+        # Все оставшиеся соседи v стянуты позже — это восходящие рёбра v
+        rank[v] = order
+        order += 1
+        up[v] = sorted((u, w, m) for u, (w, m) in adj[v].items())
+        for u in adj[v]:
+            del adj[u][v]
+            deleted_neighbors[u] += 1
+        adj[v] = {}
+        for u, x, via in shortcuts:
+            if via < adj[u].get(x, (inf, -1))[0]:
+                adj[u][x] = (via, v)
+                adj[x][u] = (via, v)
+
+    up_offsets = array('q', [0])
+    up_neighbors = array('q')
+    up_weights = array('d')
+    up_middle = array('q')
+    for v in range(n):
+        for u, w, m in up[v]:
+            up_neighbors.append(u)
+            up_weights.append(w)
+            up_middle.append(m)
+        up_offsets.append(len(up_neighbors))
+    return ContractionHierarchy(list(csr.vertex_ids), rank, up_offsets,
+                                up_neighbors, up_weights, up_middle)
+
+
+def ch_shortest_path(ch: ContractionHierarchy, start: int, end: int,
+                     stats: Optional[dict] = None) -> Optional[List[int]]:
+    """
+    Запрос к иерархии: два поиска Дейкстры только по восходящим рёбрам,
+    от start и от end. Направление прекращается, когда минимальный ключ
+    его кучи не меньше лучшего найденного пути. Шорткаты пути затем
+    раскрываются обратно в исходные рёбра.
+    """
+    s = ch.index.get(start)
+    t = ch.index.get(end)
+    if s is None or t is None:
+        return None
+
+    offsets, neighbors, weights = ch.offsets, ch.neighbors, ch.weights
+    inf = float('inf')
+    dist = ({s: 0.0}, {t: 0.0})
+    previous = ({s: -1}, {t: -1})
+    visited = (set(), set())
+    pqs = ([(0.0, s)], [(0.0, t)])
+    best = 0.0 if s == t else inf
+    meet = s if s == t else -1
+
+    while True:
+        active = [side for side in (0, 1) if pqs[side] and pqs[side][0][0] < best]
+        if not active:
+            break
+        side = min(active, key=lambda i: pqs[i][0][0])
+        pq, dist_s, dist_o = pqs[side], dist[side], dist[1 - side]
+        d, u = heapq.heappop(pq)
+        if u in visited[side]:
+            continue
+        visited[side].add(u)
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            nd = d + weights[k]
+            if nd < dist_s.get(v, inf):
+                dist_s[v] = nd
+                previous[side][v] = u
+                heapq.heappush(pq, (nd, v))
+                if v in dist_o and nd + dist_o[v] < best:
+                    best = nd + dist_o[v]
+                    meet = v
+
+    if stats is not None:
+        stats['settled'] = len(visited[0]) + len(visited[1])
+    if meet == -1:
+        return None
+
+    # Путь в восходящем графе: start ... meet ... end
+    chain = []
+    u = meet
+    while u != -1:
+        chain.append(u)
+        u = previous[0][u]
+    chain.reverse()
+    u = previous[1][meet]
+    while u != -1:
+        chain.append(u)
+        u = previous[1][u]
+
+    path = [chain[0]]
+    for a, b in zip(chain, chain[1:]):
+        stack = [(a, b)]
+        while stack:
+            x, y = stack.pop()
+            m = ch.edge_middle(x, y)
+            if m == -1:
+                path.append(y)
+            else:
+                stack.append((m, y))
+                stack.append((x, m))
+    ids = ch.vertex_ids
+    return [ids[v] for v in path]
+
+
+# --- Пакетные запросы ---
+_worker_csr = None
+
+
+def _init_batch_worker(csr: CSRGraph) -> None:
+    global _worker_csr
+    _worker_csr = csr
+
+
+def _paths_from_sources(csr: CSRGraph, jobs: List[Tuple[int, List[int]]]) -> list:
+    """Один поиск на источник; jobs — список (источник, его цели)."""
+    result = []
+    for start, ends in jobs:
+        s = csr.index.get(start)
+        targets = {csr.index[t] for t in ends if t in csr.index}
+        if s is None or not targets:
+            result.extend(((start, end), None) for end in ends)
+            continue
+        dist, prev = shortest_path_tree_csr(csr, s, targets)
+        for end in ends:
+            t = csr.index.get(end)
+            if t is None or dist[t] == float('inf'):
+                result.append(((start, end), None))
+            else:
+                result.append(((start, end), unwind_path(csr, prev, t)))
+    return result
+
+
+def _paths_in_worker(jobs: List[Tuple[int, List[int]]]) -> list:
+    return _paths_from_sources(_worker_csr, jobs)
+
+
+def shortest_paths_batch(graph: Union[Graph, "CSRGraph"], pairs: Iterable[Tuple[int, int]],
+                         workers: Optional[int] = None,
+                         chunk_size: int = 16) -> Dict[Tuple[int, int], Optional[List[int]]]:
+    """
+    Кратчайшие пути для множества пар (start, end). Пары группируются
+    по источнику, и на каждый источник выполняется один поиск, который
+    останавливается, когда достигнуты все его цели. Источники пачками
+    по chunk_size раздаются процессам ProcessPoolExecutor; CSR-снимок
+    графа передаётся каждому процессу один раз при его запуске.
+    workers=1 — расчёт в текущем процессе (по умолчанию — число ядер).
+    Возвращает словарь {(start, end): путь или None}.
+    """
+    by_source = {}
+    for start, end in pairs:
+        by_source.setdefault(start, []).append(end)
+    jobs = list(by_source.items())
+    csr = as_csr(graph)
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, (len(jobs) + chunk_size - 1) // chunk_size)
+    if workers <= 1:
+        return dict(_paths_from_sources(csr, jobs))
+
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    paths = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(csr,)) as executor:
+        for part in executor.map(_paths_in_worker, chunks):
+            paths.update(part)
+    return paths
+
+
+# --- Кэш деревьев кратчайших путей ---
+class ShortestPathCache:
+    """
+    LRU-кэш полных деревьев кратчайших путей (массивы расстояний
+    и предков) по источнику. Запрос от закэшированного источника
+    отвечается проходом по дереву без нового поиска. Кэш помнит граф
+    и его версию; после add_edge, remove_edge или remove_vertex версия
+    растёт, и все деревья сбрасываются при следующем обращении.
+    Граф не замораживается: кэш берёт готовый снимок замороженного
+    графа или строит свой один раз на версию графа и делит его между
+    всеми деревьями. Каждое дерево занимает 16 байт на вершину графа
+    сверх этого снимка.
+    """
+
+    def __init__(self, capacity: int = 256):
+        if capacity < 1:
+            raise ValueError(f"Cache capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._trees = OrderedDict()  # источник -> (dist, prev)
+        self._graph = None
+        self._version = None
+        self._csr = None  # снимок self._graph версии self._version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0  # деревья, сброшенные из-за изменения графа
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def tree(self, graph: Graph, start: int) -> Tuple[CSRGraph, array, array]:
+        """Возвращает (csr, dist, prev) дерева от start, строя его при промахе."""
+        version = graph.get_version()
+        if graph is not self._graph or version != self._version:
+            self.invalidations += len(self._trees)
+            self._trees.clear()
+            self._graph, self._version, self._csr = graph, version, None
+        entry = self._trees.get(start)
+        if entry is not None:
+            self.hits += 1
+            self._trees.move_to_end(start)
+            return (self._csr,) + entry
+
+        self.misses += 1
+        if self._csr is None:
+            self._csr = as_csr(graph)
+        csr = self._csr
+        dist, prev = shortest_path_tree_csr(csr, csr.index[start])
+        self._trees[start] = (dist, prev)
+        if len(self._trees) > self.capacity:
+            self._trees.popitem(last=False)
+            self.evictions += 1
+        return csr, dist, prev
+
+    def shortest_path(self, graph: Graph, start: int, end: int) -> Optional[List[int]]:
+        if not graph.has_vertex(start) or not graph.has_vertex(end):
+            return None
+        csr, dist, prev = self.tree(graph, start)
+        t = csr.index[end]
+        if dist[t] == float('inf'):
+            return None
+        return unwind_path(csr, prev, t)
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'invalidations': self.invalidations,
+                'size': len(self._trees)}
+
+    def clear(self) -> None:
+        self._trees.clear()
+        self._graph = self._version = self._csr = None
+
+
+# --- Потоковая загрузка списка рёбер ---
+def read_chunks(path: str, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    Читает файл блоками примерно по chunk_size байт, разрезанными по
+    границе строки: неполная последняя строка переносится в следующий блок.
+    """
+    tail = b''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b'\n') + 1
+            if cut == 0:
+                tail = block
+                continue
+            tail = block[cut:]
+            yield block[:cut]
+    if tail:
+        yield tail
+
+
+_LINE_END = b'\0'  # токен-маркер конца строки для parse_edge_chunk
+
+
+def parse_edge_chunk(chunk: bytes) -> Tuple[array, array, array]:
+    """
+    Разбирает блок строк «u v w» целиком: один split на весь блок и
+    срезы по каждой колонке. Пустые строки и строки, начинающиеся с '#',
+    пропускаются. Конец каждой строки превращается в токен-маркер: в
+    правильном блоке маркеры стоят ровно на каждой четвёртой позиции,
+    и это проверяется срезом. Если нет (пустые строки или строка не из
+    трёх полей), блок разбирается построчно; ValueError при ошибке.
+    """
+    if b'#' in chunk:
+        chunk = b'\n'.join(line for line in chunk.split(b'\n')
+                           if not line.lstrip().startswith(b'#'))
+    tokens = chunk.replace(b'\n', b' \0 ').split()
+    if tokens and tokens[-1] != _LINE_END:
+        tokens.append(_LINE_END)
+    lines = len(tokens) // 4
+    if (len(tokens) % 4 or tokens[3::4].count(_LINE_END) != lines
+            or tokens.count(_LINE_END) != lines):
+        tokens = []
+        for line in chunk.split(b'\n'):
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) != 3:
+                raise ValueError(f"Expected 'u v w' in edge list line {line.decode(errors='replace')!r}")
+            tokens += fields
+            tokens.append(_LINE_END)
+    try:
+        return (array('q', map(int, tokens[0::4])),
+                array('q', map(int, tokens[1::4])),
+                array('d', map(float, tokens[2::4])))
+    except ValueError as e:
+        raise ValueError(f"Malformed edge list chunk: {e}") from None
+
+
+def iter_edge_batches(path: str, chunk_size: int = 1 << 20) -> Iterator[Tuple[array, array, array]]:
+    """Поток пачек рёбер (us, vs, ws); в памяти одновременно только один блок."""
+    for chunk in read_chunks(path, chunk_size):
+        yield parse_edge_chunk(chunk)
+
+
+def _csr_from_edge_file(path: str, chunk_size: int) -> Tuple[CSRGraph, int]:
+    """
+    Строит CSR в два прохода по файлу, не храня список рёбер:
+    первый считает степени, второй раскладывает рёбра по строкам.
+    Повторное ребро, как и в Graph.add_edge, заменяет вес предыдущего.
+    """
+    index = {}
+    degree = array('q')
+    lines = 0
+    for us, vs, _ in iter_edge_batches(path, chunk_size):
+        lines += len(us)
+        for u, v in zip(us, vs):
+            for x in (u, v) if u != v else (u,):
+                i = index.get(x)
+                if i is None:
+                    index[x] = len(degree)
+                    degree.append(1)
+                else:
+                    degree[i] += 1
+
+    vertex_ids = sorted(index)
+    n = len(vertex_ids)
+    order = array('q', [0]) * n  # индекс первого прохода -> итоговый индекс
+    for i, v in enumerate(vertex_ids):
+        order[index[v]] = i
+        index[v] = i
+    offsets = array('q', [0]) * (n + 1)
+    for old, i in enumerate(order):
+        offsets[i + 1] = degree[old]
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    neighbors = array('q', [0]) * offsets[n]
+    weights = array('d', [0.0]) * offsets[n]
+    fill = array('q', offsets[:n])
+    for us, vs, ws in iter_edge_batches(path, chunk_size):
+        for u, v, w in zip(us, vs, ws):
+            iu, iv = index[u], index[v]
+            neighbors[fill[iu]] = iv
+            weights[fill[iu]] = w
+            fill[iu] += 1
+            if iu != iv:
+                neighbors[fill[iv]] = iu
+                weights[fill[iv]] = w
+                fill[iv] += 1
+
+    # Сортировка строк по соседу (устойчивая, поэтому среди повторов
+    # последним идёт более позднее ребро) и удаление повторов
+    write = 0
+    start = 0
+    for i in range(n):
+        end = offsets[i + 1]
+        row = sorted(zip(neighbors[start:end], weights[start:end]), key=itemgetter(0))
+        row_start = write
+        for nb, w in row:
+            if write > row_start and neighbors[write - 1] == nb:
+                weights[write - 1] = w
+            else:
+                neighbors[write] = nb
+                weights[write] = w
+                write += 1
+        offsets[i] = row_start
+        start = end
+    offsets[n] = write
+    del neighbors[write:]
+    del weights[write:]
+    return CSRGraph(vertex_ids, offsets, neighbors, weights, index), lines
+
+
+def load_edge_list(path: str, compact: bool = False, chunk_size: int = 1 << 20,
+                   stats: Optional[dict] = None) -> Union[Graph, CSRGraph]:
+    """
+    Загружает граф из текстового файла со строками «u v w», читая его
+    блоками по chunk_size байт. compact=False строит Graph, compact=True —
+    сразу CSRGraph без промежуточного словарного графа. Кроме результата,
+    память занимает только текущий блок (и O(V) для номеров вершин).
+    В stats записываются число рёбер, время и скорость (рёбер/сек).
+    """
+    start_time = time.perf_counter()
+    if compact:
+        result, lines = _csr_from_edge_file(path, chunk_size)
+    else:
+        result = Graph()
+        lines = 0
+        for us, vs, ws in iter_edge_batches(path, chunk_size):
+            lines += len(us)
+            result.add_edges(zip(us, vs, ws))
+    elapsed = time.perf_counter() - start_time
+    if stats is not None:
+        stats['edges'] = lines
+        stats['seconds'] = elapsed
+        stats['edges_per_sec'] = lines / elapsed if elapsed > 0 else float('inf')
+    return result
+
+
+def write_edge_list(graph: Graph, path: str) -> None:
+    """Записывает рёбра графа в текстовый файл «u v w» (каждое ребро один раз)."""
+    with open(path, 'w') as f:
+        for u in graph._edges:
+            for v, w in graph._edges[u].items():
+                if u <= v:
+                    f.write(f"{u} {v} {w!r}\n")
+
+
+# --- Delta-stepping ---
+_delta_worker = {}
+
+
+def _init_delta_worker(blocks: Dict[str, Tuple[str, str]]) -> None:
+    """Подключает процесс к блокам общей памяти: ключ -> (имя блока, typecode)."""
+    for key, (name, typecode) in blocks.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _delta_worker['_shm_' + key] = shm  # держим блок открытым
+        _delta_worker[key] = shm.buf.cast(typecode)
+
+
+def _delta_requests(offsets, neighbors, weights, dist, vertices: List[int],
+                    delta: float, light: bool) -> List[Tuple[int, float, int]]:
+    """
+    Запросы на релаксацию (v, новое расстояние, u) по лёгким (w <= delta)
+    или тяжёлым рёбрам вершин vertices. Заведомо бесполезные запросы
+    (не улучшающие текущее dist[v]) отсеиваются сразу.
+    """
+    requests = []
+    for u in vertices:
+        du = dist[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            w = weights[k]
+            if (w <= delta) is light:
+                v = neighbors[k]
+                nd = du + w
+                if nd < dist[v]:
+                    requests.append((v, nd, u))
+    return requests
+
+
+def _delta_requests_in_worker(job: Tuple[List[int], float, bool]) -> List[Tuple[int, float, int]]:
+    vertices, delta, light = job
+    w = _delta_worker
+    return _delta_requests(w['offsets'], w['neighbors'], w['weights'], w['dist'], vertices, delta, light)
+
+
+def delta_stepping_sssp(graph: Union[Graph, CSRGraph], source: int, delta: Optional[float] = None,
+                        workers: int = 1, min_parallel: int = 1024) -> Tuple[array, array]:
+    """
+    Delta-stepping (Meyer, Sanders): вершины лежат в корзинах ширины
+    delta по текущему расстоянию. Корзина обрабатывается фазами: сначала
+    лёгкие рёбра (w <= delta), которые могут вернуть вершины в ту же
+    корзину, затем один раз тяжёлые рёбра всех её вершин.
+    Поиск запросов на релаксацию — основная работа — делится между
+    workers процессами: CSR-буферы и массив расстояний лежат в общей
+    памяти, каждый процесс читает их без копирования и возвращает только
+    найденные запросы; применяет их главный процесс между фазами.
+    Фазы меньше min_parallel вершин выполняются в главном процессе.
+    По умолчанию delta — средний вес ребра.
+    Возвращает массивы расстояний и предков по индексам CSR.
+    """
+    csr = as_csr(graph)
+    s = csr.index.get(source)
+    if s is None:
+        raise ValueError(f"Vertex {source} does not exist")
+    n = csr.num_vertices()
+    if delta is None:
+        delta = sum(csr.weights) / len(csr.weights) if len(csr.weights) else 1.0
+    if delta <= 0:
+        raise ValueError(f"delta must be positive, got {delta}")
+
+    blocks = []
+    views = []
+    executor = None
+    try:
+        if workers > 1:
+            names = {}
+            shared = {}
+            for key, buf, typecode in (('offsets', csr.offsets, 'q'), ('neighbors', csr.neighbors, 'q'),
+                                       ('weights', csr.weights, 'd'), ('dist', None, 'd')):
+                size = n if buf is None else len(buf)
+                shm = shared_memory.SharedMemory(create=True, size=max(8 * size, 8))
+                blocks.append(shm)
+                view = shm.buf.cast(typecode)[:size]
+                views.append(view)
+                if buf is None:
+                    view[:] = array('d', [float('inf')]) * n
+                else:
+                    view[:] = array(typecode, buf)
+                names[key] = (shm.name, typecode)
+                shared[key] = view
+            offsets, neighbors, weights, dist = (shared[key] for key in ('offsets', 'neighbors', 'weights', 'dist'))
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_delta_worker,
+                                           initargs=(names,))
+        else:
+            offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+            dist = array('d', [float('inf')]) * n
+
+        def find_requests(vertices: List[int], light: bool) -> List[Tuple[int, float, int]]:
+            if executor is None or len(vertices) < min_parallel:
+                return _delta_requests(offsets, neighbors, weights, dist, vertices, delta, light)
+            step = (len(vertices) + workers - 1) // workers
+            jobs = [(vertices[i:i + step], delta, light) for i in range(0, len(vertices), step)]
+            requests = []
+            for part in executor.map(_delta_requests_in_worker, jobs):
+                requests.extend(part)
+            return requests
+
+        prev = array('q', [-1]) * n
+        bucket_of = array('q', [-1]) * n
+        buckets = {}
+
+        def relax(v: int, x: float, u: int) -> None:
+            if x < dist[v]:
+                old = bucket_of[v]
+                if old != -1:
+                    buckets[old].discard(v)
+                b = int(x // delta)
+                buckets.setdefault(b, set()).add(v)
+                bucket_of[v] = b
+                dist[v] = x
+                prev[v] = u
+
+        relax(s, 0.0, -1)
+        while buckets:
+            i = min(buckets)
+            bucket = buckets[i]
+            phase_vertices = []
+            while bucket:
+                current = list(bucket)
+                bucket.clear()
+                for v in current:
+                    bucket_of[v] = -1
+                phase_vertices.extend(current)
+                for v, x, u in find_requests(current, light=True):
+                    relax(v, x, u)
+            del buckets[i]
+            for v, x, u in find_requests(phase_vertices, light=False):
+                relax(v, x, u)
+
+        result = array('d', dist)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        for view in views:
+            view.release()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return result, prev
+
+
+def shortest_path_delta(graph: Union[Graph, CSRGraph], start: int, end: int,
+                        delta: Optional[float] = None, workers: int = 1) -> Optional[List[int]]:
+    """Путь от start до end по дереву, построенному delta_stepping_sssp."""
+    csr = as_csr(graph)
+    t = csr.index.get(end)
+    if start not in csr.index or t is None:
+        return None
+    dist, prev = delta_stepping_sssp(csr, start, delta, workers)
+    if dist[t] == float('inf'):
+        return None
+    return unwind_path(csr, prev, t)
+
+
+# --- Динамическое дерево кратчайших путей ---
+class DynamicShortestPathTree:
+    """
+    Дерево кратчайших путей от source, которое чинится после изменения
+    одного ребра, а не строится заново (в духе Ramalingam–Reps).
+    Изменения вносятся через add_edge и remove_edge этого объекта:
+    - уменьшение веса (или новое ребро) запускает Дейкстру только
+      от улучшившегося конца ребра;
+    - увеличение веса или удаление ребра дерева сбрасывает поддерево
+      под ним, даёт каждой его вершине лучшую оценку через соседей
+      вне поддерева и досчитывает расстояния Дейкстрой внутри него;
+    - изменение ребра вне дерева не требует работы.
+    В last_touched записывается число вершин, затронутых последним
+    изменением, в total_touched — сумма по всем изменениям.
+    Если граф изменили в обход объекта (версия не совпадает),
+    дерево строится заново.
+    """
+
+    def __init__(self, graph: Graph, source: int):
+        if not graph.has_vertex(source):
+            raise ValueError(f"Vertex {source} does not exist")
+        self.graph = graph
+        self.source = source
+        self.updates = 0
+        self.rebuilds = 0
+        self.total_touched = 0
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        csr = as_csr(self.graph)
+        ids = csr.vertex_ids
+        dist, prev = shortest_path_tree_csr(csr, csr.index[self.source])
+        self._dist = {}
+        self._parent = {}
+        self._children = {}
+        for i in range(csr.num_vertices()):
+            self._dist[ids[i]] = dist[i]
+            self._parent[ids[i]] = ids[prev[i]] if prev[i] != -1 else None
+            self._children[ids[i]] = set()
+        for v, p in self._parent.items():
+            if p is not None:
+                self._children[p].add(v)
+        self._version = self.graph.get_version()
+        self.rebuilds += 1
+        self.last_touched = csr.num_vertices()
+
+    def _sync(self) -> None:
+        if self._version != self.graph.get_version():
+            self._rebuild()
+
+    def _set_parent(self, v: int, p: Optional[int]) -> None:
+        old = self._parent[v]
+        if old is not None:
+            self._children[old].discard(v)
+        self._parent[v] = p
+        if p is not None:
+            self._children[p].add(v)
+
+    def _ensure_vertex(self, v: int) -> None:
+        if v not in self._dist:
+            self._dist[v] = float('inf')
+            self._parent[v] = None
+            self._children[v] = set()
+
+    def _propagate(self, pq: list, touched: set) -> None:
+        """Дейкстра от вершин в pq; улучшает расстояния везде, куда дотянется."""
+        dist, edges = self._dist, self.graph._edges
+        while pq:
+            d, x = heapq.heappop(pq)
+            if d > dist[x]:
+                continue
+            touched.add(x)
+            for y, w in edges[x].items():
+                nd = d + w
+                if nd < dist[y]:
+                    dist[y] = nd
+                    self._set_parent(y, x)
+                    heapq.heappush(pq, (nd, y))
+
+    def _repair_subtree(self, root: int, touched: set) -> None:
+        """Пересчитывает поддерево root после удорожания ребра к его родителю."""
+        dist, edges = self._dist, self.graph._edges
+        affected = []
+        stack = [root]
+        while stack:
+            x = stack.pop()
+            affected.append(x)
+            stack.extend(self._children[x])
+        subtree = set(affected)
+        for x in affected:
+            dist[x] = float('inf')
+            self._set_parent(x, None)
+        pq = []
+        for x in affected:
+            best, best_parent = float('inf'), None
+            for y, w in edges[x].items():
+                if y not in subtree and dist[y] + w < best:
+                    best, best_parent = dist[y] + w, y
+            if best_parent is not None:
+                dist[x] = best
+                self._set_parent(x, best_parent)
+                pq.append((best, x))
+        heapq.heapify(pq)
+        touched.update(subtree)
+        self._propagate(pq, touched)
+
+    def _tree_child(self, u: int, v: int) -> Optional[int]:
+        """Конец ребра (u, v), лежащий под ним в дереве, или None."""
+        if self._parent.get(v) == u:
+            return v
+        if self._parent.get(u) == v:
+            return u
+        return None
+
+    def _finish(self, touched: set) -> None:
+        self.last_touched = len(touched)
+        self.total_touched += len(touched)
+        self.updates += 1
+        self._version = self.graph.get_version()
+
+    def add_edge(self, u: int, v: int, weight: float = 1.0) -> None:
+        """Добавляет ребро или меняет его вес и чинит дерево."""
+        self._sync()
+        old = self.graph._edges[u].get(v) if self.graph.has_edge(u, v) else None
+        self.graph.add_edge(u, v, weight)
+        self._ensure_vertex(u)
+        self._ensure_vertex(v)
+        touched = set()
+        if u != v:
+            if old is None or weight < old:
+                dist = self._dist
+                pq = []
+                for a, b in ((u, v), (v, u)):
+                    nd = dist[a] + weight
+                    if nd < dist[b]:
+                        dist[b] = nd
+                        self._set_parent(b, a)
+                        pq.append((nd, b))
+                heapq.heapify(pq)
+                self._propagate(pq, touched)
+            elif weight > old:
+                child = self._tree_child(u, v)
+                if child is not None:
+                    self._repair_subtree(child, touched)
+        self._finish(touched)
+
+    def remove_edge(self, u: int, v: int) -> None:
+        """Удаляет ребро и чинит дерево; отсутствующее ребро пропускается."""
+        self._sync()
+        if not self.graph.has_edge(u, v):
+            return
+        child = self._tree_child(u, v)
+        self.graph.remove_edge(u, v)
+        touched = set()
+        if child is not None:
+            self._repair_subtree(child, touched)
+        self._finish(touched)
+
+    def distance(self, v: int) -> float:
+        self._sync()
+        return self._dist.get(v, float('inf'))
+
+    def shortest_path(self, end: int) -> Optional[List[int]]:
+        """Путь от source до end по текущему дереву."""
+        self._sync()
+        if self._dist.get(end, float('inf')) == float('inf'):
+            return None
+        path = []
+        v = end
+        while v is not None:
+            path.append(v)
+            v = self._parent[v]
+        path.reverse()
+        return path
+
+
+# --- Ближайшие объекты (мультиисточниковый Дейкстра) ---
+def _facility_indices(csr: CSRGraph, facilities: List[int]) -> List[Tuple[int, int]]:
+    """
+    Пары (номер в facilities, индекс CSR). Повторная вершина пропускается:
+    объект представляет первое её вхождение в списке.
+    """
+    pairs = []
+    seen = set()
+    for number, f in enumerate(facilities):
+        i = csr.index.get(f)
+        if i is None:
+            raise ValueError(f"Vertex {f} does not exist")
+        if i not in seen:
+            seen.add(i)
+            pairs.append((number, i))
+    return pairs
+
+
+def nearest_facilities(graph: Union[Graph, CSRGraph], facilities: List[int]) -> Tuple[array, array]:
+    """
+    Ближайший объект для каждой вершины за один проход Дейкстры:
+    в очередь сразу кладутся все объекты с расстоянием 0, и каждая
+    вершина наследует объект от предка в дереве поиска.
+    Возвращает массивы по индексам CSR: расстояние до ближайшего объекта
+    и его номер в списке facilities (-1 — объект недостижим; при повторах
+    вершины — номер первого вхождения).
+    """
+    csr = as_csr(graph)
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    n = csr.num_vertices()
+    dist = array('d', [float('inf')]) * n
+    owner = array('q', [-1]) * n
+    pq = []
+    for number, i in _facility_indices(csr, facilities):
+        dist[i] = 0.0
+        owner[i] = number
+        pq.append((0.0, i))
+    heapq.heapify(pq)
+    visited = bytearray(n)
+
+    while pq:
+        d, u = heapq.heappop(pq)
+        if visited[u]:
+            continue
+        visited[u] = 1
+        source = owner[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                owner[v] = source
+                heapq.heappush(pq, (nd, v))
+
+    return dist, owner
+
+
+def k_nearest_facilities(graph: Union[Graph, CSRGraph], facilities: List[int],
+                         k: int) -> Tuple[array, array]:
+    """
+    k ближайших различных объектов для каждой вершины. Метка (d, объект)
+    распространяется как в мультиисточниковом Дейкстре, но вершина
+    принимает не больше k меток и не больше одной от каждого объекта;
+    метка, не попавшая в k лучших у вершины, не может попасть в них
+    и у её соседей, поэтому дальше не идёт.
+    Возвращает плоские массивы длины n * k: строка i (элементы
+    i*k .. i*k + k - 1) — расстояния по возрастанию и номера объектов
+    в facilities; недостающие места заполнены inf и -1. Повторы одной
+    вершины в facilities, как и в nearest_facilities, считаются одним
+    объектом с номером первого вхождения.
+    """
+    if k < 1:
+        raise ValueError(f"k must be positive, got {k}")
+    csr = as_csr(graph)
+    offsets, neighbors, weights = csr.offsets, csr.neighbors, csr.weights
+    n = csr.num_vertices()
+    dist = array('d', [float('inf')]) * (n * k)
+    owner = array('q', [-1]) * (n * k)
+    count = array('l', [0]) * n
+    pq = [(0.0, i, number) for number, i in _facility_indices(csr, facilities)]
+    heapq.heapify(pq)
+
+    while pq:
+        d, u, source = heapq.heappop(pq)
+        filled = count[u]
+        if filled == k:
+            continue
+        row = u * k
+        if source in owner[row:row + filled]:
+            continue
+        dist[row + filled] = d
+        owner[row + filled] = source
+        count[u] = filled + 1
+        for e in range(offsets[u], offsets[u + 1]):
+            v = neighbors[e]
+            filled = count[v]
+            if filled < k and source not in owner[v * k:v * k + filled]:
+                heapq.heappush(pq, (d + weights[e], v, source))
+
+    return dist, owner
+
+
+# --- Произвольные метки вершин ---
+class LabelIndex:
+    """
+    Интернирование меток вершин: каждая хешируемая метка (строка,
+    кортеж, ...) один раз получает плотный номер 0, 1, 2, ...
+    Номера не переиспользуются, поэтому остаются действительными
+    и после удаления вершин.
+    """
+
+    def __init__(self):
+        self._ids = {}     # метка -> номер
+        self._labels = []  # номер -> метка
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, label) -> bool:
+        return label in self._ids
+
+    def intern(self, label) -> int:
+        i = self._ids.get(label)
+        if i is None:
+            i = len(self._labels)
+            self._ids[label] = i
+            self._labels.append(label)
+        return i
+
+    def get(self, label, default=None):
+        return self._ids.get(label, default)
+
+    def label(self, i: int):
+        return self._labels[i]
+
+    def labels(self, ids: Iterable[int]) -> list:
+        labels = self._labels
+        return [labels[i] for i in ids]
+
+
+class LabeledGraph:
+    """
+    Граф с произвольными хешируемыми метками вершин. Метки переводятся
+    в плотные номера LabelIndex только на границе API; внутри лежит
+    обычный Graph на целых номерах, поэтому поиск путей не хеширует
+    метки, а после freeze() идёт по массивам CSR-снимка.
+    """
+
+    def __init__(self):
+        self.labels = LabelIndex()
+        self.graph = Graph()
+
+    def _id(self, label) -> Optional[int]:
+        i = self.labels.get(label)
+        if i is None or not self.graph.has_vertex(i):
+            return None
+        return i
+
+    def get_version(self) -> int:
+        return self.graph.get_version()
+
+    def add_vertex(self, label) -> None:
+        self.graph.add_vertex(self.labels.intern(label))
+
+    def has_vertex(self, label) -> bool:
+        return self._id(label) is not None
+
+    def add_edge(self, u, v, weight: float = 1.0) -> None:
+        self.graph.add_edge(self.labels.intern(u), self.labels.intern(v), weight)
+
+    def add_edges(self, edges: Iterable[tuple]) -> None:
+        intern = self.labels.intern
+        self.graph.add_edges((intern(edge[0]), intern(edge[1])) + tuple(edge[2:]) for edge in edges)
+
+    def has_edge(self, u, v) -> bool:
+        i, j = self._id(u), self._id(v)
+        return i is not None and j is not None and self.graph.has_edge(i, j)
+
+    def edge_weight(self, u, v) -> float:
+        if not self.has_edge(u, v):
+            raise ValueError(f"Edge ({u!r}, {v!r}) does not exist")
+        return self.graph.edge_weight(self.labels.get(u), self.labels.get(v))
+
+    def get_vertices(self) -> list:
+        """Метки вершин в порядке их добавления."""
+        return self.labels.labels(self.graph.get_vertices())
+
+    def get_adjacent_edges(self, v) -> list:
+        i = self._id(v)
+        if i is None:
+            return []
+        return [(self.labels.label(j), w) for j, w in self.graph.get_adjacent_edges(i)]
+
+    def remove_vertex(self, v) -> None:
+        i = self._id(v)
+        if i is not None:
+            self.graph.remove_vertex(i)
+
+    def remove_edge(self, u, v) -> None:
+        if self.has_edge(u, v):
+            self.graph.remove_edge(self.labels.get(u), self.labels.get(v))
+
+    def freeze(self) -> CSRGraph:
+        return self.graph.freeze()
+
+    def shortest_path(self, start, end, **kwargs) -> Optional[list]:
+        """
+        shortest_path по меткам; именованные аргументы передаются
+        в shortest_path как есть. Граф не замораживается: для серии
+        запросов к неизменному графу сначала вызовите freeze().
+        """
+        s, t = self._id(start), self._id(end)
+        if s is None or t is None:
+            return None
+        path = shortest_path(self.graph, s, t, **kwargs)
+        return None if path is None else self.labels.labels(path)
+
+
+# --- Генератор связного графа ---
+def generate_edge_arrays(n: int, avg_degree: int = 4,
+                         seed: Optional[int] = None) -> Tuple[array, array, array]:
+    """
+    Рёбра связного графа на вершинах 0..n-1: цепочка i - (i + 1) плюс
+    случайные рёбра до n * avg_degree // 2 рёбер всего. Ключи рёбер
+    u * n + v (u < v) хранятся в array('q'), 8 байт на ребро: пачка
+    из недостающего числа кандидатов без петель дописывается к ним,
+    всё сортируется, и повторы, стоящие рядом, выбрасываются. Пачка
+    не больше недостающего, поэтому лишних рёбер не бывает.
+    Возвращает массивы (us, vs, ws), упорядоченные по (u, v).
+    seed задаёт собственный генератор; без него используется модуль random.
+    Работа идёт по элементам в Python: 10^6 вершин — секунды, 10^7 —
+    десятки секунд.
+    """
+    rng = random.Random(seed) if seed is not None else random
+    rand = rng.random
+    total = min(max(n * avg_degree // 2, n - 1), n * (n - 1) // 2)
+    keys = array('q', range(1, (n - 1) * (n + 1), n + 1))  # цепочка: i * n + i + 1
+    while len(keys) < total:
+        need = total - len(keys)
+        us = [int(rand() * n) for _ in range(need)]
+        vs = [int(rand() * n) for _ in range(need)]
+        keys.extend([u * n + v if u < v else v * n + u for u, v in zip(us, vs) if u != v])
+        packed = sorted(keys)
+        del keys
+        keys = array('q', compress(packed, map(int.__ne__, packed, [-1] + packed)))
+    packed = keys
+
+    us = array('q', [key // n for key in packed])
+    vs = array('q', [key % n for key in packed])
+    ws = array('d', [0.5 + 4.5 * rand() for _ in range(len(packed))])
+    return us, vs, ws
+
+
+def generate_connected_graph(n: int, avg_degree: int = 4, seed: Optional[int] = None,
+                             compact: bool = False) -> Union[Graph, CSRGraph]:
+    """
+    Генерирует связный взвешенный граф с n вершинами.
+    Средняя степень вершин ~ avg_degree.
+    compact=True возвращает сразу CSRGraph, минуя словарный Graph.
+    """
+    us, vs, ws = generate_edge_arrays(n, avg_degree, seed)
+    if compact:
+        return csr_from_sorted_edges(n, us, vs, ws)
+
+    g = Graph()
+    for i in range(n):
+        g.add_vertex(i)
+    g.add_edges(zip(us, vs, ws))
+    return g
+
+
+def csr_from_sorted_edges(n: int, us: array, vs: array, ws: array) -> CSRGraph:
+    """
+    CSR для вершин 0..n-1 из рёбер u < v, отсортированных по (u, v).
+    Строка x собирается из рёбер (u, x) с u < x — они идут раньше и по
+    возрастанию u, — и затем рёбер (x, v) по возрастанию v, так что
+    строки получаются упорядоченными без сортировки.
+    """
+    offsets = array('q', [0]) * (n + 1)
+    for u, v in zip(us, vs):
+        offsets[u + 1] += 1
+        offsets[v + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    neighbors = array('q', [0]) * offsets[n]
+    weights = array('d', [0.0]) * offsets[n]
+    fill = array('q', offsets[:n])
+    for u, v, w in zip(us, vs, ws):
+        k = fill[u]
+        neighbors[k] = v
+        weights[k] = w
+        fill[u] = k + 1
+        k = fill[v]
+        neighbors[k] = u
+        weights[k] = w
+        fill[v] = k + 1
+    return CSRGraph(range(n), offsets, neighbors, weights, _RangeIndex(n))
+
+
+def generate_grid_graph(rows: int, cols: int) -> Graph:
+    """
+    Генерирует взвешенную решётку rows x cols — грубую модель дорожной
+    сети (планарный граф с малой степенью вершин).
+    """
+    g = Graph()
+    for r in range(rows):
+        for c in range(cols):
+            v = r * cols + c
+            g.add_vertex(v)
+            if c + 1 < cols:
+                g.add_edge(v, v + 1, random.uniform(0.5, 5.0))
+            if r + 1 < rows:
+                g.add_edge(v, v + cols, random.uniform(0.5, 5.0))
+    return g
+
+
+# --- Встроенные тесты ---
+def test_empty_graph():
+    g = Graph()
+    assert not g.has_vertex(0)
+    assert not g.has_edge(0, 1)
+
+def test_one_vertex():
+    g = Graph()
+    g.add_vertex(0)
+    assert g.has_vertex(0)
+    assert not g.has_vertex(1)
+    assert not g.has_edge(0, 1)
+
+def test_two_vertices():
+    g = Graph()
+    g.add_vertex(0)
+    g.add_vertex(1)
+    assert g.has_vertex(0)
+    assert g.has_vertex(1)
+    assert not g.has_edge(0, 1)
+
+def test_one_edge():
+    g = Graph()
+    g.add_edge(0, 1, 5.0)
+    assert g.has_vertex(0)
+    assert g.has_vertex(1)
+    assert g.has_edge(0, 1)
+    assert g.has_edge(1, 0)
+    assert g.edge_weight(0, 1) == 5.0
+    assert not g.has_edge(0, 0)
+
+def test_loop():
+    g = Graph()
+    g.add_edge(0, 0)
+    g.add_edge(1, 1)
+    assert g.has_vertex(0)
+    assert g.has_vertex(1)
+    assert g.has_edge(0, 0)
+    assert g.has_edge(1, 1)
+
+def test_two_edges():
+    g = Graph()
+    g.add_edge(0, 1)
+    g.add_edge(0, 3)
+    assert g.has_vertex(0)
+    assert g.has_vertex(1)
+    assert g.has_vertex(3)
+    assert g.has_edge(0, 1)
+    assert g.has_edge(0, 3)
+    assert g.has_edge(1, 0)
+    assert g.has_edge(3, 0)
+    assert not g.has_edge(1, 3)
+
+def test_get_vertices():
+    g = Graph()
+    g.add_vertex(0)
+    g.add_edge(0, 1)
+    g.add_vertex(3)
+    assert g.get_vertices() == [0, 1, 3]
+
+def test_get_adjacent_vertices():
+    g = Graph()
+    g.add_vertex(0)
+    g.add_edge(0, 1)
+    g.add_edge(0, 2, 4.5)
+    g.add_edge(1, 2, 3.0)
+    g.add_edge(1, 3)
+    assert g.get_adjacent_vertices(0) == [1, 2]
+    assert g.get_adjacent_vertices(1) == [0, 2, 3]
+    assert g.get_adjacent_vertices(2) == [0, 1]
+    assert g.get_adjacent_vertices(3) == [1]
+    assert g.get_adjacent_vertices(4) == []
+    assert g.edge_weight(1, 2) == 3.0
+    assert g.edge_weight(2, 0) == 4.5
+    try:
+        g.edge_weight(0, 3)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_get_adjacent_edges():
+    g = Graph()
+    g.add_edge(0, 1)
+    g.add_edge(0, 2, 4.5)
+    g.add_edge(1, 2, 3.0)
+    g.add_edge(3, 1, 7.2)
+    edges_0 = set(g.get_adjacent_edges(0))
+    assert edges_0 == {(1, 1.0), (2, 4.5)}
+    edges_1 = set(g.get_adjacent_edges(1))
+    assert edges_1 == {(0, 1.0), (2, 3.0), (3, 7.2)}
+    edges_2 = set(g.get_adjacent_edges(2))
+    assert edges_2 == {(0, 4.5), (1, 3.0)}
+    edges_3 = set(g.get_adjacent_edges(3))
+    assert edges_3 == {(1, 7.2)}
+    assert g.get_adjacent_edges(4) == []
+
+def test_replace_an_edge():
+    g = Graph()
+    g.add_edge(1, 5, 3.5)
+    g.add_edge(5, 1, 4.7)
+    assert g.has_edge(1, 5)
+    assert g.has_edge(5, 1)
+    assert g.edge_weight(1, 5) == 4.7
+    assert g.edge_weight(5, 1) == 4.7
+
+def test_remove_vertices_and_edges():
+    g = Graph()
+    g.add_edge(0, 1)
+    g.add_edge(0, 2)
+    g.add_edge(0, 3)
+    g.add_edge(0, 4)
+    g.add_edge(1, 2)
+    g.add_edge(1, 3)
+    g.add_edge(2, 3)
+    g.add_edge(2, 4)
+    g.remove_vertex(2)
+    assert not g.has_vertex(2)
+    assert not g.has_edge(1, 2)
+    assert not g.has_edge(3, 2)
+    assert not g.has_edge(4, 2)
+    assert g.has_edge(0, 1)
+    assert g.has_edge(0, 4)
+    assert g.has_edge(1, 3)
+    g.remove_edge(0, 1)
+    assert not g.has_edge(0, 1)
+    assert g.has_vertex(0)
+    assert g.has_vertex(1)
+
+def test_csr_layout():
+    g = Graph()
+    g.add_edge(5, 1, 2.0)
+    g.add_edge(5, 3, 1.5)
+    g.add_vertex(7)
+    csr = g.to_csr()
+    assert csr.vertex_ids == [1, 3, 5, 7]
+    assert list(csr.offsets) == [0, 1, 2, 4, 4]
+    assert list(csr.neighbors) == [2, 2, 0, 1]
+    assert list(csr.weights) == [2.0, 1.5, 2.0, 1.5]
+    assert csr.get_adjacent_edges(5) == g.get_adjacent_edges(5)
+    assert csr.get_adjacent_edges(7) == []
+
+def test_csr_shortest_path_matches():
+    random.seed(1)
+    g = generate_connected_graph(200, avg_degree=4)
+    g.add_vertex(1000)  # изолированная вершина
+    csr = g.to_csr()
+    for _ in range(50):
+        s, t = random.randrange(200), random.randrange(200)
+        assert shortest_path_csr(csr, s, t) == shortest_path(g, s, t)
+    assert shortest_path_csr(csr, 0, 1000) is None
+    assert shortest_path_csr(csr, 0, -1) is None
+    assert shortest_path_csr(csr, 3, 3) == [3]
+
+def test_freeze():
+    g = Graph()
+    g.add_edge(0, 1, 1.0)
+    g.add_edge(1, 2, 1.0)
+    g.add_edge(0, 2, 5.0)
+    assert g.freeze() is g.freeze()
+    assert g.is_frozen()
+    assert shortest_path(g, 0, 2) == [0, 1, 2]
+    g.remove_edge(1, 2)
+    assert not g.is_frozen()
+    assert shortest_path(g, 0, 2) == [0, 2]
+    g.freeze()
+    g.add_edge(2, 3)
+    assert not g.is_frozen()
+    assert shortest_path(g, 0, 3) == [0, 2, 3]
+
+def test_bidirectional_matches():
+    random.seed(2)
+    g = generate_connected_graph(300, avg_degree=4)
+    g.add_vertex(1000)
+    for _ in range(50):
+        s, t = random.randrange(300), random.randrange(300)
+        stats = {}
+        assert shortest_path(g, s, t, bidirectional=True, stats=stats) == shortest_path(g, s, t)
+        assert stats['settled'] >= 1
+    assert shortest_path(g, 0, 1000, bidirectional=True) is None
+    assert shortest_path(g, 0, -1, bidirectional=True) is None
+    assert shortest_path(g, 7, 7, bidirectional=True) == [7]
+
+def test_bidirectional_small():
+    g = Graph()
+    g.add_edge(0, 1, 1.0)
+    assert shortest_path(g, 0, 1, bidirectional=True) == [0, 1]
+    g.add_edge(1, 2, 1.0)
+    g.add_edge(2, 3, 1.0)
+    g.add_edge(0, 3, 10.0)
+    assert shortest_path(g, 0, 3, bidirectional=True) == [0, 1, 2, 3]
+    assert shortest_path(g, 3, 0, bidirectional=True) == [3, 2, 1, 0]
+
+def test_alt_matches():
+    random.seed(3)
+    g = generate_connected_graph(300, avg_degree=4)
+    g.add_edge(1000, 1001, 2.0)  # отдельная компонента
+    for method in ('farthest', 'random'):
+        index = build_landmarks(g, k=4, method=method)
+        assert len(index.landmarks) == 4
+        assert index.nbytes() == 4 * 302 * 8
+        for _ in range(50):
+            s, t = random.randrange(300), random.randrange(300)
+            assert alt_shortest_path(index, s, t) == shortest_path(g, s, t)
+        assert alt_shortest_path(index, 0, 1001) is None
+        assert alt_shortest_path(index, 1000, 1001) == [1000, 1001]
+        assert alt_shortest_path(index, 0, -1) is None
+    try:
+        build_landmarks(g, method='nearest')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_alt_small_graph():
+    g = Graph()
+    g.add_vertex(0)
+    index = build_landmarks(g, k=8)
+    assert index.landmarks == [0]
+    assert alt_shortest_path(index, 0, 0) == [0]
+
+
+def test_contraction_hierarchy_matches():
+    random.seed(4)
+    g = generate_connected_graph(300, avg_degree=4)
+    g.add_edge(1000, 1001, 2.0)
+    g.add_edge(5, 5, 1.0)  # петля не влияет на пути
+    ch = build_contraction_hierarchy(g)
+    assert sorted(ch.rank) == list(range(302))
+    for _ in range(100):
+        s, t = random.randrange(300), random.randrange(300)
+        assert ch_shortest_path(ch, s, t) == shortest_path(g, s, t)
+    assert ch_shortest_path(ch, 0, 1001) is None
+    assert ch_shortest_path(ch, 1001, 1000) == [1001, 1000]
+    assert ch_shortest_path(ch, 9, 9) == [9]
+    assert ch_shortest_path(ch, 0, -1) is None
+
+def test_contraction_hierarchy_shortcut_unpacking():
+    # Звезда с центром 0: стягивание центра требует шорткатов
+    g = Graph()
+    for leaf in (1, 2, 3, 4):
+        g.add_edge(0, leaf, 1.0)
+    g.add_edge(1, 2, 5.0)
+    ch = build_contraction_hierarchy(g)
+    for s in (1, 2, 3, 4):
+        for t in (1, 2, 3, 4):
+            if s != t:
+                assert ch_shortest_path(ch, s, t) == [s, 0, t]
+
+def test_contraction_hierarchy_save_load():
+    import os
+    import tempfile
+    random.seed(5)
+    g = generate_connected_graph(100, avg_degree=4)
+    ch = build_contraction_hierarchy(g)
+    fd, path = tempfile.mkstemp(suffix='.ch')
+    os.close(fd)
+    try:
+        ch.save(path)
+        loaded = ContractionHierarchy.load(path)
+        assert loaded.num_shortcuts() == ch.num_shortcuts()
+        for _ in range(20):
+            s, t = random.randrange(100), random.randrange(100)
+            assert ch_shortest_path(loaded, s, t) == shortest_path(g, s, t)
+        g.save(path)  # файл графа, а не иерархии
+        for data in (None, pickle.dumps({'format': 'contraction_hierarchy', 'version': 1})):
+            if data is not None:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            try:
+                ContractionHierarchy.load(path)
+                assert False, "Expected ValueError"
+            except ValueError:
+                pass
+        ch.save(path)
+        with open(path, 'ab') as f:
+            f.write(b'\0' * 8)
+        try:
+            ContractionHierarchy.load(path)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    finally:
+        os.remove(path)
+
+def test_shortest_paths_batch():
+    random.seed(6)
+    g = generate_connected_graph(200, avg_degree=4)
+    g.add_vertex(1000)
+    sources = [random.randrange(200) for _ in range(5)]
+    pairs = [(s, random.randrange(200)) for s in sources for _ in range(4)]
+    pairs += [(sources[0], 1000), (-1, 0), (3, 3)]
+    for workers in (1, 2):
+        paths = shortest_paths_batch(g, pairs, workers=workers, chunk_size=2)
+        assert set(paths) == set(pairs)
+        for s, t in pairs:
+            assert paths[(s, t)] == shortest_path(g, s, t)
+    assert shortest_paths_batch(g, []) == {}
+
+def test_shortest_path_cache():
+    random.seed(7)
+    g = generate_connected_graph(100, avg_degree=4)
+    cache = ShortestPathCache(capacity=2)
+    for t in range(100):
+        assert shortest_path(g, 0, t, cache=cache) == shortest_path(g, 0, t)
+    assert cache.stats() == {'hits': 99, 'misses': 1, 'evictions': 0, 'invalidations': 0, 'size': 1}
+    shortest_path(g, 1, 5, cache=cache)
+    shortest_path(g, 2, 5, cache=cache)
+    assert cache.evictions == 1 and len(cache) == 2
+    shortest_path(g, 0, 5, cache=cache)
+    assert cache.misses == 4
+    assert shortest_path(g, 0, 1000, cache=cache) is None
+    # Незамороженный граф: один снимок на версию для всех деревьев
+    assert not g.is_frozen()
+    snapshots = {id(cache.tree(g, s)[0]) for s in range(10)}
+    assert len(snapshots) == 1
+    g.freeze()
+    assert cache.tree(g, 50)[0] is not g._csr  # версия та же, снимок кэша остаётся
+    cache.clear()
+    assert cache.tree(g, 50)[0] is g._csr and len(cache) == 1
+
+def test_shortest_path_cache_invalidation():
+    g = Graph()
+    g.add_edge(0, 1, 1.0)
+    g.add_edge(1, 2, 1.0)
+    g.add_edge(0, 2, 5.0)
+    cache = ShortestPathCache()
+    version = g.get_version()
+    assert shortest_path(g, 0, 2, cache=cache) == [0, 1, 2]
+    g.remove_edge(1, 2)
+    assert g.get_version() > version
+    assert shortest_path(g, 0, 2, cache=cache) == [0, 2]
+    g.add_edge(0, 2, 10.0)
+    g.add_edge(1, 2, 2.0)
+    assert shortest_path(g, 0, 2, cache=cache) == [0, 1, 2]
+    g.remove_vertex(1)
+    assert shortest_path(g, 0, 2, cache=cache) == [0, 2]
+    g.add_vertex(3)
+    assert shortest_path(g, 0, 3, cache=cache) is None
+    assert cache.invalidations == 4 and cache.hits == 0
+    assert not g.is_frozen()
+
+    # Изменение графа сбрасывает деревья всех источников сразу
+    for s in (0, 2, 3):
+        shortest_path(g, s, 0, cache=cache)
+    assert len(cache) == 3
+    g.add_edge(2, 3, 1.0)
+    stats = {}
+    assert shortest_path(g, 0, 3, cache=cache, stats=stats) == [0, 2, 3]
+    assert len(cache) == 1 and cache.invalidations == 7 and stats['engine'] == 'cache'
+    for kwargs in ({'bidirectional': True}, {'engine': 'heap'}):
+        try:
+            shortest_path(g, 0, 3, cache=cache, **kwargs)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    try:
+        ShortestPathCache(capacity=0)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_indexed_heap():
+    pq = IndexedHeap(6)
+    for v, key in [(0, 5.0), (1, 3.0), (2, 8.0), (3, 3.0), (4, 1.0)]:
+        pq.push(v, key)
+    assert len(pq) == 5 and 2 in pq and 5 not in pq
+    pq.decrease_key(2, 0.5)
+    pq.push_or_decrease(0, 7.0)  # ключ больше — без изменений
+    pq.push_or_decrease(5, 3.0)
+    popped = [pq.pop() for _ in range(6)]
+    assert popped == [(0.5, 2), (1.0, 4), (3.0, 1), (3.0, 3), (3.0, 5), (5.0, 0)]
+    assert len(pq) == 0 and 2 not in pq
+    for call in (lambda: pq.decrease_key(1, 0.0), lambda: pq.pop()):
+        try:
+            call()
+            assert False, "Expected an exception"
+        except (ValueError, IndexError):
+            pass
+    pq.push(1, 2.0)
+    try:
+        pq.decrease_key(1, 4.0)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_indexed_heap_random():
+    random.seed(8)
+    pq = IndexedHeap(500)
+    keys = {}
+    for v in range(500):
+        keys[v] = random.random()
+        pq.push(v, keys[v])
+    for v in random.sample(range(500), 200):
+        keys[v] /= 2
+        pq.decrease_key(v, keys[v])
+    assert [pq.pop()[1] for _ in range(500)] == sorted(keys, key=lambda v: (keys[v], v))
+
+def test_indexed_heap_engine():
+    random.seed(9)
+    g = generate_connected_graph(300, avg_degree=6)
+    for _ in range(50):
+        s, t = random.randrange(300), random.randrange(300)
+        lazy, indexed = {}, {}
+        expected = shortest_path_csr(g.to_csr(), s, t, stats=lazy)
+        assert shortest_path(g, s, t, engine='indexed', stats=indexed) == expected
+        assert indexed['settled'] == lazy['settled']
+        assert indexed['max_heap_size'] <= lazy['max_heap_size']
+    assert not g.is_frozen()
+    g.freeze()
+    assert shortest_path(g, 0, 299, engine='indexed') == shortest_path(g, 0, 299, engine='heap')
+    try:
+        shortest_path(g, 0, 1, engine='fibonacci')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_small_integer_weight_tracking():
+    g = Graph()
+    g.add_edge(0, 1)
+    g.add_edge(1, 2, 7)
+    assert g.has_small_integer_weights()
+    g.add_edge(2, 3, 1.5)
+    assert not g.has_small_integer_weights()
+    g.add_edge(3, 2, 4.0)  # замена ребра
+    assert g.has_small_integer_weights()
+    g.add_edge(3, 4, DIAL_MAX_WEIGHT + 1)
+    g.add_edge(4, 5, -1)
+    assert not g.has_small_integer_weights()
+    g.remove_edge(3, 4)
+    assert not g.has_small_integer_weights()
+    g.remove_vertex(5)
+    assert g.has_small_integer_weights()
+    assert not is_small_integer_weight(float('inf'))
+    assert not is_small_integer_weight("1")
+
+def test_dial_matches_heap():
+    random.seed(10)
+    for max_weight in (1, 3, 20):
+        g = Graph()
+        for i in range(300):
+            g.add_edge(i, (i + 1) % 300, random.randint(0, max_weight))
+        for _ in range(600):
+            g.add_edge(random.randrange(300), random.randrange(300), random.randint(0, max_weight))
+        g.add_vertex(1000)
+        for _ in range(50):
+            s, t = random.randrange(300), random.randrange(300)
+            stats = {}
+            assert shortest_path(g, s, t, stats=stats) == shortest_path(g, s, t, engine='heap')
+            assert stats['engine'] == 'dial'
+            assert shortest_path(g, s, t) == dial_shortest_path(g.to_csr(), s, t)
+        assert not g.is_frozen()
+        assert shortest_path(g, 0, 1000) is None
+        assert shortest_path(g, 0, -1) is None
+        g.freeze()
+        assert shortest_path(g, 0, 150) == shortest_path(g, 0, 150, engine='heap')
+
+def test_dial_rejects_fractional_weights():
+    g = Graph()
+    g.add_edge(0, 1, 0.5)
+    g.add_edge(1, 2, 1.5)
+    stats = {}
+    assert shortest_path(g, 0, 1, stats=stats) == [0, 1]
+    assert stats['engine'] == 'heap'
+    try:
+        shortest_path(g, 0, 1, engine='dial')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_uniform_weight_tracking():
+    g = Graph()
+    assert g.has_uniform_weights() and choose_engine(g) == 'bfs'
+    g.add_edge(0, 1)
+    g.add_edge(1, 2, 1)
+    assert g.has_uniform_weights()
+    g.add_edge(2, 3, 2.0)
+    assert not g.has_uniform_weights() and choose_engine(g) == 'dial'
+    g.add_edge(3, 4, 2.5)
+    assert choose_engine(g) == 'heap'
+    g.remove_edge(4, 3)
+    g.add_edge(2, 3, 1.0)
+    assert g.has_uniform_weights()
+    g.add_edge(5, 6, 3.0)
+    g.remove_vertex(6)
+    assert g.has_uniform_weights()
+
+def test_bfs_shortest_path():
+    random.seed(11)
+    g = Graph()
+    for i in range(299):
+        g.add_edge(i, i + 1)
+    for _ in range(300):
+        u, v = random.randrange(300), random.randrange(300)
+        g.add_edge(u, v)
+    g.add_vertex(1000)
+    for _ in range(50):
+        s, t = random.randrange(300), random.randrange(300)
+        stats = {}
+        path = shortest_path(g, s, t, stats=stats)
+        assert stats['engine'] == 'bfs'
+        assert path[0] == s and path[-1] == t
+        assert all(g.has_edge(a, b) for a, b in zip(path, path[1:]))
+        assert len(path) == len(shortest_path(g, s, t, engine='heap'))
+    assert shortest_path(g, 0, 1000) is None
+    assert shortest_path(g, 0, -1) is None
+    assert shortest_path(g, 4, 4) == [4]
+
+def test_graph_file_roundtrip():
+    import os
+    import tempfile
+    random.seed(12)
+    g = generate_connected_graph(200, avg_degree=4)
+    sparse = Graph()
+    sparse.add_edge(-5, 40, 2.5)
+    sparse.add_edge(40, 7, 1.0)
+    sparse.add_vertex(100)
+    fd, path = tempfile.mkstemp(suffix='.csr')
+    os.close(fd)
+    try:
+        for graph in (g, sparse):
+            graph.save(path)
+            for use_mmap in (True, False):
+                loaded = Graph.load(path, mmap=use_mmap)
+                expected = graph.to_csr()
+                assert list(loaded.vertex_ids) == expected.vertex_ids
+                assert list(loaded.offsets) == list(expected.offsets)
+                assert list(loaded.neighbors) == list(expected.neighbors)
+                assert list(loaded.weights) == list(expected.weights)
+                ids = expected.vertex_ids
+                for _ in range(20):
+                    s, t = random.choice(ids), random.choice(ids)
+                    expected_path = shortest_path(graph, s, t, engine='heap')
+                    assert shortest_path_csr(loaded, s, t) == expected_path
+                    assert shortest_path(loaded, s, t) == expected_path
+                    assert shortest_path(loaded, s, t, engine='indexed') == expected_path
+                copy = loaded.to_graph()
+                assert copy.get_vertices() == graph.get_vertices()
+                assert all(copy.get_adjacent_edges(v) == graph.get_adjacent_edges(v) for v in ids)
+                assert pickle.loads(pickle.dumps(loaded)).get_adjacent_edges(ids[0]) == \
+                    graph.get_adjacent_edges(ids[0])
+        assert Graph.load(path).index.get(-1) is None
+        stats = {}
+        assert shortest_path(Graph.load(path), -5, 7, stats=stats) == [-5, 40, 7]
+        assert stats['engine'] == 'heap'
+        assert shortest_path(Graph.load(path), -5, 100) is None
+        try:
+            shortest_path(Graph.load(path), -5, 7, bidirectional=True)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+        # Отображённый снимок передаётся по имени файла; если файл
+        # подменили, распаковка отказывается, а не читает чужой граф
+        g.save(path)
+        payload = pickle.dumps(Graph.load(path))
+        sparse.save(path + '.new')
+        os.replace(path + '.new', path)
+        try:
+            pickle.loads(payload)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+        assert pickle.loads(pickle.dumps(Graph.load(path, mmap=False))).get_adjacent_edges(40) == \
+            sparse.get_adjacent_edges(40)
+    finally:
+        os.remove(path)
+
+def test_graph_file_errors():
+    import os
+    import tempfile
+    fd, path = tempfile.mkstemp(suffix='.csr')
+    os.close(fd)
+    try:
+        g = Graph()
+        g.add_edge(0, 1)
+        g.save(path)
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 8)
+        with open(path + '.bad', 'wb') as f:
+            f.write(b'not a graph file at all, definitely not')
+        for bad in (path, path + '.bad'):
+            try:
+                Graph.load(bad)
+                assert False, "Expected ValueError"
+            except ValueError:
+                pass
+        os.remove(path + '.bad')
+        labelled = Graph()
+        labelled.add_edge('a', 'b')
+        try:
+            labelled.save(path)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    finally:
+        os.remove(path)
+
+def test_load_edge_list():
+    import os
+    import tempfile
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w') as f:
+        f.write("# u v w\n0 1 2.5\n1 2 1.0\n\n10 2 4\n2 2 3.0\n  # comment\n0 1 0.5\n-3 10 7.25")
+    try:
+        expected = Graph()
+        for u, v, w in [(0, 1, 2.5), (1, 2, 1.0), (10, 2, 4.0), (2, 2, 3.0), (0, 1, 0.5), (-3, 10, 7.25)]:
+            expected.add_edge(u, v, w)
+        for chunk_size in (7, 64, 1 << 20):
+            stats = {}
+            g = load_edge_list(path, chunk_size=chunk_size, stats=stats)
+            assert stats['edges'] == 6 and stats['edges_per_sec'] > 0
+            assert g.get_vertices() == expected.get_vertices()
+            for v in expected.get_vertices():
+                assert g.get_adjacent_edges(v) == expected.get_adjacent_edges(v)
+            csr = load_edge_list(path, compact=True, chunk_size=chunk_size)
+            reference = expected.to_csr()
+            assert csr.vertex_ids == reference.vertex_ids
+            assert list(csr.offsets) == list(reference.offsets)
+            assert list(csr.neighbors) == list(reference.neighbors)
+            assert list(csr.weights) == list(reference.weights)
+    finally:
+        os.remove(path)
+
+def test_load_edge_list_roundtrip_and_errors():
+    import os
+    import tempfile
+    random.seed(13)
+    g = generate_connected_graph(300, avg_degree=4)
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        write_edge_list(g, path)
+        csr = load_edge_list(path, compact=True, chunk_size=256)
+        for _ in range(20):
+            s, t = random.randrange(300), random.randrange(300)
+            assert shortest_path_csr(csr, s, t) == shortest_path(g, s, t)
+        with open(path, 'a') as f:
+            f.write("1 2\n")
+        try:
+            load_edge_list(path)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    finally:
+        os.remove(path)
+    us, vs, ws = parse_edge_chunk(b"# comment\n1 2 0.5\n\n  3 4 1\r\n5 6 2")
+    assert (list(us), list(vs), list(ws)) == ([1, 3, 5], [2, 4, 6], [0.5, 1.0, 2.0])
+    assert [len(column) for column in parse_edge_chunk(b"")] == [0, 0, 0]
+    # Число полей в блоке кратно трём, но строки не из трёх полей
+    for bad in (b"1 2\n3 4 5 6\n", b"1 2 3 4 5 6\n", b"1\n2 3 4 5\n6 7 8\n"):
+        try:
+            parse_edge_chunk(bad)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+def test_generate_connected_graph():
+    g = generate_connected_graph(500, avg_degree=6, seed=42)
+    assert g.get_vertices() == list(range(500))
+    assert sum(len(g._edges[v]) for v in g._edges) // 2 == 500 * 6 // 2
+    assert all(g.has_edge(i, i + 1) for i in range(499))
+    assert not any(g.has_edge(v, v) for v in range(500))
+    assert all(0.5 <= w <= 5.0 for v in g._edges for w in g._edges[v].values())
+    same = generate_connected_graph(500, avg_degree=6, seed=42)
+    assert all(same.get_adjacent_edges(v) == g.get_adjacent_edges(v) for v in range(500))
+    csr = generate_connected_graph(500, avg_degree=6, seed=42, compact=True)
+    reference = g.to_csr()
+    assert list(csr.offsets) == list(reference.offsets)
+    assert list(csr.neighbors) == list(reference.neighbors)
+    assert list(csr.weights) == list(reference.weights)
+    assert shortest_path_csr(csr, 0, 499) == shortest_path(g, 0, 499)
+    # Плотность больше возможной ограничивается полным графом
+    full = generate_connected_graph(6, avg_degree=50, seed=1)
+    assert all(len(full._edges[v]) == 5 for v in range(6))
+    assert generate_connected_graph(1, seed=1).get_vertices() == [0]
+    assert generate_connected_graph(0, seed=1, compact=True).num_vertices() == 0
+
+def test_bulk_updates():
+    g = Graph()
+    g.add_edges([(0, 1), (1, 2, 2.5), (2, 3, 2.5), (3, 0, 1.0), (2, 2, 4.0), (0, 1, 3.0)])
+    assert g.edge_weight(0, 1) == 3.0
+    assert g.get_adjacent_vertices(2) == [1, 2, 3]
+    version = g.get_version()
+    g.remove_edges([(1, 2), (5, 6), (2, 2)])
+    assert g.get_version() == version + 1
+    assert not g.has_edge(2, 1) and not g.has_edge(2, 2) and g.has_edge(2, 3)
+    g.remove_edges([(7, 8)])
+    assert g.get_version() == version + 1
+    g.add_edge(4, 4, 1.0)
+    g.remove_vertices([4, 0, 42])
+    assert g.get_vertices() == [1, 2, 3]
+    assert g.get_adjacent_vertices(1) == [] and g.get_adjacent_vertices(3) == [2]
+    assert not g.has_small_integer_weights() and g.has_uniform_weights()
+    g.remove_vertex(2)
+    assert g.has_small_integer_weights()
+    assert g.get_adjacent_vertices(3) == []
+    # Пустая пачка не меняет версию и не сбрасывает снимок
+    g.freeze()
+    version = g.get_version()
+    g.add_edges([])
+    g.remove_edges([])
+    g.remove_vertices([])
+    assert g.get_version() == version and g.is_frozen()
+
+    # Пачка, оборвавшаяся на ошибке, всё равно сбрасывает снимок
+    def broken(items):
+        yield from items
+        raise RuntimeError("source failed")
+    for mutate, items in ((g.add_edges, [(10, 11, 2.0)]), (g.remove_edges, [(10, 11)]),
+                          (g.remove_vertices, [10])):
+        g.freeze()
+        version = g.get_version()
+        try:
+            mutate(broken(items))
+            assert False, "Expected RuntimeError"
+        except RuntimeError:
+            pass
+        assert g.get_version() == version + 1 and not g.is_frozen()
+    assert g.get_vertices() == [1, 3, 11]
+    assert shortest_path(g, 1, 11) is None
+
+def test_delta_stepping():
+    g = generate_connected_graph(400, avg_degree=5, seed=14)
+    g.add_edge(1000, 1001, 1.0)
+    csr = g.to_csr()
+    expected, _ = shortest_path_tree_csr(csr, 0)
+    for delta in (0.3, 1.0, 2.75, 100.0):
+        dist, _ = delta_stepping_sssp(g, 0, delta=delta)
+        assert list(dist) == list(expected)
+    dist, _ = delta_stepping_sssp(csr, 0, workers=2, min_parallel=1)
+    assert list(dist) == list(expected)
+    rng = random.Random(14)
+    for _ in range(20):
+        s, t = rng.randrange(400), rng.randrange(400)
+        assert shortest_path_delta(g, s, t, delta=1.5) == shortest_path(g, s, t)
+    assert shortest_path_delta(g, 0, 1001) is None
+    assert shortest_path_delta(g, 0, -1) is None
+    for bad in (lambda: delta_stepping_sssp(g, -1), lambda: delta_stepping_sssp(g, 0, delta=0)):
+        try:
+            bad()
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+def test_dynamic_shortest_path_tree():
+    g = generate_connected_graph(200, avg_degree=4, seed=15)
+    tree = DynamicShortestPathTree(g, 0)
+    assert not g.is_frozen()
+    rng = random.Random(15)
+
+    def check():
+        csr = g.to_csr()
+        dist, _ = shortest_path_tree_csr(csr, csr.index[0])
+        for i, v in enumerate(csr.vertex_ids):
+            assert tree.distance(v) == dist[i]
+            path = tree.shortest_path(v)
+            if dist[i] == float('inf'):
+                assert path is None
+            else:
+                assert path[0] == 0 and path[-1] == v
+                assert abs(sum(g.edge_weight(a, b) for a, b in zip(path, path[1:])) - dist[i]) < 1e-9
+
+    for step in range(300):
+        u = rng.randrange(210)
+        adjacent = g.get_adjacent_vertices(u)
+        action = rng.random()
+        if adjacent and action < 0.3:
+            tree.remove_edge(u, rng.choice(adjacent))
+        elif adjacent and action < 0.7:
+            v = rng.choice(adjacent)
+            tree.add_edge(u, v, g.edge_weight(u, v) * rng.choice((0.5, 2.0, 5.0)))
+        else:
+            tree.add_edge(u, rng.randrange(210), rng.uniform(1.0, 10.0))
+        if step % 25 == 0:
+            check()
+    check()
+    assert tree.rebuilds == 1 and tree.updates == 300
+
+    # Изменение ребра вне дерева ничего не затрагивает
+    g = Graph()
+    g.add_edge(0, 1, 1.0)
+    g.add_edge(1, 2, 1.0)
+    g.add_edge(0, 2, 5.0)
+    tree = DynamicShortestPathTree(g, 0)
+    tree.add_edge(0, 2, 7.0)
+    assert tree.last_touched == 0
+    tree.remove_edge(1, 2)
+    assert tree.last_touched == 1 and tree.shortest_path(2) == [0, 2]
+    tree.remove_edge(0, 2)
+    assert tree.distance(2) == float('inf') and tree.shortest_path(2) is None
+    tree.add_edge(2, 3, 1.0)
+    assert tree.shortest_path(3) is None
+    g.add_edge(1, 3, 1.0)  # в обход дерева
+    assert tree.shortest_path(3) == [0, 1, 3] and tree.rebuilds == 2
+    try:
+        DynamicShortestPathTree(g, 42)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_nearest_facilities():
+    g = generate_connected_graph(300, avg_degree=4, seed=16)
+    g.add_edge(1000, 1001, 1.0)
+    csr = g.to_csr()
+    facilities = [5, 70, 150, 299]
+    trees = [shortest_path_tree_csr(csr, csr.index[f])[0] for f in facilities]
+    dist, owner = nearest_facilities(g, facilities)
+    for i in range(csr.num_vertices()):
+        best = min(tree[i] for tree in trees)
+        assert dist[i] == best
+        if best == float('inf'):
+            assert owner[i] == -1
+        else:
+            assert trees[owner[i]][i] == best
+    for f in facilities:
+        assert dist[csr.index[f]] == 0.0
+
+    k = 3
+    kdist, kowner = k_nearest_facilities(csr, facilities, k)
+    for i in range(csr.num_vertices()):
+        expected = sorted(tree[i] for tree in trees)[:k]
+        row = list(kdist[i * k:(i + 1) * k])
+        owners = list(kowner[i * k:(i + 1) * k])
+        if expected[0] == float('inf'):
+            assert owners == [-1] * k
+            continue
+        assert row == expected
+        assert len(set(owners)) == k
+        for d, number in zip(row, owners):
+            assert trees[number][i] == d
+    kdist, kowner = k_nearest_facilities(csr, facilities, 1)
+    assert list(kdist) == list(dist)
+    # Повтор вершины — тот же объект, а не второй объект на расстоянии 0
+    repeated = [5, 70, 5, 150, 299, 70]
+    rdist, rowner = nearest_facilities(g, repeated)
+    assert list(rdist) == list(dist)
+    assert set(rowner) <= {-1, 0, 1, 3, 4}
+    kdist, kowner = k_nearest_facilities(csr, facilities, k)
+    rdist, rowner = k_nearest_facilities(g, repeated, k)
+    assert list(rdist) == list(kdist)
+    assert [(-1, 0, 1, 3, 4)[j + 1] for j in kowner] == list(rowner)
+    try:
+        nearest_facilities(g, [5, 42000])
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_labeled_graph():
+    g = LabeledGraph()
+    g.add_edge('A', ('B', 1), 1.0)
+    g.add_edges([(('B', 1), 'C', 1.0), ('A', 'C', 5.0), ('C', 'D')])
+    g.add_vertex('E')
+    assert g.get_vertices() == ['A', ('B', 1), 'C', 'D', 'E']
+    assert g.labels.get('C') == 2 and g.labels.label(3) == 'D'
+    assert g.shortest_path('A', 'D') == ['A', ('B', 1), 'C', 'D']
+    assert g.shortest_path('A', 'D', bidirectional=True) == ['A', ('B', 1), 'C', 'D']
+    assert g.shortest_path('A', 'E') is None and g.shortest_path('A', 'Z') is None
+    assert g.edge_weight('C', 'A') == 5.0 and g.get_adjacent_edges('D') == [('C', 1.0)]
+    g.remove_edge(('B', 1), 'C')
+    assert g.shortest_path('A', 'D') == ['A', 'C', 'D']
+    g.remove_vertex('C')
+    assert not g.has_vertex('C') and g.shortest_path('A', 'D') is None
+    g.add_edge('A', 'D', 2.0)
+    assert g.shortest_path('A', 'D') == ['A', 'D'] and g.labels.get('D') == 3
+    assert not g.graph.is_frozen()
+    g.freeze()
+    assert g.shortest_path('A', 'D', engine='heap') == ['A', 'D'] and g.graph.is_frozen()
+    try:
+        g.edge_weight('A', 'C')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    # Те же пути, что и у графа со строковыми вершинами
+    plain, labeled = Graph(), LabeledGraph()
+    us, vs, ws = generate_edge_arrays(200, avg_degree=4, seed=17)
+    edges = [(f"v{u}", f"v{v}", w) for u, v, w in zip(us, vs, ws)]
+    plain.add_edges(edges)
+    labeled.add_edges(edges)
+    rng = random.Random(17)
+    for _ in range(30):
+        s, t = f"v{rng.randrange(200)}", f"v{rng.randrange(200)}"
+        assert labeled.shortest_path(s, t) == shortest_path(plain, s, t, engine='heap')
+
+# --- Замер времени и вывод таблицы ---
+def run_benchmark(landmarks: int = 0):
+    """
+    При landmarks > 0 для каждого графа дополнительно строится
+    ALT-индекс и выводятся время предобработки, размер таблиц
+    и ускорение запросов относительно shortest_path.
+    """
+    print("\n" + "="*80)
+    print("ЗАМЕРЫ ВРЕМЕНИ АЛГОРИТМА ДЕЙКСТРЫ")
+    print("="*80)
+    header = f"{'Размер графа':<12} {'Время (сек)':<12} {'Число рёбер':<12} {'Плотность':<10}"
+    if landmarks:
+        header += f" {'Предобр.':<10} {'Табл. КБ':<10} {'ALT (сек)':<12} {'Ускорение':<10}"
+    print(header)
+    print("-"*80)
+
+    sizes = [10, 50, 100, 200, 500, 1000, 10000]
+    runs_per_size = 5  # количество запусков для усреднения
+
+    for n in sizes:
+        g = generate_connected_graph(n, avg_degree=5)  # средняя степень 5
+        total_time = 0.0
+        num_edges = sum(len(g._edges[v]) for v in g._edges) // 2  # так как граф неориентированный
+        density = num_edges / (n * (n - 1) / 2) if n > 1 else 0
+
+        if landmarks:
+            start_time = time.perf_counter()
+            index = build_landmarks(g, k=landmarks)
+            preprocess_time = time.perf_counter() - start_time
+            alt_time = 0.0
+
+        for _ in range(runs_per_size):
+            start, end = random.choice(g.get_vertices()), random.choice(g.get_vertices())
+            start_time = time.perf_counter()
+            path = shortest_path(g, start, end)
+            end_time = time.perf_counter()
+            total_time += end_time - start_time
+            if landmarks:
+                start_time = time.perf_counter()
+                alt_shortest_path(index, start, end)
+                alt_time += time.perf_counter() - start_time
+
+        avg_time = total_time / runs_per_size
+        row = f"{n:<12} {avg_time:<12.6f} {num_edges:<12} {density:<10.3f}"
+        if landmarks:
+            alt_time /= runs_per_size
+            row += (f" {preprocess_time:<10.3f} {index.nbytes() / 1024:<10.1f} "
+                    f"{alt_time:<12.6f} {avg_time / alt_time:<10.2f}")
+        print(row)
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Алгоритм Дейкстры работает за O((V + E) log V) в худшем случае.")
+    print("- На практике время растёт примерно линейно с числом рёбер при фиксированной плотности.")
+    print("- Для больших графов (n > 1000) время возрастает заметно, но остаётся приемлемым.")
+    print("- Увеличение плотности графа (больше рёбер) увеличивает время выполнения.")
+    print("- При n=1000 алгоритм выполняется за доли секунды — подходит для реального времени.")
+    if landmarks:
+        print(f"- ALT с {landmarks} ориентирами платит k полных Дейкстр и 8·k·V байт таблиц,")
+        print("  зато A* обрабатывает лишь узкую полосу вершин вдоль пути.")
+
+
+def dict_graph_nbytes(g: Graph) -> int:
+    """Оценка памяти словарного представления (контейнеры и объекты весов)."""
+    total = sys.getsizeof(g._vertices) + sys.getsizeof(g._edges)
+    for adj in g._edges.values():
+        total += sys.getsizeof(adj) + sum(sys.getsizeof(w) for w in adj.values())
+    return total
+
+
+def run_csr_benchmark(sizes=(10, 100, 1000, 10000, 100000, 1000000), runs_per_size=5):
+    print("\n" + "="*80)
+    print("СЛОВАРНЫЙ ГРАФ ПРОТИВ CSR-СНИМКА")
+    print("="*80)
+    print(f"{'Вершин':<10} {'Дейкстра':<12} {'CSR':<12} {'Ускорение':<10} "
+          f"{'freeze()':<10} {'Б/ребро dict':<13} {'Б/ребро CSR':<12}")
+    print("-"*80)
+
+    for n in sizes:
+        g = generate_connected_graph(n, avg_degree=5)
+        num_edges = sum(len(g._edges[v]) for v in g._edges) // 2
+
+        start_time = time.perf_counter()
+        csr = g.to_csr()
+        freeze_time = time.perf_counter() - start_time
+
+        pairs = [(random.randrange(n), random.randrange(n)) for _ in range(runs_per_size)]
+        dict_time = csr_time = 0.0
+        for s, t in pairs:
+            start_time = time.perf_counter()
+            path = shortest_path(g, s, t)
+            dict_time += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            csr_path = shortest_path_csr(csr, s, t)
+            csr_time += time.perf_counter() - start_time
+            assert path == csr_path
+
+        dict_time /= runs_per_size
+        csr_time /= runs_per_size
+        print(f"{n:<10} {dict_time:<12.6f} {csr_time:<12.6f} {dict_time / csr_time:<10.2f} "
+              f"{freeze_time:<10.3f} {dict_graph_nbytes(g) / num_edges:<13.1f} "
+              f"{csr.nbytes() / num_edges:<12.1f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- CSR хранит ребро дважды по 16 байт (индекс соседа + вес) против сотен байт в словарях.")
+    print("- Дейкстра по массивам не сортирует соседей и не ищет веса по словарям.")
+    print("- freeze() окупается уже после нескольких запросов к неизменному графу.")
+
+
+def run_bidirectional_benchmark(sizes=(100, 1000, 10000, 100000), runs_per_size=20):
+    print("\n" + "="*80)
+    print("ОДНОНАПРАВЛЕННЫЙ ПРОТИВ ДВУНАПРАВЛЕННОГО ДЕЙКСТРЫ")
+    print("="*80)
+    print(f"{'Вершин':<10} {'Обраб. (1)':<12} {'Обраб. (2)':<12} {'Доля':<8} "
+          f"{'Время (1)':<12} {'Время (2)':<12}")
+    print("-"*80)
+
+    for n in sizes:
+        g = generate_connected_graph(n, avg_degree=5)
+        settled_uni = settled_bi = 0
+        time_uni = time_bi = 0.0
+        for _ in range(runs_per_size):
+            s, t = random.randrange(n), random.randrange(n)
+            uni, bi = {}, {}
+            start_time = time.perf_counter()
+            shortest_path(g, s, t, stats=uni)
+            time_uni += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            shortest_path(g, s, t, bidirectional=True, stats=bi)
+            time_bi += time.perf_counter() - start_time
+            settled_uni += uni['settled']
+            settled_bi += bi['settled']
+
+        print(f"{n:<10} {settled_uni / runs_per_size:<12.1f} {settled_bi / runs_per_size:<12.1f} "
+              f"{settled_bi / settled_uni:<8.3f} {time_uni / runs_per_size:<12.6f} "
+              f"{time_bi / runs_per_size:<12.6f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Два встречных поиска обрабатывают заметно меньше вершин, чем один.")
+    print("- Выигрыш растёт с длиной запроса: дальним парам нужен шар меньшего радиуса.")
+
+
+def run_ch_benchmark(sides=(10, 30, 70, 100), runs_per_size=50):
+    print("\n" + "="*80)
+    print("CONTRACTION HIERARCHIES (РЕШЁТКА side x side)")
+    print("="*80)
+    print(f"{'Вершин':<10} {'Предобр.':<10} {'Шорткатов':<10} {'Дейкстра':<12} "
+          f"{'CH':<12} {'Ускорение':<10} {'Обраб. CH':<10}")
+    print("-"*80)
+
+    for side in sides:
+        n = side * side
+        g = generate_grid_graph(side, side)
+        start_time = time.perf_counter()
+        ch = build_contraction_hierarchy(g)
+        build_time = time.perf_counter() - start_time
+
+        dijkstra_time = ch_time = 0.0
+        settled = 0
+        for _ in range(runs_per_size):
+            s, t = random.randrange(n), random.randrange(n)
+            stats = {}
+            start_time = time.perf_counter()
+            shortest_path(g, s, t)
+            dijkstra_time += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            ch_shortest_path(ch, s, t, stats=stats)
+            ch_time += time.perf_counter() - start_time
+            settled += stats['settled']
+
+        print(f"{n:<10} {build_time:<10.3f} {ch.num_shortcuts():<10} "
+              f"{dijkstra_time / runs_per_size:<12.6f} {ch_time / runs_per_size:<12.6f} "
+              f"{dijkstra_time / ch_time:<10.2f} {settled / runs_per_size:<10.1f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Предобработка дорогая, но выполняется один раз; иерархию можно сохранить и загрузить.")
+    print("- Запрос обходит только восходящие рёбра и обрабатывает малую долю вершин.")
+    print("- Замер идёт на решётке: у случайных графов generate_connected_graph нет")
+    print("  иерархической структуры дорог, их ядро быстро уплотняется и предобработка")
+    print("  становится квадратичной — для них лучше подходит ALT.")
+
+
+def run_batch_benchmark(n=100000, sources=32, targets_per_source=8, worker_counts=(1, 2, 4, 8)):
+    print("\n" + "="*80)
+    print(f"ПАКЕТНЫЕ ЗАПРОСЫ: {sources} источников x {targets_per_source} целей, {n} вершин")
+    print("="*80)
+    print(f"{'Режим':<22} {'Время (сек)':<12} {'Ускорение':<10}")
+    print("-"*80)
+
+    g = generate_connected_graph(n, avg_degree=5)
+    pairs = [(s, random.randrange(n))
+             for s in random.sample(range(n), sources) for _ in range(targets_per_source)]
+
+    g.freeze()
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(g, s, t)
+    base_time = time.perf_counter() - start_time
+    print(f"{'по одной паре':<22} {base_time:<12.3f} {1.0:<10.2f}")
+
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        shortest_paths_batch(g, pairs, workers=workers, chunk_size=max(1, sources // (4 * workers)))
+        batch_time = time.perf_counter() - start_time
+        print(f"{'пакет, процессов: ' + str(workers):<22} {batch_time:<12.3f} {base_time / batch_time:<10.2f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Группировка по источнику заменяет targets_per_source поисков одним.")
+    print(f"- Ускорение по процессам ограничено числом ядер (здесь {os.cpu_count()})")
+    print("  и разовой передачей CSR-снимка в каждый процесс.")
+
+
+def run_cache_benchmark(n=10000, depots=100, queries=1000, capacity=64):
+    print("\n" + "="*80)
+    print(f"КЭШ ДЕРЕВЬЕВ ПУТЕЙ: {n} вершин, {depots} депо, {queries} запросов, ёмкость {capacity}")
+    print("="*80)
+
+    g = generate_connected_graph(n, avg_degree=5)
+    # Перекошенная нагрузка: источник — депо с весом 1 / (ранг + 1)
+    depot_ids = random.sample(range(n), depots)
+    pairs = [(s, random.randrange(n))
+             for s in random.choices(depot_ids, weights=[1 / (i + 1) for i in range(depots)], k=queries)]
+
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(g, s, t)
+    plain_time = time.perf_counter() - start_time
+
+    # Кэш по незамороженному графу строит свой снимок один раз
+    cache = ShortestPathCache(capacity=capacity)
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(g, s, t, cache=cache)
+    unfrozen_time = time.perf_counter() - start_time
+
+    g.freeze()
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(g, s, t)
+    frozen_time = time.perf_counter() - start_time
+    cache = ShortestPathCache(capacity=capacity)
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(g, s, t, cache=cache)
+    cached_time = time.perf_counter() - start_time
+
+    stats = cache.stats()
+    print(f"Без кэша (dict):               {plain_time:.3f} сек")
+    print(f"С кэшем, граф не заморожен:    {unfrozen_time:.3f} сек (ускорение {plain_time / unfrozen_time:.2f})")
+    print(f"Без кэша (CSR):                {frozen_time:.3f} сек")
+    print(f"С кэшем, граф заморожен:       {cached_time:.3f} сек (ускорение {frozen_time / cached_time:.2f})")
+    print(f"Попаданий: {stats['hits']}, промахов: {stats['misses']}, вытеснений: {stats['evictions']}")
+    print(f"Память деревьев: {stats['size'] * 16 * n / 1024 / 1024:.1f} МБ "
+          f"+ один снимок {g.freeze().nbytes() / 1024 / 1024:.1f} МБ")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- При перекошенной нагрузке большинство запросов отвечается проходом по дереву.")
+    print("- Промах дороже обычного запроса (строится полное дерево), поэтому кэш")
+    print("  выгоден, только если источники повторяются.")
+    print("- Незамороженный граф кэш упаковывает в CSR один раз на версию, поэтому")
+    print("  промахи по нему стоят почти столько же, сколько по замороженному.")
+
+
+def run_heap_benchmark(n=10000, degrees=(2, 5, 10, 20, 50), runs_per_degree=10):
+    print("\n" + "="*80)
+    print(f"ЛЕНИВАЯ КУЧА ПРОТИВ INDEXED HEAP ({n} вершин)")
+    print("="*80)
+    print(f"{'Ст. степень':<12} {'Куча heapq':<12} {'Куча indexed':<14} "
+          f"{'Время heapq':<12} {'Время indexed':<14}")
+    print("-"*80)
+
+    for degree in degrees:
+        csr = generate_connected_graph(n, avg_degree=degree).to_csr()
+        heap_lazy = heap_indexed = 0
+        time_lazy = time_indexed = 0.0
+        for _ in range(runs_per_degree):
+            s, t = random.randrange(n), random.randrange(n)
+            lazy, indexed = {}, {}
+            start_time = time.perf_counter()
+            shortest_path_csr(csr, s, t, stats=lazy)
+            time_lazy += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            shortest_path_indexed_heap(csr, s, t, stats=indexed)
+            time_indexed += time.perf_counter() - start_time
+            heap_lazy += lazy['max_heap_size']
+            heap_indexed += indexed['max_heap_size']
+
+        print(f"{degree:<12} {heap_lazy / runs_per_degree:<12.0f} {heap_indexed / runs_per_degree:<14.0f} "
+              f"{time_lazy / runs_per_degree:<12.6f} {time_indexed / runs_per_degree:<14.6f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- С ростом степени ленивая куча разрастается до O(E) записей, indexed — не больше V.")
+    print("- heapq написан на C, а IndexedHeap — на Python, поэтому по времени")
+    print("  indexed выигрывает только там, где экономия памяти и лишних извлечений")
+    print("  перекрывает стоимость интерпретируемых сдвигов.")
+
+
+def run_dial_benchmark(n=10000, max_weights=(1, 10, 100, 1000, 10000, 100000), runs_per_weight=10):
+    print("\n" + "="*80)
+    print(f"DIAL ПРОТИВ HEAPQ НА ЦЕЛЫХ ВЕСАХ ({n} вершин)")
+    print("="*80)
+    print(f"{'Макс. вес':<12} {'heapq (сек)':<14} {'Dial (сек)':<14} {'Ускорение':<10}")
+    print("-"*80)
+
+    g = generate_connected_graph(n, avg_degree=5)
+    edges = [(u, v) for u in g._edges for v in g._edges[u] if u < v]
+    for max_weight in max_weights:
+        weighted = Graph()
+        for u, v in edges:
+            weighted.add_edge(u, v, random.randint(1, max_weight))
+        csr = weighted.to_csr()
+        # Порог DIAL_MAX_WEIGHT здесь намеренно обходится
+        csr._int_weights = array('q', map(int, csr.weights))
+        csr._int_weights_checked = True
+
+        heap_time = dial_time = 0.0
+        for _ in range(runs_per_weight):
+            s, t = random.randrange(n), random.randrange(n)
+            start_time = time.perf_counter()
+            expected = shortest_path_csr(csr, s, t)
+            heap_time += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            path = dial_shortest_path(csr, s, t)
+            dial_time += time.perf_counter() - start_time
+            assert path == expected
+
+        print(f"{max_weight:<12} {heap_time / runs_per_weight:<14.6f} "
+              f"{dial_time / runs_per_weight:<14.6f} {heap_time / dial_time:<10.2f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- При малых весах корзины короткие, и Dial обходит heapq.")
+    print("- С ростом наибольшего веса растёт число пустых корзин, которые нужно")
+    print(f"  пролистать, поэтому auto выбирает Dial только при весах до {DIAL_MAX_WEIGHT}.")
+
+
+def run_unweighted_benchmark(sizes=(1000, 10000, 100000), runs_per_size=10):
+    print("\n" + "="*80)
+    print("НЕВЗВЕШЕННЫЕ ГРАФЫ: ВЫБОР АЛГОРИТМА В shortest_path")
+    print("="*80)
+    print(f"{'Вершин':<10} {'auto':<8} {'auto (сек)':<12} {'heap (сек)':<12} {'dial (сек)':<12} {'Ускорение':<10}")
+    print("-"*80)
+
+    for n in sizes:
+        weighted = generate_connected_graph(n, avg_degree=5)
+        g = Graph()
+        for u in weighted._edges:
+            for v in weighted._edges[u]:
+                g.add_edge(u, v)
+        engine = choose_engine(g)
+        g.freeze()
+
+        times = {'auto': 0.0, 'heap': 0.0, 'dial': 0.0}
+        for _ in range(runs_per_size):
+            s, t = random.randrange(n), random.randrange(n)
+            for name in times:
+                start_time = time.perf_counter()
+                shortest_path(g, s, t, engine=name)
+                times[name] += time.perf_counter() - start_time
+
+        auto, heap, dial = (times[name] / runs_per_size for name in ('auto', 'heap', 'dial'))
+        print(f"{n:<10} {engine:<8} {auto:<12.6f} {heap:<12.6f} {dial:<12.6f} {heap / auto:<10.2f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Граф сам отслеживает, одинаковы ли веса, поэтому выбор алгоритма стоит O(1).")
+    print("- Двунаправленный BFS не использует кучу и раскрывает лишь два небольших шара.")
+
+
+def run_graph_file_benchmark(sizes=(10000, 100000, 1000000)):
+    import tempfile
+    print("\n" + "="*80)
+    print("ДВОИЧНЫЙ ФАЙЛ ГРАФА: СОХРАНЕНИЕ И ЗАГРУЗКА")
+    print("="*80)
+    print(f"{'Вершин':<10} {'Сборка':<10} {'Файл, МБ':<10} {'save':<10} "
+          f"{'load mmap':<12} {'load копия':<12} {'1-й запрос':<10}")
+    print("-"*80)
+
+    for n in sizes:
+        start_time = time.perf_counter()
+        g = generate_connected_graph(n, avg_degree=5)
+        build_time = time.perf_counter() - start_time
+
+        fd, path = tempfile.mkstemp(suffix='.csr')
+        os.close(fd)
+        try:
+            start_time = time.perf_counter()
+            g.save(path)
+            save_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            mapped = Graph.load(path, mmap=True)
+            mmap_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            Graph.load(path, mmap=False)
+            copy_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            shortest_path_csr(mapped, random.randrange(n), random.randrange(n))
+            query_time = time.perf_counter() - start_time
+
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            print(f"{n:<10} {build_time:<10.3f} {size_mb:<10.1f} {save_time:<10.3f} "
+                  f"{mmap_time:<12.6f} {copy_time:<12.6f} {query_time:<10.3f}")
+            del mapped
+        finally:
+            os.remove(path)
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Загрузка через mmap не читает файл: время не зависит от размера графа.")
+    print("- Страницы файла общие для всех процессов, загрузивших один и тот же файл.")
+    print("- Сборка через add_edge на порядки медленнее — её достаточно выполнить один раз.")
+
+
+def run_edge_list_benchmark(sizes=(10000, 100000, 1000000), chunk_size=1 << 20):
+    import tempfile
+    import tracemalloc
+    print("\n" + "="*80)
+    print(f"ПОТОКОВАЯ ЗАГРУЗКА СПИСКА РЁБЕР (блок {chunk_size // 1024} КБ)")
+    print("="*80)
+    print(f"{'Рёбер':<10} {'Файл, МБ':<10} {'Graph рёб/с':<14} {'CSR рёб/с':<14} "
+          f"{'Пик CSR, МБ':<12} {'Результат, МБ':<14}")
+    print("-"*80)
+
+    for n in sizes:
+        g = generate_connected_graph(n // 2, avg_degree=4)
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        try:
+            write_edge_list(g, path)
+            del g
+            graph_stats, csr_stats = {}, {}
+            load_edge_list(path, chunk_size=chunk_size, stats=graph_stats)
+            load_edge_list(path, compact=True, chunk_size=chunk_size, stats=csr_stats)
+
+            # Отдельный прогон под tracemalloc: он сильно замедляет выделения
+            tracemalloc.start()
+            csr = load_edge_list(path, compact=True, chunk_size=chunk_size)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{graph_stats['edges']:<10} {os.path.getsize(path) / 1024 / 1024:<10.1f} "
+                  f"{graph_stats['edges_per_sec']:<14.0f} {csr_stats['edges_per_sec']:<14.0f} "
+                  f"{peak / 1024 / 1024:<12.1f} {csr.nbytes() / 1024 / 1024:<14.1f}")
+        finally:
+            os.remove(path)
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Файл читается блоками, весь список строк в памяти не появляется.")
+    print("- Сверх результата CSR-загрузка держит один блок и O(V) на номера вершин")
+    print("  (пик под tracemalloc включает сам результат и словарь номеров вершин).")
+    print("- CSR-режим читает файл дважды и медленнее по рёбрам в секунду, зато результат")
+    print("  в разы компактнее словарного графа и сразу готов к save() и запросам.")
+
+
+def run_generator_benchmark(sizes=(10000, 100000, 1000000), compact_sizes=(1000000, 3000000)):
+    print("\n" + "="*80)
+    print("ГЕНЕРАЦИЯ ГРАФОВ (avg_degree=5)")
+    print("="*80)
+    print(f"{'Вершин':<10} {'Форма':<8} {'Время (сек)':<12} {'Рёбер':<10}")
+    print("-"*80)
+
+    for n in sizes:
+        start_time = time.perf_counter()
+        g = generate_connected_graph(n, avg_degree=5, seed=n)
+        elapsed = time.perf_counter() - start_time
+        print(f"{n:<10} {'Graph':<8} {elapsed:<12.3f} {sum(len(a) for a in g._edges.values()) // 2:<10}")
+        del g
+    for n in compact_sizes:
+        start_time = time.perf_counter()
+        csr = generate_connected_graph(n, avg_degree=5, seed=n, compact=True)
+        elapsed = time.perf_counter() - start_time
+        print(f"{n:<10} {'CSR':<8} {elapsed:<12.3f} {len(csr.neighbors) // 2:<10}")
+        del csr
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Кандидаты тянутся пачками и отсеиваются по упакованному ключу ребра,")
+    print("  без has_edge и без ограничения в n*n попыток.")
+    print("- Форма CSR строится подсчётом степеней по отсортированным рёбрам и не создаёт")
+    print("  словарей смежности. Ключи рёбер лежат в array по 8 байт, пик памяти задают")
+    print("  временные списки сортировки и разбора ключей.")
+    print("- Генерация идёт поэлементно в Python (случайные числа, ключи, сортировка):")
+    print("  около секунды на 10^5 вершин и порядка десяти секунд на 10^6, так что 10^7")
+    print("  вершин — это минуты, а не секунды; быстрее без векторных библиотек не выйдет.")
+
+
+def run_update_benchmark(n=100000, batch=2000):
+    print("\n" + "="*80)
+    print(f"ПАКЕТНЫЕ ИЗМЕНЕНИЯ ГРАФА ({n} вершин, пачка {batch})")
+    print("="*80)
+
+    def remove_vertex_by_scan(g: Graph, v: int) -> None:
+        # Прежняя реализация remove_vertex: обход всех вершин графа
+        g._vertices.discard(v)
+        for weight in g._edges.pop(v, {}).values():
+            g._count_weight(weight, -1)
+        for vertex in list(g._edges.keys()):
+            if v in g._edges[vertex]:
+                del g._edges[vertex][v]
+        g._changed()
+
+    g = generate_connected_graph(n, avg_degree=5, seed=1)
+    victims = random.sample(range(n), batch)
+    scan_batch = victims[:max(1, batch // 20)]
+    start_time = time.perf_counter()
+    for v in scan_batch:
+        remove_vertex_by_scan(g, v)
+    scan_rate = len(scan_batch) / (time.perf_counter() - start_time)
+
+    g = generate_connected_graph(n, avg_degree=5, seed=1)
+    start_time = time.perf_counter()
+    for v in victims:
+        g.remove_vertex(v)
+    single_rate = batch / (time.perf_counter() - start_time)
+
+    g = generate_connected_graph(n, avg_degree=5, seed=1)
+    start_time = time.perf_counter()
+    g.remove_vertices(victims)
+    bulk_rate = batch / (time.perf_counter() - start_time)
+
+    us, vs, ws = generate_edge_arrays(n, avg_degree=5, seed=2)
+    g = Graph()
+    start_time = time.perf_counter()
+    for u, v, w in zip(us, vs, ws):
+        g.add_edge(u, v, w)
+    add_single_rate = len(us) / (time.perf_counter() - start_time)
+    g = Graph()
+    start_time = time.perf_counter()
+    g.add_edges(zip(us, vs, ws))
+    add_bulk_rate = len(us) / (time.perf_counter() - start_time)
+
+    print(f"{'Операция':<40} {'Операций/сек':<15}")
+    print("-"*80)
+    print(f"{'remove_vertex с обходом всех вершин':<40} {scan_rate:<15.0f}")
+    print(f"{'remove_vertex по соседям':<40} {single_rate:<15.0f}")
+    print(f"{'remove_vertices':<40} {bulk_rate:<15.0f}")
+    print(f"{'add_edge':<40} {add_single_rate:<15.0f}")
+    print(f"{'add_edges':<40} {add_bulk_rate:<15.0f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Удаление вершины теперь стоит O(deg v) вместо O(V).")
+    print("- Пакетные методы меняют версию графа и сбрасывают снимок один раз на пачку.")
+
+
+def run_delta_stepping_benchmark(n=100000, worker_counts=(1, 2, 4, 8), deltas=(0.25, 0.5, 1, 2, 4, 8)):
+    print("\n" + "="*80)
+    print(f"DELTA-STEPPING ({n} вершин, ядер: {os.cpu_count()})")
+    print("="*80)
+
+    csr = generate_connected_graph(n, avg_degree=5, seed=3, compact=True)
+    mean_weight = sum(csr.weights) / len(csr.weights)
+    start_time = time.perf_counter()
+    expected, _ = shortest_path_tree_csr(csr, 0)
+    dijkstra_time = time.perf_counter() - start_time
+    print(f"Дейкстра (полное дерево): {dijkstra_time:.3f} сек")
+
+    print(f"\n{'Процессов':<12} {'Время (сек)':<12} {'Ускорение к 1':<14}")
+    print("-"*80)
+    base_time = None
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        dist, _ = delta_stepping_sssp(csr, 0, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        assert dist == expected
+        base_time = base_time or elapsed
+        print(f"{workers:<12} {elapsed:<12.3f} {base_time / elapsed:<14.2f}")
+
+    print(f"\n{'delta / ср. вес':<16} {'Время (сек)':<12} {'К Дейкстре':<12}")
+    print("-"*80)
+    for factor in deltas:
+        start_time = time.perf_counter()
+        delta_stepping_sssp(csr, 0, delta=factor * mean_weight)
+        elapsed = time.perf_counter() - start_time
+        print(f"{factor:<16} {elapsed:<12.3f} {dijkstra_time / elapsed:<12.2f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Малое delta — много почти пустых фаз, большое — лишние повторные релаксации;")
+    print("  оптимум около среднего веса ребра.")
+    print("- Процессы получают граф через общую память без копирования, но запросы")
+    print("  на релаксацию возвращаются через pickle, поэтому ускорение сублинейно")
+    print("  и заметно только на больших фазах; на одном ядре процессы дают лишь накладные")
+    print("  расходы.")
+
+
+def run_dynamic_tree_benchmark(n=100000, updates=300):
+    print("\n" + "="*80)
+    print(f"ДИНАМИЧЕСКОЕ ДЕРЕВО ПУТЕЙ ({n} вершин, {updates} изменений)")
+    print("="*80)
+
+    g = generate_connected_graph(n, avg_degree=5, seed=4)
+    rng = random.Random(4)
+    start_time = time.perf_counter()
+    tree = DynamicShortestPathTree(g, 0)
+    build_time = time.perf_counter() - start_time
+
+    kinds = {'уменьшение веса': [], 'увеличение веса': [], 'удаление ребра': []}
+    start_time = time.perf_counter()
+    for _ in range(updates):
+        u = rng.randrange(n)
+        v = rng.choice(g.get_adjacent_vertices(u))
+        action = rng.random()
+        if action < 0.4:
+            tree.add_edge(u, v, g.edge_weight(u, v) * 0.5)
+            kinds['уменьшение веса'].append(tree.last_touched)
+        elif action < 0.8:
+            tree.add_edge(u, v, g.edge_weight(u, v) * 2.0)
+            kinds['увеличение веса'].append(tree.last_touched)
+        else:
+            tree.remove_edge(u, v)
+            kinds['удаление ребра'].append(tree.last_touched)
+    repair_time = (time.perf_counter() - start_time) / updates
+
+    print(f"{'Изменение':<20} {'Кол-во':<8} {'Среднее затронуто':<20} {'Максимум':<10}")
+    print("-"*80)
+    for kind, touched in kinds.items():
+        if touched:
+            print(f"{kind:<20} {len(touched):<8} {sum(touched) / len(touched):<20.1f} {max(touched):<10}")
+    print(f"\nПостроение с нуля:         {build_time * 1000:.1f} мс")
+    print(f"Починка (в среднем):       {repair_time * 1000:.3f} мс")
+    print(f"Ускорение:                 {build_time / repair_time:.0f}x")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Изменение ребра вне дерева бесплатно, а починка затрагивает только")
+    print("  вершины, чьё расстояние или предок действительно меняются.")
+    print("- Удорожание ребра у корня может затронуть большое поддерево — тогда")
+    print("  стоимость приближается к полному пересчёту.")
+
+
+def run_facility_benchmark(n=1000000, num_facilities=500, ks=(1, 2, 4, 8), sampled=3):
+    print("\n" + "="*80)
+    print(f"БЛИЖАЙШИЕ ОБЪЕКТЫ ({n} вершин, {num_facilities} объектов)")
+    print("="*80)
+
+    csr = generate_connected_graph(n, avg_degree=4, seed=5, compact=True)
+    facilities = random.Random(5).sample(range(n), num_facilities)
+
+    # Прежний подход: дерево путей от каждого объекта; замеряем несколько
+    # и экстраполируем на все
+    start_time = time.perf_counter()
+    for f in facilities[:sampled]:
+        shortest_path_tree_csr(csr, f)
+    per_tree = (time.perf_counter() - start_time) / sampled
+    print(f"Дерево от каждого объекта (оценка): {per_tree * num_facilities:.1f} сек")
+
+    start_time = time.perf_counter()
+    dist, owner = nearest_facilities(csr, facilities)
+    nearest_time = time.perf_counter() - start_time
+    print(f"nearest_facilities:                 {nearest_time:.2f} сек "
+          f"({per_tree * num_facilities / nearest_time:.0f}x), "
+          f"результат {(dist.itemsize + owner.itemsize) * n / 2**20:.1f} МБ")
+
+    print(f"\n{'k':<6} {'Время (сек)':<14} {'Результат (МБ)':<16}")
+    print("-"*80)
+    for k in ks:
+        start_time = time.perf_counter()
+        kdist, kowner = k_nearest_facilities(csr, facilities, k)
+        elapsed = time.perf_counter() - start_time
+        size = (kdist.itemsize + kowner.itemsize) * len(kdist) / 2**20
+        print(f"{k:<6} {elapsed:<14.2f} {size:<16.1f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Один проход мультиисточникового Дейкстры заменяет по дереву на объект.")
+    print("- Для k ближайших каждая вершина принимает не более k меток, но время растёт")
+    print("  несколько быстрее k: в очереди копятся метки, отвергнутые при извлечении.")
+    print("- Результат хранится в плоских массивах — 16 байт на метку.")
+
+
+def run_labeled_benchmark(n=100000, queries=30):
+    print("\n" + "="*80)
+    print(f"СТРОКОВЫЕ МЕТКИ ВЕРШИН ({n} вершин, {queries} запросов)")
+    print("="*80)
+
+    us, vs, ws = generate_edge_arrays(n, avg_degree=5, seed=6)
+    names = [f"customer-{i:08d}" for i in range(n)]
+    rng = random.Random(6)
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(queries)]
+
+    plain = Graph()
+    plain.add_edges((names[u], names[v], w) for u, v, w in zip(us, vs, ws))
+    start_time = time.perf_counter()
+    plain_paths = [shortest_path(plain, names[s], names[t], engine='heap') for s, t in pairs]
+    plain_time = (time.perf_counter() - start_time) / queries
+
+    tuples = Graph()
+    tuples.add_edges((('customer', u), ('customer', v), w) for u, v, w in zip(us, vs, ws))
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(tuples, ('customer', s), ('customer', t), engine='heap')
+    tuple_time = (time.perf_counter() - start_time) / queries
+
+    int_graph = Graph()
+    int_graph.add_edges(zip(us, vs, ws))
+    start_time = time.perf_counter()
+    for s, t in pairs:
+        shortest_path(int_graph, s, t, engine='heap')
+    int_time = (time.perf_counter() - start_time) / queries
+
+    labeled = LabeledGraph()
+    labeled.add_edges((names[u], names[v], w) for u, v, w in zip(us, vs, ws))
+    start_time = time.perf_counter()
+    labeled.freeze()
+    freeze_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    labeled_paths = [labeled.shortest_path(names[s], names[t], engine='heap') for s, t in pairs]
+    labeled_time = (time.perf_counter() - start_time) / queries
+    assert labeled_paths == plain_paths
+
+    print(f"{'Вариант':<40} {'мс/запрос':<12} {'Ускорение':<10}")
+    print("-"*80)
+    print(f"{'Graph со строковыми вершинами':<40} {plain_time * 1000:<12.1f} {1.0:<10.1f}")
+    print(f"{'Graph с вершинами-кортежами':<40} {tuple_time * 1000:<12.1f} {plain_time / tuple_time:<10.1f}")
+    print(f"{'Graph с целыми вершинами':<40} {int_time * 1000:<12.1f} {plain_time / int_time:<10.1f}")
+    print(f"{'LabeledGraph (CSR по номерам)':<40} {labeled_time * 1000:<12.1f} {plain_time / labeled_time:<10.1f}")
+    print(f"\nПостроение CSR-снимка LabeledGraph: {freeze_time:.2f} сек (один раз)")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Хеш строки кэшируется, поэтому строковые ключи почти не дороже целых;")
+    print("  хеш кортежа считается заново при каждом обращении, и это заметно.")
+    print("- Основной выигрыш даёт не тип ключа, а переход от словарей к массивам")
+    print("  по плотным номерам: после интернирования поиск не касается меток вовсе.")
+    print("- Метки переводятся в номера и обратно только на входе и выходе API.")
 
 if __name__ == "__main__":
     # Запуск всех тестов
@@ -327,7 +4115,54 @@ if __name__ == "__main__":
     test_get_adjacent_edges()
     test_replace_an_edge()
     test_remove_vertices_and_edges()
+    test_csr_layout()
+    test_csr_shortest_path_matches()
+    test_freeze()
+    test_bidirectional_matches()
+    test_bidirectional_small()
+    test_alt_matches()
+    test_alt_small_graph()
+    test_contraction_hierarchy_matches()
+    test_contraction_hierarchy_shortcut_unpacking()
+    test_contraction_hierarchy_save_load()
+    test_shortest_paths_batch()
+    test_shortest_path_cache()
+    test_shortest_path_cache_invalidation()
+    test_indexed_heap()
+    test_indexed_heap_random()
+    test_indexed_heap_engine()
+    test_small_integer_weight_tracking()
+    test_dial_matches_heap()
+    test_dial_rejects_fractional_weights()
+    test_uniform_weight_tracking()
+    test_bfs_shortest_path()
+    test_graph_file_roundtrip()
+    test_graph_file_errors()
+    test_load_edge_list()
+    test_load_edge_list_roundtrip_and_errors()
+    test_generate_connected_graph()
+    test_bulk_updates()
+    test_delta_stepping()
+    test_dynamic_shortest_path_tree()
+    test_nearest_facilities()
+    test_labeled_graph()
     print("✅ Все юнит-тесты пройдены успешно!")
 
     # Запуск замеров
-    run_benchmark()
\ No newline at end of file
+    run_benchmark(landmarks=8)
+    run_csr_benchmark()
+    run_bidirectional_benchmark()
+    run_ch_benchmark()
+    run_batch_benchmark()
+    run_cache_benchmark()
+    run_heap_benchmark()
+    run_dial_benchmark()
+    run_unweighted_benchmark()
+    run_graph_file_benchmark()
+    run_edge_list_benchmark()
+    run_generator_benchmark()
+    run_update_benchmark()
+    run_delta_stepping_benchmark()
+    run_dynamic_tree_benchmark()
+    run_facility_benchmark()
+    run_labeled_benchmark()
\ No newline at end of file
@@ -1,15 +1,35 @@
 import heapq
-from typing import List, Tuple, Set
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Set
+
+# Куча, списки рёбер «u v w» и генератор рёбер общие с задачей о кратчайших путях
+from task_1 import IndexedHeap, generate_edge_arrays, iter_edge_batches, write_edge_list
 
 class Graph:
     def __init__(self):
         self._vertices = set()
         self._edges = {}  # vertex -> {adjacent_vertex: weight}
+        self._version = 0  # растёт при каждом изменении графа
+
+    def get_version(self) -> int:
+        return self._version
 
     def add_vertex(self, v: int) -> None:
         self._vertices.add(v)
         if v not in self._edges:
             self._edges[v] = {}
+            self._version += 1
 
     def has_vertex(self, v: int) -> bool:
         return v in self._vertices
@@ -19,6 +39,7 @@ class Graph:
         self.add_vertex(v)
         self._edges[u][v] = weight
         self._edges[v][u] = weight
+        self._version += 1
 
     def has_edge(self, u: int, v: int) -> bool:
         return u in self._edges and v in self._edges[u]
@@ -46,62 +67,1102 @@ class Graph:
         if v not in self._vertices:
             return
         self._vertices.remove(v)
-        if v in self._edges:
-            del self._edges[v]
-        for vertex in list(self._edges.keys()):
-            if v in self._edges[vertex]:
-                del self._edges[vertex][v]
+        for u in self._edges.pop(v):
+            if u != v:
+                del self._edges[u][v]
+        self._version += 1
 
     def remove_edge(self, u: int, v: int) -> None:
         if self.has_edge(u, v):
             del self._edges[u][v]
-            del self._edges[v][u]
+            if u != v:
+                del self._edges[v][u]
+            self._version += 1
 
 
-def min_spanning_tree(graph: Graph) -> List[Tuple[int, int]]:
+class DisjointSet:
     """
-    Реализация алгоритма Крускала для поиска минимального остовного дерева.
-    Возвращает список рёбер (без весов), составляющих MST.
+    Система непересекающихся множеств на элементах 0..n-1 поверх
+    массивов: parent[x] — родитель x, size[r] — размер множества
+    с корнем r. find делит путь пополам без рекурсии, union
+    подвешивает меньшее множество к большему.
     """
-    if len(graph.get_vertices()) <= 1:
-        return []
 
-    # Собираем все рёбра в кучу (мин-куча по весу)
-    edges = []
-    seen = set()
-    for u in graph.get_vertices():
-        for v, w in graph.get_adjacent_edges(u):
-            if (u, v) not in seen and (v, u) not in seen:
-                heapq.heappush(edges, (w, u, v))
-                seen.add((u, v))
-
-    # Инициализируем Union-Find
-    parent = {v: v for v in graph.get_vertices()}
-    rank = {v: 0 for v in graph.get_vertices()}
-
-    def find(v):
-        if parent[v] != v:
-            parent[v] = find(parent[v])
-        return parent[v]
-
-    def union(u, v):
-        root_u = find(u)
-        root_v = find(v)
-        if root_u == root_v:
+    def __init__(self, n: int):
+        self.parent = array('q', range(n))
+        self.size = array('q', [1]) * n
+        self.component_count = n  # текущее число множеств
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)
+
+    def union(self, a: int, b: int) -> bool:
+        """Объединяет множества a и b; False, если они уже совпадают."""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
             return False
-        if rank[root_u] < rank[root_v]:
-            root_u, root_v = root_v, root_u
-        parent[root_v] = root_u
-        if rank[root_u] == rank[root_v]:
-            rank[root_u] += 1
+        size = self.size
+        if size[root_a] < size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        size[root_a] += size[root_b]
+        self.component_count -= 1
         return True
 
+    def union_many(self, pairs: Iterable[Tuple[int, int]]) -> int:
+        """Объединяет пары (a, b) за один проход; возвращает число слияний."""
+        parent, size = self.parent, self.size
+        merged = 0
+        for a, b in pairs:
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            while parent[b] != b:
+                parent[b] = parent[parent[b]]
+                b = parent[b]
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+            merged += 1
+        self.component_count -= merged
+        return merged
+
+    def components(self) -> List[List[int]]:
+        """Множества по возрастанию наименьшего элемента, элементы по возрастанию."""
+        groups = {}
+        for x in range(len(self.parent)):
+            groups.setdefault(self.find(x), []).append(x)
+        return list(groups.values())
+
+
+def edge_arrays(graph: Graph) -> Tuple[List[int], array, array, array]:
+    """
+    Выписывает каждое неориентированное ребро графа ровно один раз
+    в параллельные массивы. Возвращает (vertices, us, vs, ws): вершины
+    по возрастанию и для каждого ребра индексы концов в vertices
+    (us[k] < vs[k]) и вес. Петли пропускаются.
+    """
+    vertices = graph.get_vertices()
+    index = {v: i for i, v in enumerate(vertices)}
+    us, vs, ws = array('q'), array('q'), array('d')
+    for u, adj in graph._edges.items():
+        i = index[u]
+        for v, w in adj.items():
+            j = index[v]
+            if i < j:
+                us.append(i)
+                vs.append(j)
+                ws.append(w)
+    return vertices, us, vs, ws
+
+
+def kruskal_arrays(n: int, us: array, vs: array, ws: array) -> List[int]:
+    """
+    Крускал по массивам рёбер на вершинах 0..n-1: одна сортировка
+    номеров рёбер по весу и проход с DisjointSet, который
+    заканчивается, как только принято n - 1 ребро.
+    Возвращает номера принятых рёбер в порядке принятия.
+    """
+    order = sorted(range(len(ws)), key=ws.__getitem__)
+    ds = DisjointSet(n)
+    parent, size = ds.parent, ds.size
+    accepted = []
+    need = n - 1
+    for k in order:
+        a, b = us[k], vs[k]
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a == b:
+            continue
+        if size[a] < size[b]:
+            a, b = b, a
+        parent[b] = a
+        size[a] += size[b]
+        accepted.append(k)
+        if len(accepted) == need:
+            break
+    return accepted
+
+
+def filter_kruskal_arrays(n: int, us: array, vs: array, ws: array,
+                          base_size: int = 1 << 12, seed: Optional[int] = 0) -> List[int]:
+    """
+    Filter-Kruskal (Osipov, Sanders, Singler): рёбра делятся по весу
+    опорного элемента (медиана случайной выборки); сначала обрабатывается
+    лёгкая часть, а из тяжёлой перед обработкой выбрасываются рёбра,
+    концы которых уже соединены. Части не больше base_size сортируются
+    и проходятся как в обычном Крускале. Тяжёлые рёбра, не нужные
+    дереву, так и не сортируются. Рекурсия заменена явным стеком.
+    Возвращает номера принятых рёбер в порядке принятия.
+    """
+    rng = random.Random(seed)
+    ds = DisjointSet(n)
+    parent, size = ds.parent, ds.size
+    accepted = []
+    need = n - 1
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    stack = [(list(range(len(ws))), False)]  # (рёбра, нужно ли отфильтровать)
+    while stack and len(accepted) < need:
+        edges, needs_filter = stack.pop()
+        if needs_filter:
+            edges = [k for k in edges if find(us[k]) != find(vs[k])]
+        if len(edges) > base_size:
+            sample = sorted(ws[k] for k in rng.sample(edges, min(31, len(edges))))
+            pivot = sample[len(sample) // 2]
+            light = [k for k in edges if ws[k] <= pivot]
+            if len(light) < len(edges):
+                stack.append(([k for k in edges if ws[k] > pivot], True))
+                stack.append((light, False))
+                continue
+        edges.sort(key=ws.__getitem__)
+        for k in edges:
+            a, b = find(us[k]), find(vs[k])
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+            accepted.append(k)
+            if len(accepted) == need:
+                break
+    return accepted
+
+
+def filter_kruskal(graph: Graph) -> List[Tuple[int, int]]:
+    """Filter-Kruskal по рёбрам графа (см. filter_kruskal_arrays)."""
+    vertices, us, vs, ws = edge_arrays(graph)
+    if len(vertices) <= 1:
+        return []
+    return [(vertices[us[k]], vertices[vs[k]]) for k in filter_kruskal_arrays(len(vertices), us, vs, ws)]
+
+
+_boruvka_worker = {}
+
+
+def _init_boruvka_worker(blocks: Dict[str, Tuple[str, str, int]]) -> None:
+    """Подключает процесс к блокам общей памяти: ключ -> (имя блока, typecode, длина)."""
+    for key, (name, typecode, size) in blocks.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _boruvka_worker['_shm_' + key] = shm  # держим блок открытым
+        _boruvka_worker[key] = shm.buf.cast(typecode)[:size]
+
+
+def _contract_edges(cu, cv, ws, ids, label, lo: int, count: int) -> Tuple[int, Dict[int, int]]:
+    """
+    Рёбра lo..lo+count-1: концы переписываются в новые метки компонент
+    label, рёбра внутри компоненты выбрасываются (оставшиеся сдвигаются
+    к lo), и для оставшихся находится самое лёгкое выходящее ребро
+    каждой компоненты: компонента -> позиция ребра. Равные веса
+    разрешаются по исходному номеру ребра ids, чтобы все процессы
+    выбирали одинаково и выбранные рёбра не образовывали цикл.
+    Возвращает (новое число рёбер, минимумы).
+    """
+    best = {}
+    j = lo
+    for k in range(lo, lo + count):
+        a = label[cu[k]]
+        b = label[cv[k]]
+        if a == b:
+            continue
+        w = ws[k]
+        e = ids[k]
+        cu[j] = a
+        cv[j] = b
+        ws[j] = w
+        ids[j] = e
+        t = best.get(a)
+        if t is None or w < ws[t] or (w == ws[t] and e < ids[t]):
+            best[a] = j
+        t = best.get(b)
+        if t is None or w < ws[t] or (w == ws[t] and e < ids[t]):
+            best[b] = j
+        j += 1
+    return j - lo, best
+
+
+def _contract_edges_in_worker(job: Tuple[int, int]) -> Tuple[int, Dict[int, int]]:
+    w = _boruvka_worker
+    return _contract_edges(w['cu'], w['cv'], w['ws'], w['ids'], w['label'], job[0], job[1])
+
+
+def boruvka_arrays(n: int, us: array, vs: array, ws: array, workers: int = 1,
+                   min_parallel: int = 1 << 16) -> List[int]:
+    """
+    Борувка по массивам рёбер на вершинах 0..n-1. Каждый раунд находит
+    самое лёгкое выходящее ребро каждой компоненты и стягивает
+    компоненты по этим рёбрам; раундов не больше log2(V).
+    Рёбра хранятся в рабочих копиях концов, переписанных в плотные
+    номера компонент: проход раунда сразу переписывает метки и
+    выбрасывает рёбра, ставшие внутренними, так что каждый следующий
+    раунд просматривает только рёбра между компонентами, а главный
+    процесс перенумеровывает компоненты, а не вершины.
+    Массивы делятся на workers отрезков, и проходы идут в пуле процессов
+    по общей памяти: каждый процесс уплотняет свой отрезок на месте и
+    возвращает только его новую длину и найденные минимумы. Если рёбер
+    меньше min_parallel, всё выполняется в главном процессе.
+    Возвращает номера принятых рёбер.
+    """
+    m = len(us)
+    parallel = workers > 1 and m >= min_parallel
+    blocks = []
+    views = []
+    executor = None
+    try:
+        sources = (('cu', us, 'q', m), ('cv', vs, 'q', m), ('ws', ws, 'd', m),
+                   ('ids', range(m), 'q', m), ('label', range(n), 'q', n))
+        if parallel:
+            names = {}
+            work = {}
+            for key, source, typecode, size in sources:
+                shm = shared_memory.SharedMemory(create=True, size=max(8 * size, 8))
+                blocks.append(shm)
+                view = shm.buf.cast(typecode)[:size]
+                views.append(view)
+                view[:] = array(typecode, source)
+                names[key] = (shm.name, typecode, size)
+                work[key] = view
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_boruvka_worker,
+                                           initargs=(names,))
+            step = (m + workers - 1) // workers
+        else:
+            work = {key: array(typecode, source) for key, source, typecode, _ in sources}
+            step = max(m, 1)
+        cu, cv, ews, ids, label = work['cu'], work['cv'], work['ws'], work['ids'], work['label']
+        segments = [(lo, min(step, m - lo)) for lo in range(0, m, step)]
+
+        components = n
+        accepted = []
+        while components > 1:
+            if parallel:
+                results = list(executor.map(_contract_edges_in_worker, segments))
+            else:
+                results = [_contract_edges(cu, cv, ews, ids, label, lo, count) for lo, count in segments]
+            segments = [(lo, count) for (lo, _), (count, _) in zip(segments, results)]
+            best = {}
+            for _, part in results:
+                for c, k in part.items():
+                    b = best.get(c)
+                    if b is None or ews[k] < ews[b] or (ews[k] == ews[b] and ids[k] < ids[b]):
+                        best[c] = k
+            if not best:
+                break  # оставшиеся компоненты не связаны рёбрами
+            ds = DisjointSet(components)
+            for k in set(best.values()):
+                if ds.union(cu[k], cv[k]):
+                    accepted.append(ids[k])
+            # Новые плотные номера компонент по корням: O(число компонент)
+            roots = {}
+            find = ds.find
+            for c in range(components):
+                label[c] = roots.setdefault(find(c), len(roots))
+            components = len(roots)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        for view in views:
+            view.release()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return accepted
+
+
+def boruvka(graph: Graph, workers: int = 1) -> List[Tuple[int, int]]:
+    """Борувка по рёбрам графа (см. boruvka_arrays)."""
+    vertices, us, vs, ws = edge_arrays(graph)
+    if len(vertices) <= 1:
+        return []
+    return [(vertices[us[k]], vertices[vs[k]]) for k in boruvka_arrays(len(vertices), us, vs, ws, workers)]
+
+
+# Пороги выбора алгоритма в min_spanning_tree (см. run_density_benchmark)
+PRIM_HEAP_MIN_DEGREE = 128     # средняя степень, с которой Prim с кучей обгоняет Крускала
+PRIM_ARRAY_MIN_DENSITY = 0.9  # доля от V(V-1)/2 рёбер, с которой выгоден Prim за O(V^2)
+
+
+def _dense_adjacency(graph: Graph) -> Tuple[List[int], List[dict]]:
+    """Вершины по возрастанию и списки смежности по их индексам."""
+    vertices = graph.get_vertices()
+    index = {v: i for i, v in enumerate(vertices)}
+    adjacency = [{index[u]: w for u, w in graph._edges[v].items()} for v in vertices]
+    return vertices, adjacency
+
+
+def prim_heap(graph: Graph) -> List[Tuple[int, int]]:
+    """
+    Prim с IndexedHeap: в куче лежат вершины вне дерева с ключом —
+    весом самого лёгкого ребра в дерево. O(E log V).
+    Для несвязного графа строит остовный лес.
+    """
+    vertices, adjacency = _dense_adjacency(graph)
+    n = len(vertices)
+    pq = IndexedHeap(n)
+    link = array('q', [-1]) * n
+    in_tree = bytearray(n)
     mst_edges = []
-    while edges and len(mst_edges) < len(graph.get_vertices()) - 1:
-        weight, u, v = heapq.heappop(edges)
-        if union(u, v):
-            mst_edges.append((u, v))
+    for root in range(n):
+        if in_tree[root]:
+            continue
+        pq.push(root, 0.0)
+        while pq:
+            _, u = pq.pop()
+            in_tree[u] = 1
+            if link[u] != -1:
+                mst_edges.append((vertices[link[u]], vertices[u]))
+            for v, w in adjacency[u].items():
+                if not in_tree[v] and w < pq.keys[v]:
+                    pq.push_or_decrease(v, w)
+                    link[v] = u
+    return mst_edges
 
+
+def prim_array(graph: Graph) -> List[Tuple[int, int]]:
+    """
+    Prim без кучи: на каждом шаге линейный поиск вершины с наименьшим
+    ключом среди оставшихся. O(V^2) независимо от числа рёбер, поэтому
+    выгоден на плотных графах. Для несвязного графа строит остовный лес.
+    """
+    vertices, adjacency = _dense_adjacency(graph)
+    n = len(vertices)
+    keys = array('d', [float('inf')]) * n
+    link = array('q', [-1]) * n
+    remaining = list(range(n))  # вершины вне дерева
+    pos = list(range(n))        # pos[v] — место v в remaining
+    mst_edges = []
+    while remaining:
+        u = min(remaining, key=keys.__getitem__)
+        if keys[u] == float('inf'):
+            u = remaining[0]  # новая компонента леса
+        last = remaining.pop()
+        if last != u:
+            remaining[pos[u]] = last
+            pos[last] = pos[u]
+        pos[u] = -1
+        if link[u] != -1:
+            mst_edges.append((vertices[link[u]], vertices[u]))
+        for v, w in adjacency[u].items():
+            if pos[v] != -1 and w < keys[v]:
+                keys[v] = w
+                link[v] = u
+    return mst_edges
+
+
+def choose_mst_algorithm(graph: Graph) -> str:
+    """Выбирает алгоритм MST по средней степени и плотности графа."""
+    n = len(graph._vertices)
+    if n <= 1:
+        return 'kruskal'
+    m = sum(len(adj) for adj in graph._edges.values()) // 2
+    if m >= PRIM_ARRAY_MIN_DENSITY * n * (n - 1) / 2:
+        return 'prim_array'
+    if 2 * m >= PRIM_HEAP_MIN_DEGREE * n:
+        return 'prim'
+    return 'kruskal'
+
+
+def kruskal(graph: Graph) -> List[Tuple[int, int]]:
+    """
+    Крускал: рёбра выписываются в массивы (edge_arrays) и сортируются
+    один раз (kruskal_arrays) вместо кучи кортежей.
+    """
+    vertices, us, vs, ws = edge_arrays(graph)
+    if len(vertices) <= 1:
+        return []
+    return [(vertices[us[k]], vertices[vs[k]]) for k in kruskal_arrays(len(vertices), us, vs, ws)]
+
+
+MST_ALGORITHMS = {'kruskal': kruskal, 'filter_kruskal': filter_kruskal, 'prim': prim_heap,
+                  'prim_array': prim_array, 'boruvka': boruvka}
+
+
+def min_spanning_tree(graph: Graph, algorithm: str = 'auto',
+                      stats: Optional[dict] = None) -> List[Tuple[int, int]]:
+    """
+    Поиск минимального остовного дерева (леса для несвязного графа).
+    Возвращает список рёбер (без весов), составляющих MST.
+    algorithm — один из:
+    - 'kruskal' — Крускал по массивам рёбер;
+    - 'filter_kruskal' — Filter-Kruskal: тяжёлые рёбра, концы которых
+      уже соединены, отбрасываются без сортировки (filter_kruskal_arrays);
+    - 'prim' — Prim с IndexedHeap;
+    - 'prim_array' — Prim за O(V^2) для плотных графов;
+    - 'boruvka' — Борувка в одном процессе (параллельный вариант —
+      boruvka(graph, workers));
+    - 'auto' — выбор по плотности графа через choose_mst_algorithm.
+    Выбранный алгоритм записывается в stats['algorithm']. При равных
+    весах алгоритмы могут вернуть разные деревья одного веса.
+    """
+    if algorithm == 'auto':
+        algorithm = choose_mst_algorithm(graph)
+    if algorithm not in MST_ALGORITHMS:
+        raise ValueError(f"Unknown MST algorithm: {algorithm}")
+    if stats is not None:
+        stats['algorithm'] = algorithm
+    return MST_ALGORITHMS[algorithm](graph)
+
+
+class DynamicMST:
+    """
+    Минимальный остовный лес, который поддерживается при изменении
+    отдельных рёбер, а не строится заново. Изменения вносятся через
+    add_edge и remove_edge этого объекта; они же меняют граф. Если граф
+    изменили в обход объекта (его версия разошлась с запомненной), лес
+    больше не соответствует графу, и add_edge/remove_edge бросают
+    ValueError — такой DynamicMST нужно построить заново.
+    - Новое ребро (или подешевевшее ребро вне леса) соединяет два дерева
+      либо заменяет самое тяжёлое ребро на пути между его концами в лесу,
+      если оно дешевле этого ребра.
+    - Удалённое (или подорожавшее) ребро леса разрезает дерево; для
+      меньшей из двух частей ищется самое лёгкое ребро графа наружу.
+    Деревья леса подвешены (parent); путь ищется подъёмом от обоих
+    концов по очереди до встречи, так что его цена пропорциональна
+    длине пути, а при соединении деревьев переподвешивается путь
+    от конца ребра до корня. В last_touched записывается число вершин,
+    просмотренных последним изменением, в total_touched — сумма
+    по всем изменениям.
+    """
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self._tree = {v: {} for v in graph.get_vertices()}  # лес: вершина -> {сосед: вес}
+        for u, v in min_spanning_tree(graph):
+            w = graph.edge_weight(u, v)
+            self._tree[u][v] = w
+            self._tree[v][u] = w
+        self._parent = {}  # вершина -> родитель в подвешенном дереве (None у корня)
+        for root in self._tree:
+            if root in self._parent:
+                continue
+            self._parent[root] = None
+            stack = [root]
+            while stack:
+                x = stack.pop()
+                for y in self._tree[x]:
+                    if y not in self._parent:
+                        self._parent[y] = x
+                        stack.append(y)
+        self.updates = 0
+        self.total_touched = 0
+        self.last_touched = 0
+        self._version = graph.get_version()
+
+    def _check_version(self) -> None:
+        if self.graph.get_version() != self._version:
+            raise ValueError("Graph was modified outside DynamicMST; rebuild it")
+
+    def edges(self) -> List[Tuple[int, int]]:
+        """Рёбра леса в формате min_spanning_tree."""
+        return [(u, v) for u, adj in self._tree.items() for v in adj if u < v]
+
+    def total_weight(self) -> float:
+        return sum(w for u, adj in self._tree.items() for v, w in adj.items() if u < v)
+
+    def _add_vertex(self, v: int) -> None:
+        if v not in self._tree:
+            self._tree[v] = {}
+            self._parent[v] = None
+
+    def _reroot(self, x: int) -> None:
+        """Делает x корнем его дерева, разворачивая путь x..корень."""
+        parent = self._parent
+        prev = None
+        while x is not None:
+            parent[x], prev, x = prev, x, parent[x]
+            self.last_touched += 1
+
+    def _link(self, u: int, v: int, w: float) -> None:
+        """Соединяет два разных дерева ребром (u, v)."""
+        self._tree[u][v] = w
+        self._tree[v][u] = w
+        self._reroot(u)
+        self._parent[u] = v
+
+    def _cut(self, u: int, v: int) -> None:
+        del self._tree[u][v]
+        del self._tree[v][u]
+        if self._parent[v] == u:
+            self._parent[v] = None
+        else:
+            self._parent[u] = None
+
+    def _heaviest_on_path(self, u: int, v: int) -> Optional[Tuple[float, int, int]]:
+        """Самое тяжёлое ребро (w, a, b) пути u..v в лесу; None, если пути нет."""
+        parent = self._parent
+        seen_u, seen_v = {u}, {v}
+        a, b = u, v
+        meet = None
+        while a is not None or b is not None:
+            if a is not None:
+                a = parent[a]
+                if a is not None:
+                    if a in seen_v:
+                        meet = a
+                        break
+                    seen_u.add(a)
+            if b is not None:
+                b = parent[b]
+                if b is not None:
+                    if b in seen_u:
+                        meet = b
+                        break
+                    seen_v.add(b)
+        self.last_touched += len(seen_u) + len(seen_v)
+        if meet is None:
+            return None
+        best = None
+        for x in (u, v):
+            while x != meet:
+                p = parent[x]
+                w = self._tree[p][x]
+                if best is None or w > best[0]:
+                    best = (w, p, x)
+                x = p
+        return best
+
+    def _offer(self, u: int, v: int, w: float) -> None:
+        """Ребро (u, v) вне леса стало доступно с весом w."""
+        heaviest = self._heaviest_on_path(u, v)
+        if heaviest is None:
+            self._link(u, v, w)
+        elif w < heaviest[0]:
+            self._cut(heaviest[1], heaviest[2])
+            self._link(u, v, w)
+
+    def _smaller_side(self, u: int, v: int) -> set:
+        """
+        После разреза ребра (u, v) — вершины меньшей из двух частей:
+        поиск в ширину идёт от u и v по очереди, пока одна из сторон
+        не будет просмотрена целиком.
+        """
+        tree = self._tree
+        sides = ({u}, {v})
+        queues = (deque([u]), deque([v]))
+        while True:
+            for side in (0, 1):
+                if not queues[side]:
+                    self.last_touched += len(sides[0]) + len(sides[1])
+                    return sides[side]
+                x = queues[side].popleft()
+                for y in tree[x]:
+                    if y not in sides[side]:
+                        sides[side].add(y)
+                        queues[side].append(y)
+
+    def _replace(self, u: int, v: int) -> None:
+        """Ребро (u, v) убрано из леса; ищет ему замену среди рёбер графа."""
+        side = self._smaller_side(u, v)
+        best = None
+        for x in side:
+            for y, w in self.graph._edges[x].items():
+                if y not in side and (best is None or w < best[0]):
+                    best = (w, x, y)
+        if best is not None:
+            self._link(best[1], best[2], best[0])
+
+    def _finish(self) -> None:
+        self._version = self.graph.get_version()
+        self.updates += 1
+        self.total_touched += self.last_touched
+
+    def add_edge(self, u: int, v: int, weight: float = 1.0) -> None:
+        """Добавляет ребро или меняет его вес в графе и в лесу."""
+        self._check_version()
+        self.last_touched = 0
+        old = self.graph.edge_weight(u, v) if self.graph.has_edge(u, v) else None
+        self.graph.add_edge(u, v, weight)
+        self._add_vertex(u)
+        self._add_vertex(v)
+        if u == v:
+            pass
+        elif v in self._tree[u]:
+            if weight <= old:
+                self._tree[u][v] = weight
+                self._tree[v][u] = weight
+            else:
+                self._cut(u, v)
+                self._replace(u, v)
+        elif old is None or weight < old:
+            self._offer(u, v, weight)
+        self._finish()
+
+    def remove_edge(self, u: int, v: int) -> None:
+        """Удаляет ребро из графа и при необходимости находит замену в лесу."""
+        self._check_version()
+        self.last_touched = 0
+        if not self.graph.has_edge(u, v):
+            return
+        self.graph.remove_edge(u, v)
+        if u != v and v in self._tree[u]:
+            self._cut(u, v)
+            self._replace(u, v)
+        self._finish()
+
+
+# --- MST во внешней памяти ---
+EDGE_RECORD_BYTES = 24       # вес (float64) и концы (2 x int64) в файле прогона
+_RUN_BYTES_PER_EDGE = 128    # память на ребро при сортировке прогона: массивы, порядок, ключи
+_MERGE_BYTES_PER_EDGE = 72   # память на ребро в буфере слияния: массивы и кортеж
+_MAX_FAN_IN = 64             # наибольшее число прогонов, сливаемых за один проход
+_PARSE_BYTES_PER_BYTE = 16   # память на байт блока при разборе: копия блока, токены bytes, срезы
+_PARSE_SHARE = 4             # разбору блока отводится 1/_PARSE_SHARE бюджета, остальное — прогону
+
+
+def _write_run(path: str, us: array, vs: array, ws: array) -> None:
+    """Прогон — три колонки подряд: веса, затем u, затем v."""
+    with open(path, 'wb') as f:
+        ws.tofile(f)
+        us.tofile(f)
+        vs.tofile(f)
+
+
+def _iter_run(path: str, count: int, block: int) -> Iterator[Tuple[float, int, int]]:
+    """Рёбра (w, u, v) прогона, читаемые блоками по block рёбер из каждой колонки."""
+    with open(path, 'rb') as fw, open(path, 'rb') as fu, open(path, 'rb') as fv:
+        fu.seek(8 * count)
+        fv.seek(16 * count)
+        done = 0
+        while done < count:
+            k = min(block, count - done)
+            ws, us, vs = array('d'), array('q'), array('q')
+            ws.fromfile(fw, k)
+            us.fromfile(fu, k)
+            vs.fromfile(fv, k)
+            yield from zip(ws, us, vs)
+            done += k
+
+
+def _merge_runs(runs: List[Tuple[str, int]], path: str, block: int) -> Tuple[str, int]:
+    """Сливает отсортированные прогоны в один прогон по пути path."""
+    ws, us, vs = array('d'), array('q'), array('q')
+    total = 0
+    with open(path + '.w', 'wb') as fw, open(path + '.u', 'wb') as fu, open(path + '.v', 'wb') as fv:
+        for w, u, v in heapq.merge(*(_iter_run(p, count, block) for p, count in runs)):
+            ws.append(w)
+            us.append(u)
+            vs.append(v)
+            if len(ws) == block:
+                ws.tofile(fw)
+                us.tofile(fu)
+                vs.tofile(fv)
+                total += block
+                ws, us, vs = array('d'), array('q'), array('q')
+        ws.tofile(fw)
+        us.tofile(fu)
+        vs.tofile(fv)
+        total += len(ws)
+    # Склеиваем колонки в формат прогона
+    with open(path, 'wb') as out:
+        for suffix in ('.w', '.u', '.v'):
+            with open(path + suffix, 'rb') as part:
+                while True:
+                    data = part.read(block * 8)
+                    if not data:
+                        break
+                    out.write(data)
+            os.remove(path + suffix)
+    for p, _ in runs:
+        os.remove(p)
+    return path, total
+
+
+def external_min_spanning_tree(path: str, memory_budget: int = 64 << 20,
+                               tmp_dir: Optional[str] = None,
+                               stats: Optional[dict] = None) -> List[Tuple[int, int]]:
+    """
+    Крускал для списка рёбер «u v w», который не помещается в память.
+    1. Файл читается блоками; рёбра копятся в прогон, пока он укладывается
+       в memory_budget, затем прогон сортируется по весу и пишется во
+       временный файл.
+    2. Прогоны сливаются по _MAX_FAN_IN за проход (многопроходное
+       слияние, если их больше), последний проход подаёт рёбра
+       по возрастанию веса прямо в DisjointSet и останавливается
+       на V - 1 принятых рёбрах.
+    Бюджет делится между разбором блока файла (размер блока выводится
+    из бюджета) и буфером прогона; при слиянии он делится между
+    буферами прогонов.
+    Номера вершин — неотрицательные целые, при чтении они сжимаются
+    в плотные 0..V-1, поэтому словарь номеров и DisjointSet занимают
+    O(V) памяти сверх бюджета, сколь бы велики ни были сами номера.
+    Повторное ребро (u, v) в отличие от load_edge_list и Graph.add_edge
+    не заменяет предыдущее: в дерево может попасть самый лёгкий из его
+    весов.
+    В stats записываются число рёбер и вершин, прогонов, проходов
+    слияния, размеры буферов и время; если вызывающий включил
+    tracemalloc, stats['peak_bytes'] — измеренный пик памяти за вызов
+    (пик tracemalloc при этом сбрасывается), иначе None.
+    Возвращает рёбра MST в формате min_spanning_tree.
+    """
+    start_time = time.perf_counter()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    parse_budget = memory_budget // _PARSE_SHARE
+    run_edges = (memory_budget - parse_budget) // _RUN_BYTES_PER_EDGE
+    if run_edges < 16:
+        raise ValueError(f"Memory budget {memory_budget} is too small")
+    block = max(16, memory_budget // (_MAX_FAN_IN * _MERGE_BYTES_PER_EDGE))
+    fan_in = max(2, min(_MAX_FAN_IN, memory_budget // (block * _MERGE_BYTES_PER_EDGE)))
+    chunk_size = max(256, parse_budget // _PARSE_BYTES_PER_BYTE)
+
+    index = {}  # исходный номер вершины -> плотный номер
+    dense = index.setdefault
+    edges = 0
+    run_peak = 0
+    runs = []
+    merge_passes = 0
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as workdir:
+        us, vs, ws = array('q'), array('q'), array('d')
+
+        def flush() -> None:
+            nonlocal run_peak
+            order = sorted(range(len(ws)), key=ws.__getitem__)
+            run_peak = max(run_peak, sys.getsizeof(order) + sum(map(sys.getsizeof, order)) +
+                           sum(buf.itemsize * len(buf) for buf in (us, vs, ws)))
+            run_path = os.path.join(workdir, f"run{len(runs)}")
+            _write_run(run_path, array('q', map(us.__getitem__, order)),
+                       array('q', map(vs.__getitem__, order)),
+                       array('d', map(ws.__getitem__, order)))
+            runs.append((run_path, len(ws)))
+            del us[:], vs[:], ws[:]
+
+        for bus, bvs, bws in iter_edge_batches(path, chunk_size):
+            if len(bus) and min(min(bus), min(bvs)) < 0:
+                raise ValueError("External MST expects non-negative vertex ids")
+            edges += len(bus)
+            us.extend([dense(v, len(index)) for v in bus])
+            vs.extend([dense(v, len(index)) for v in bvs])
+            ws.extend(bws)
+            while len(ws) >= run_edges:
+                rest = (us[run_edges:], vs[run_edges:], ws[run_edges:])
+                del us[run_edges:], vs[run_edges:], ws[run_edges:]
+                flush()
+                us, vs, ws = rest
+        if ws:
+            flush()
+        initial_runs = len(runs)
+        index_bytes = (sys.getsizeof(index) + sum(map(sys.getsizeof, index)) +
+                       sum(map(sys.getsizeof, index.values())))
+        ids = list(index)  # плотный номер -> исходный; словарь больше не нужен
+        del index, dense
+
+        while len(runs) > fan_in:
+            merge_passes += 1
+            runs = [_merge_runs(runs[i:i + fan_in], os.path.join(workdir, f"pass{merge_passes}_{i}"), block)
+                    for i in range(0, len(runs), fan_in)]
+
+        vertices = len(ids)
+        ds = DisjointSet(vertices)
+        parent, size = ds.parent, ds.size
+        mst_us, mst_vs = array('q'), array('q')
+        need = vertices - 1
+        stream = heapq.merge(*(_iter_run(p, count, block) for p, count in runs))
+        for w, a, b in stream:
+            if len(mst_us) >= need:
+                break
+            ra, rb = a, b
+            while parent[ra] != ra:
+                parent[ra] = parent[parent[ra]]
+                ra = parent[ra]
+            while parent[rb] != rb:
+                parent[rb] = parent[parent[rb]]
+                rb = parent[rb]
+            if ra == rb:
+                continue
+            if size[ra] < size[rb]:
+                ra, rb = rb, ra
+            parent[rb] = ra
+            size[ra] += size[rb]
+            mst_us.append(a)
+            mst_vs.append(b)
+        stream.close()
+    mst_edges = [(ids[a], ids[b]) for a, b in zip(mst_us, mst_vs)]
+
+    if stats is not None:
+        stats['edges'] = edges
+        stats['vertices'] = vertices
+        stats['runs'] = initial_runs
+        stats['merge_passes'] = merge_passes
+        stats['run_edges'] = run_edges
+        stats['merge_block'] = block
+        stats['fan_in'] = fan_in
+        stats['chunk_size'] = chunk_size
+        stats['run_buffer_bytes'] = run_peak  # измерено при сортировке самого большого прогона
+        stats['vertex_bytes'] = index_bytes + ds.parent.itemsize * len(ds.parent) * 2
+        stats['peak_bytes'] = tracemalloc.get_traced_memory()[1] - base if tracing else None
+        stats['seconds'] = time.perf_counter() - start_time
+    return mst_edges
+
+
+# --- Евклидово MST ---
+class _PointTree:
+    """
+    k-d дерево над точками плоскости. Узел делит свои точки пополам
+    по медиане вдоль длинной стороны своего прямоугольника, поэтому
+    в листе от leaf_size до 2 * leaf_size - 1 точек, как бы точки ни
+    были распределены: плотные скопления не собираются в одну ячейку,
+    как у равномерной сетки. Узел i занимает order[lo[i]:hi[i]], его
+    дети — left[i] и right[i] (-1 у листа), прямоугольник точек —
+    box[4i:4i + 4] = (min x, max x, min y, max y).
+    """
+
+    def __init__(self, xs: array, ys: array, leaf_size: int = 8):
+        self.xs, self.ys = xs, ys
+        order = list(range(len(xs)))
+        lo, hi = array('q'), array('q')
+        left, right = array('q'), array('q')
+        box = array('d')
+        stack = [(0, len(order), -1, left)]  # (начало, конец, родитель, массив ссылки на узел)
+        while stack:
+            a, b, parent, link = stack.pop()
+            node = len(lo)
+            if parent >= 0:
+                link[parent] = node
+            part = order[a:b]
+            px = [xs[i] for i in part]
+            py = [ys[i] for i in part]
+            x0, x1, y0, y1 = min(px), max(px), min(py), max(py)
+            lo.append(a)
+            hi.append(b)
+            left.append(-1)
+            right.append(-1)
+            box.extend((x0, x1, y0, y1))
+            if b - a >= 2 * leaf_size:
+                part.sort(key=(xs if x1 - x0 >= y1 - y0 else ys).__getitem__)
+                order[a:b] = part
+                mid = (a + b) // 2
+                stack.append((mid, b, node, right))
+                stack.append((a, mid, node, left))
+        self.order = array('q', order)
+        self.lo, self.hi, self.left, self.right, self.box = lo, hi, left, right, box
+
+    def leaves(self) -> List[int]:
+        return [i for i in range(len(self.lo)) if self.left[i] == -1]
+
+    def near_box(self, x0: float, x1: float, y0: float, y1: float, r2: float) -> array:
+        """Точки листьев, чей прямоугольник не дальше sqrt(r2) от прямоугольника [x0, x1] x [y0, y1]."""
+        box, left, right, lo, hi, order = self.box, self.left, self.right, self.lo, self.hi, self.order
+        result = array('q')
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            j = 4 * i
+            dx = max(box[j] - x1, x0 - box[j + 1], 0.0)
+            dy = max(box[j + 2] - y1, y0 - box[j + 3], 0.0)
+            if dx * dx + dy * dy > r2:
+                continue
+            if left[i] == -1:
+                result.extend(order[lo[i]:hi[i]])
+            else:
+                stack.append(right[i])
+                stack.append(left[i])
+        return result
+
+    def uniform_components(self, comp: array) -> array:
+        """Для каждого узла — компонента, если все его точки в одной, иначе -1."""
+        left, right, lo, hi, order = self.left, self.right, self.lo, self.hi, self.order
+        owner = array('q', [-1]) * len(lo)
+        # Дети создаются после родителя, поэтому обход с конца видит их первыми
+        for i in range(len(lo) - 1, -1, -1):
+            if left[i] == -1:
+                c = comp[order[lo[i]]]
+                if all(comp[q] == c for q in order[lo[i]:hi[i]]):
+                    owner[i] = c
+            elif owner[left[i]] == owner[right[i]]:
+                owner[i] = owner[left[i]]
+        return owner
+
+
+def _nearest_neighbors(tree: _PointTree, k: int) -> Tuple[array, array, array]:
+    """
+    k ближайших соседей каждой точки. Точки обрабатываются по листьям:
+    в листе не меньше k + 1 точек, поэтому k-й сосед точки p не дальше
+    её k-го соседа внутри листа, r_p. Кандидаты для всего листа — точки
+    листьев не дальше max r_p от его прямоугольника, отсортированные
+    по x; для p из них берётся полоса |x - x_p| <= r_p.
+    Возвращает плоские массивы длины n * k: номера соседей и расстояния
+    по возрастанию (-1 и inf, если точек меньше k + 1), и число соседей.
+    """
+    xs, ys, box, order = tree.xs, tree.ys, tree.box, tree.order
+    n = len(xs)
+    inf = float('inf')
+    nbr = array('q', [-1]) * (n * k)
+    dist = array('d', [inf]) * (n * k)
+    count = array('q', [0]) * n
+    for leaf in tree.leaves():
+        points = order[tree.lo[leaf]:tree.hi[leaf]]
+        lxs = [xs[p] for p in points]
+        lys = [ys[p] for p in points]
+        if len(points) > k:
+            # Запас на округление sqrt: полоса не должна потерять точку на границе
+            radius = [math.sqrt(sorted([(x - px) ** 2 + (y - py) ** 2 for x, y in zip(lxs, lys)])[k])
+                      * (1 + 1e-9) for px, py in zip(lxs, lys)]
+        else:
+            radius = [inf] * len(points)
+        r = max(radius)
+        x0, x1, y0, y1 = box[4 * leaf:4 * leaf + 4]
+        candidates = sorted(tree.near_box(x0, x1, y0, y1, r * r), key=xs.__getitem__)
+        cxs = [xs[q] for q in candidates]
+        cys = [ys[q] for q in candidates]
+        for p, px, py, rp in zip(points, lxs, lys, radius):
+            i, j = bisect_left(cxs, px - rp), bisect_right(cxs, px + rp)
+            found = sorted(zip([(x - px) ** 2 + (y - py) ** 2 for x, y in zip(cxs[i:j], cys[i:j])],
+                               candidates[i:j]))
+            found = [item for item in found[:k + 1] if item[1] != p][:k]
+            row = p * k
+            for t, (d2, q) in enumerate(found):
+                nbr[row + t] = q
+                dist[row + t] = math.sqrt(d2)
+            count[p] = len(found)
+    return nbr, dist, count
+
+
+def _nearest_foreign(tree: _PointTree, p: int, comp: array, owner: array,
+                     bound: float) -> Optional[Tuple[float, int]]:
+    """
+    Ближайшая к p точка другой компоненты, если она ближе bound. Узлы,
+    целиком лежащие в компоненте p (owner из uniform_components),
+    и узлы дальше лучшего найденного расстояния пропускаются.
+    """
+    xs, ys, box, order = tree.xs, tree.ys, tree.box, tree.order
+    left, right, lo, hi = tree.left, tree.right, tree.lo, tree.hi
+    px, py, own = xs[p], ys[p], comp[p]
+    best = None
+    best_d2 = bound * bound
+    stack = [(0.0, 0)]
+    while stack:
+        node_d2, i = stack.pop()
+        if node_d2 > best_d2:
+            continue
+        if left[i] == -1:
+            for q in order[lo[i]:hi[i]]:
+                if comp[q] != own:
+                    dx, dy = xs[q] - px, ys[q] - py
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2 or (d2 == best_d2 and best is not None and q < best):
+                        best_d2, best = d2, q
+            continue
+        children = []
+        for c in (left[i], right[i]):
+            if owner[c] == own:
+                continue
+            j = 4 * c
+            dx = max(box[j] - px, px - box[j + 1], 0.0)
+            dy = max(box[j + 2] - py, py - box[j + 3], 0.0)
+            children.append((dx * dx + dy * dy, c))
+        # Ближний ребёнок снимается со стека первым
+        children.sort(reverse=True)
+        stack.extend(children)
+    return None if best is None else (math.sqrt(best_d2), best)
+
+
+def euclidean_mst(points: Sequence[Tuple[float, float]], k: int = 8,
+                  stats: Optional[dict] = None) -> List[Tuple[int, int]]:
+    """
+    Минимальное остовное дерево точек плоскости по евклидову расстоянию
+    без построения полного графа. Точки раскладываются по k-d дереву, для
+    каждой ищутся k ближайших соседей, затем работает Борувка:
+    - ближайшая точка чужой компоненты — первый сосед из списка,
+      лежащий в другой компоненте (все более близкие точки в списке есть);
+    - если весь список уже внутри своей компоненты, чужая точка не ближе
+      k-го соседа, и поиск по дереву нужен, только если это расстояние
+      меньше лучшего ребра компоненты; поддеревья, целиком лежащие
+      в своей компоненте, при этом пропускаются.
+    Результат точный; равные расстояния разрешаются по номерам точек.
+    Координаты — плоские (географические координаты нужно спроецировать).
+    Возвращает рёбра (i, j) по номерам точек в формате min_spanning_tree.
+    В stats записываются число раундов Борувки, поисков по дереву
+    и листьев дерева.
+    """
+    n = len(points)
+    if n <= 1:
+        return []
+    if k < 1:
+        raise ValueError(f"k must be positive, got {k}")
+    xs = array('d', (p[0] for p in points))
+    ys = array('d', (p[1] for p in points))
+    tree = _PointTree(xs, ys, leaf_size=max(k + 1, 8))
+    nbr, dist, count = _nearest_neighbors(tree, k)
+
+    ds = DisjointSet(n)
+    ptr = array('q', [0]) * n  # первый сосед в списке, ещё не попавший в свою компоненту
+    boundary = list(range(n))  # точки, у которых такой сосед есть
+    interior = []              # точки, весь список соседей которых — своя компонента
+    mst_edges = []
+    rounds = searches = 0
+    while ds.component_count > 1:
+        rounds += 1
+        comp = array('q', [ds.find(v) for v in range(n)])
+        best = {}  # компонента -> (расстояние, меньший конец, больший конец)
+        still_boundary = []
+        for p in boundary:
+            row = p * k
+            j, own, cnt = ptr[p], comp[p], count[p]
+            while j < cnt and comp[nbr[row + j]] == own:
+                j += 1
+            ptr[p] = j
+            if j == cnt:
+                interior.append(p)
+                continue
+            still_boundary.append(p)
+            q = nbr[row + j]
+            edge = (dist[row + j], p, q) if p < q else (dist[row + j], q, p)
+            b = best.get(own)
+            if b is None or edge < b:
+                best[own] = edge
+        boundary = still_boundary
+        owner = None
+        for p in interior:
+            if count[p] < k:
+                continue  # список содержит все точки: чужих поблизости нет
+            own = comp[p]
+            b = best.get(own)
+            bound = b[0] if b is not None else float('inf')
+            if dist[p * k + k - 1] > bound:
+                continue
+            searches += 1
+            if owner is None:
+                owner = tree.uniform_components(comp)
+            found = _nearest_foreign(tree, p, comp, owner, bound)
+            if found is not None:
+                d, q = found
+                edge = (d, p, q) if p < q else (d, q, p)
+                if b is None or edge < b:
+                    best[own] = edge
+        if not best:
+            break
+        for d, p, q in sorted(set(best.values())):
+            if ds.union(p, q):
+                mst_edges.append((p, q))
+    if stats is not None:
+        stats['rounds'] = rounds
+        stats['tree_searches'] = searches
+        stats['leaves'] = len(tree.leaves())
     return mst_edges
 
 
@@ -150,6 +1211,286 @@ def test_many_edges():
     expected = {(0, 1), (1, 2), (2, 3), (3, 4), (2, 5), (2, 8), (5, 6), (6, 7)}
     assert to_set(min_spanning_tree(g)) == expected
 
+def test_generate_connected_graph():
+    us, vs, ws = generate_edge_arrays(300, avg_degree=6, seed=7)
+    assert len(us) == 300 * 6 // 2
+    assert all(u < v for u, v in zip(us, vs))
+    assert len(set(zip(us, vs))) == len(us)
+    assert list(zip(us, vs)) == sorted(zip(us, vs))
+    g = generate_connected_graph(300, avg_degree=6, seed=7)
+    assert len(min_spanning_tree(g)) == 299
+
+
+def test_disjoint_set():
+    ds = DisjointSet(8)
+    assert ds.component_count == 8 and len(ds) == 8
+    assert ds.union(0, 1) and ds.union(2, 3) and ds.union(1, 3)
+    assert not ds.union(0, 2)
+    assert ds.connected(0, 3) and not ds.connected(0, 4)
+    assert ds.union_many([(4, 5), (5, 4), (6, 7), (7, 5)]) == 3
+    assert ds.component_count == 2
+    assert ds.components() == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert ds.size[ds.find(6)] == 4
+
+    # Длинная цепочка родителей не упирается в предел рекурсии
+    n = 100000
+    ds = DisjointSet(n)
+    for i in range(n - 1):
+        ds.parent[i] = i + 1
+    assert ds.find(0) == n - 1
+    assert ds.parent[0] != 1
+
+    g = Graph()
+    g.add_edge(10, 20, 1.0)
+    g.add_edge(30, 40, 2.0)
+    g.add_edge(20, 30, 5.0)
+    g.add_vertex(50)
+    assert to_set(min_spanning_tree(g)) == {(10, 20), (20, 30), (30, 40)}
+
+def test_edge_arrays_kruskal():
+    g = Graph()
+    g.add_edge(5, 1, 2.0)
+    g.add_edge(1, 9, 1.0)
+    g.add_edge(9, 5, 3.0)
+    g.add_edge(9, 9, 0.1)
+    vertices, us, vs, ws = edge_arrays(g)
+    assert vertices == [1, 5, 9]
+    assert sorted(zip(us, vs, ws)) == [(0, 1, 2.0), (0, 2, 1.0), (1, 2, 3.0)]
+    assert all(u < v for u, v in zip(us, vs))
+    accepted = kruskal_arrays(3, us, vs, ws)
+    assert [ws[k] for k in accepted] == [1.0, 2.0]
+
+    # Лес: рёбра кончаются раньше, чем набирается n - 1
+    assert kruskal_arrays(4, array('q', [0, 2]), array('q', [1, 3]), array('d', [1.0, 1.0])) == [0, 1]
+    g = generate_connected_graph(500, avg_degree=6, seed=19)
+    mst = min_spanning_tree(g)
+    assert len(mst) == 499
+    total = sum(g.edge_weight(u, v) for u, v in mst)
+    _, us, vs, ws = edge_arrays(g)
+    ds = DisjointSet(500)
+    expected = 0.0
+    for w, u, v in sorted(zip(ws, us, vs)):
+        if ds.union(u, v):
+            expected += w
+    assert abs(total - expected) < 1e-9
+
+def test_prim():
+    for n, degree in ((300, 4), (120, 60), (60, 59)):
+        g = generate_connected_graph(n, avg_degree=degree, seed=20)
+        expected = to_set(min_spanning_tree(g, 'kruskal'))
+        for algorithm in ('prim', 'prim_array', 'auto'):
+            assert to_set(min_spanning_tree(g, algorithm)) == expected
+
+    # Лес и равные веса: деревья могут различаться, но не вес и не число рёбер
+    g = Graph()
+    for u, v in [(0, 1), (1, 2), (0, 2), (5, 6), (6, 7), (5, 7)]:
+        g.add_edge(u, v, 1.0)
+    g.add_vertex(9)
+    for algorithm in ('kruskal', 'prim', 'prim_array'):
+        assert len(min_spanning_tree(g, algorithm)) == 4
+
+    stats = {}
+    min_spanning_tree(generate_connected_graph(200, avg_degree=4, seed=20), stats=stats)
+    assert stats['algorithm'] == 'kruskal'
+    assert choose_mst_algorithm(generate_connected_graph(300, avg_degree=150, seed=20)) == 'prim'
+    assert choose_mst_algorithm(generate_connected_graph(100, avg_degree=99, seed=20)) == 'prim_array'
+    try:
+        min_spanning_tree(g, 'boruvka_typo')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+def test_boruvka():
+    g = generate_connected_graph(400, avg_degree=5, seed=21)
+    expected = to_set(min_spanning_tree(g, 'kruskal'))
+    assert to_set(boruvka(g)) == expected
+    assert to_set(min_spanning_tree(g, 'boruvka')) == expected
+    vertices, us, vs, ws = edge_arrays(g)
+    before = (list(us), list(vs), list(ws))
+    accepted = boruvka_arrays(len(vertices), us, vs, ws, workers=2, min_parallel=1)
+    assert {(vertices[us[k]], vertices[vs[k]]) for k in accepted} == expected
+    assert (list(us), list(vs), list(ws)) == before  # сжимаются рабочие копии
+
+    # Целые веса с повторами: три отрезка дают то же дерево, что и один
+    rng = random.Random(21)
+    ws = array('d', [float(rng.randint(1, 3)) for _ in ws])
+    serial = sorted(boruvka_arrays(len(vertices), us, vs, ws))
+    assert sorted(boruvka_arrays(len(vertices), us, vs, ws, workers=3, min_parallel=1)) == serial
+    assert sum(ws[k] for k in serial) == sum(ws[k] for k in kruskal_arrays(len(vertices), us, vs, ws))
+
+    # Равные веса и лес
+    g = Graph()
+    for u, v in [(0, 1), (1, 2), (2, 3), (3, 0), (5, 6)]:
+        g.add_edge(u, v, 1.0)
+    g.add_vertex(8)
+    mst = boruvka(g)
+    assert len(mst) == 4
+    ds = DisjointSet(9)
+    assert all(ds.union(u, v) for u, v in mst)
+    assert boruvka(Graph()) == []
+
+def test_filter_kruskal():
+    for n, degree in ((2000, 8), (300, 40)):
+        g = generate_connected_graph(n, avg_degree=degree, seed=22)
+        expected = to_set(min_spanning_tree(g, 'kruskal'))
+        assert to_set(min_spanning_tree(g, 'filter_kruskal')) == expected
+        vertices, us, vs, ws = edge_arrays(g)
+        for base_size in (1, 64):
+            accepted = filter_kruskal_arrays(len(vertices), us, vs, ws, base_size=base_size)
+            assert {(vertices[us[k]], vertices[vs[k]]) for k in accepted} == expected
+
+    # Все веса равны: опорный элемент не делит рёбра
+    g = Graph()
+    for u, v in [(0, 1), (1, 2), (2, 0), (2, 3), (4, 5)]:
+        g.add_edge(u, v, 1.0)
+    _, us, vs, ws = edge_arrays(g)
+    assert len(filter_kruskal_arrays(6, us, vs, ws, base_size=1)) == 4
+
+def test_dynamic_mst():
+    g = generate_connected_graph(200, avg_degree=4, seed=23)
+    mst = DynamicMST(g)
+    rng = random.Random(23)
+
+    def check():
+        expected = sum(g.edge_weight(u, v) for u, v in min_spanning_tree(g))
+        assert abs(mst.total_weight() - expected) < 1e-9
+        assert len(mst.edges()) == len(min_spanning_tree(g))
+        for u, v in mst.edges():
+            assert g.edge_weight(u, v) == mst._tree[u][v]
+        roots = [v for v, p in mst._parent.items() if p is None]
+        assert len(roots) == len(mst._tree) - len(mst.edges())
+        assert all(p is None or p in mst._tree[v] for v, p in mst._parent.items())
+
+    check()
+    for step in range(300):
+        u = rng.randrange(205)
+        adjacent = g.get_adjacent_vertices(u)
+        action = rng.random()
+        if adjacent and action < 0.3:
+            mst.remove_edge(u, rng.choice(adjacent))
+        elif adjacent and action < 0.6:
+            v = rng.choice(adjacent)
+            mst.add_edge(u, v, g.edge_weight(u, v) * rng.choice((0.3, 0.9, 1.5, 4.0)))
+        else:
+            mst.add_edge(u, rng.randrange(205), rng.uniform(0.5, 5.0))
+        if step % 20 == 0:
+            check()
+    check()
+    assert mst.updates == 300 and mst.total_touched > 0
+
+    g = Graph()
+    g.add_edge(0, 1, 1.0)
+    g.add_edge(1, 2, 2.0)
+    g.add_edge(0, 2, 3.0)
+    mst = DynamicMST(g)
+    assert to_set(mst.edges()) == {(0, 1), (1, 2)}
+    mst.add_edge(0, 2, 1.5)
+    assert to_set(mst.edges()) == {(0, 1), (0, 2)}
+    mst.add_edge(0, 1, 5.0)
+    assert to_set(mst.edges()) == {(1, 2), (0, 2)}
+    mst.remove_edge(1, 2)
+    assert to_set(mst.edges()) == {(0, 1), (0, 2)}
+    mst.remove_edge(0, 1)
+    assert to_set(mst.edges()) == {(0, 2)} and mst.last_touched > 0
+    mst.add_edge(3, 4, 1.0)
+    assert to_set(mst.edges()) == {(0, 2), (3, 4)}
+
+    # Изменение графа в обход DynamicMST обнаруживается по версии
+    version = g.get_version()
+    g.remove_edge(7, 8)
+    g.add_vertex(0)
+    assert g.get_version() == version
+    g.add_edge(2, 3, 0.5)
+    for update in (lambda: mst.add_edge(0, 3, 1.0), lambda: mst.remove_edge(0, 2)):
+        try:
+            update()
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    assert to_set(DynamicMST(g).edges()) == {(0, 2), (2, 3), (3, 4)}
+
+def test_external_min_spanning_tree():
+    g = generate_connected_graph(500, avg_degree=6, seed=24)
+    g.add_edge(700, 701, 1.0)
+    expected = sum(g.edge_weight(u, v) for u, v in min_spanning_tree(g))
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'edges.txt')
+        write_edge_list(g, path)
+        for budget in (1 << 20, 8192, 4096):
+            stats = {}
+            mst = external_min_spanning_tree(path, memory_budget=budget, tmp_dir=workdir, stats=stats)
+            assert len(mst) == 500
+            assert abs(sum(g.edge_weight(u, v) for u, v in mst) - expected) < 1e-9
+            assert stats['edges'] == 1501 and stats['vertices'] == 502
+        assert stats['runs'] > stats['fan_in'] and stats['merge_passes'] >= 1
+        assert os.listdir(workdir) == ['edges.txt']
+
+        for content in ("0 -1 1.0\n", "1 2\n3 4 5 6\n", "0 1 2.0 1 2 3.0\n"):
+            with open(path, 'w') as f:
+                f.write(content)
+            for bad in (lambda: external_min_spanning_tree(path),
+                        lambda: external_min_spanning_tree(path, memory_budget=100)):
+                try:
+                    bad()
+                    assert False, "Expected ValueError"
+                except ValueError:
+                    pass
+
+        # Огромные номера не раздувают память, повторное ребро даёт свой меньший вес
+        with open(path, 'w') as f:
+            f.write("0 1000000000 5.0\n1000000000 7 1.0\n0 1000000000 2.0\n0 7 3.0\n")
+        stats = {}
+        tracemalloc.start()
+        try:
+            mst = external_min_spanning_tree(path, memory_budget=1 << 16, tmp_dir=workdir, stats=stats)
+        finally:
+            tracemalloc.stop()
+        assert to_set(mst) == {(0, 1000000000), (7, 1000000000)}
+        assert stats['vertices'] == 3 and stats['peak_bytes'] < 1 << 16
+        assert stats['run_buffer_bytes'] > 0
+
+def test_euclidean_mst():
+    def complete_graph_mst_weight(points):
+        g = Graph()
+        for i in range(len(points)):
+            g.add_vertex(i)
+            for j in range(i):
+                g.add_edge(i, j, math.dist(points[i], points[j]))
+        return sum(g.edge_weight(u, v) for u, v in min_spanning_tree(g, 'prim_array'))
+
+    rng = random.Random(25)
+    uniform = [(rng.random(), rng.random()) for _ in range(300)]
+    # Два плотных скопления далеко друг от друга, повторы и точки на одной прямой
+    clusters = ([(rng.gauss(0, 0.01), rng.gauss(0, 0.01)) for _ in range(100)] +
+                [(5 + rng.gauss(0, 0.01), 5 + rng.gauss(0, 0.01)) for _ in range(100)] +
+                [(0.0, 0.0)] * 3 + [(2.0, 2.0)])
+    line = [(float(i % 17), 0.0) for i in range(40)]
+    for points in (uniform, clusters, line):
+        for k in (1, 4, 8):
+            stats = {}
+            mst = euclidean_mst(points, k=k, stats=stats)
+            assert len(mst) == len(points) - 1
+            ds = DisjointSet(len(points))
+            assert all(ds.union(u, v) for u, v in mst)
+            weight = sum(math.dist(points[u], points[v]) for u, v in mst)
+            assert abs(weight - complete_graph_mst_weight(points)) < 1e-9
+    assert stats['rounds'] >= 1
+
+    # Скопления на большом квадрате: листья дерева не разрастаются
+    points = clustered_points(1000, side=1e6, seed=25)
+    xs = array('d', (p[0] for p in points))
+    ys = array('d', (p[1] for p in points))
+    tree = _PointTree(xs, ys, leaf_size=9)
+    assert all(9 <= tree.hi[i] - tree.lo[i] <= 17 for i in tree.leaves())
+    assert sorted(tree.order) == list(range(1000))
+    stats = {}
+    mst = euclidean_mst(points, stats=stats)
+    reference = euclidean_mst(points, k=24)
+    assert abs(sum(math.dist(points[u], points[v]) for u, v in mst) -
+               sum(math.dist(points[u], points[v]) for u, v in reference)) < 1e-6
+    assert stats['leaves'] == len(tree.leaves())
+    assert euclidean_mst([(1.0, 2.0)]) == [] and euclidean_mst([]) == []
+    assert euclidean_mst([(0.0, 0.0), (0.0, 0.0)]) == [(0, 1)]
 
 # --- Вспомогательные функции для тестов ---
 def ordered(e: tuple) -> tuple:
@@ -160,32 +1501,19 @@ def to_set(edges: List[tuple]) -> Set[tuple]:
 
 
 # --- Генератор связного графа ---
-def generate_connected_graph(n: int, avg_degree: int = 4) -> Graph:
+def generate_connected_graph(n: int, avg_degree: int = 4, seed: Optional[int] = None) -> Graph:
+    us, vs, ws = generate_edge_arrays(n, avg_degree, seed)
     g = Graph()
     for i in range(n):
         g.add_vertex(i)
-    # Гарантируем связность — строим цепочку
-    for i in range(n - 1):
-        g.add_edge(i, i + 1, random.uniform(0.5, 5.0))
-    # Добавляем дополнительные рёбра
-    total_edges_needed = n * avg_degree // 2 - (n - 1)
-    added = 0
-    attempts = 0
-    max_attempts = n * n
-    while added < total_edges_needed and attempts < max_attempts:
-        u = random.randint(0, n - 1)
-        v = random.randint(0, n - 1)
-        if u != v and not g.has_edge(u, v):
-            g.add_edge(u, v, random.uniform(0.5, 5.0))
-            added += 1
-        attempts += 1
+    for u, v, w in zip(us, vs, ws):
+        g.add_edge(u, v, w)
     return g
 
 
 # --- Замер времени ---
 def run_benchmark():
     import time
-    import random
     print("\n" + "="*80)
     print("ЗАМЕРЫ ВРЕМЕНИ АЛГОРИТМА КРУСКАЛА (MST)")
     print("="*80)
@@ -218,9 +1546,419 @@ def run_benchmark():
     print("- Подходит для задач сетевой оптимизации: электросети, дороги, коммуникации.")
 
 
-if __name__ == "__main__":
-    import random
 
+def run_disjoint_set_benchmark(n=400000, avg_degree=5):
+    print("\n" + "="*80)
+    print(f"UNION-FIND: СЛОВАРИ С РЕКУРСИЕЙ ПРОТИВ МАССИВОВ ({n * avg_degree // 2} рёбер)")
+    print("="*80)
+
+    def closure_union_find(vertices):
+        # Прежний Union-Find из min_spanning_tree
+        parent = {v: v for v in vertices}
+        rank = {v: 0 for v in vertices}
+
+        def find(v):
+            if parent[v] != v:
+                parent[v] = find(parent[v])
+            return parent[v]
+
+        def union(u, v):
+            root_u = find(u)
+            root_v = find(v)
+            if root_u == root_v:
+                return False
+            if rank[root_u] < rank[root_v]:
+                root_u, root_v = root_v, root_u
+            parent[root_v] = root_u
+            if rank[root_u] == rank[root_v]:
+                rank[root_u] += 1
+            return True
+        return union
+
+    def closure_kruskal(graph):
+        # Прежний min_spanning_tree; число вершин вынесено из условия цикла,
+        # иначе на таком графе каждая итерация сортировала бы все вершины
+        vertices = graph.get_vertices()
+        edges = []
+        seen = set()
+        for u in vertices:
+            for v, w in graph.get_adjacent_edges(u):
+                if (u, v) not in seen and (v, u) not in seen:
+                    heapq.heappush(edges, (w, u, v))
+                    seen.add((u, v))
+        union = closure_union_find(vertices)
+        mst_edges = []
+        while edges and len(mst_edges) < len(vertices) - 1:
+            weight, u, v = heapq.heappop(edges)
+            if union(u, v):
+                mst_edges.append((u, v))
+        return mst_edges
+
+    us, vs, ws = generate_edge_arrays(n, avg_degree, seed=18)
+    order = sorted(range(len(us)), key=ws.__getitem__)
+    pairs = [(us[i], vs[i]) for i in order]
+
+    start_time = time.perf_counter()
+    union = closure_union_find(range(n))
+    for u, v in pairs:
+        union(u, v)
+    closure_uf_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    ds = DisjointSet(n)
+    for u, v in pairs:
+        ds.union(u, v)
+    union_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    DisjointSet(n).union_many(pairs)
+    union_many_time = time.perf_counter() - start_time
+
+    g = generate_connected_graph(n, avg_degree, seed=18)
+    start_time = time.perf_counter()
+    old_mst = closure_kruskal(g)
+    closure_mst_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    new_mst = min_spanning_tree(g)
+    mst_time = time.perf_counter() - start_time
+    assert to_set(old_mst) == to_set(new_mst)
+
+    print(f"{'Вариант':<40} {'Время (сек)':<12} {'Ускорение':<10}")
+    print("-"*80)
+    print(f"{'Словари + рекурсивный find':<40} {closure_uf_time:<12.3f} {1.0:<10.1f}")
+    print(f"{'DisjointSet.union':<40} {union_time:<12.3f} {closure_uf_time / union_time:<10.1f}")
+    print(f"{'DisjointSet.union_many':<40} {union_many_time:<12.3f} {closure_uf_time / union_many_time:<10.1f}")
+    print(f"{'Крускал с прежним Union-Find':<40} {closure_mst_time:<12.3f} {1.0:<10.1f}")
+    print(f"{'Крускал на DisjointSet':<40} {mst_time:<12.3f} {closure_mst_time / mst_time:<10.1f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Массивы и итеративный find убирают хеширование и вызовы функций на каждом шаге;")
+    print("  union_many выигрывает ещё и на отсутствии вызова метода на пару.")
+    print("- Во всём Крускале доля Union-Find невелика: время уходит на сбор рёбер")
+    print("  из словарей и кучу — это следующая цель оптимизации.")
+
+
+def run_sorted_kruskal_benchmark(sizes=(10000, 100000, 400000), avg_degree=5):
+    print("\n" + "="*80)
+    print("КРУСКАЛ: КУЧА КОРТЕЖЕЙ ПРОТИВ СОРТИРОВКИ МАССИВОВ")
+    print("="*80)
+
+    def heap_kruskal(graph):
+        # Прежний min_spanning_tree: куча кортежей и множество просмотренных рёбер
+        vertices = graph.get_vertices()
+        index = {v: i for i, v in enumerate(vertices)}
+        edges = []
+        seen = set()
+        for u in vertices:
+            for v, w in graph.get_adjacent_edges(u):
+                if (u, v) not in seen and (v, u) not in seen:
+                    heapq.heappush(edges, (w, u, v))
+                    seen.add((u, v))
+        components = DisjointSet(len(vertices))
+        mst_edges = []
+        while edges and components.component_count > 1:
+            weight, u, v = heapq.heappop(edges)
+            if components.union(index[u], index[v]):
+                mst_edges.append((u, v))
+        return mst_edges
+
+    def measure(func, graph):
+        start_time = time.perf_counter()
+        result = func(graph)
+        elapsed = time.perf_counter() - start_time
+        tracemalloc.start()
+        func(graph)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak
+
+    print(f"{'Вершин':<10} {'Рёбер':<10} {'Куча (сек)':<12} {'Куча (МБ)':<12} "
+          f"{'Массивы (сек)':<15} {'Массивы (МБ)':<14} {'Ускорение':<10}")
+    print("-"*80)
+    for n in sizes:
+        g = generate_connected_graph(n, avg_degree, seed=19)
+        old_mst, heap_time, heap_peak = measure(heap_kruskal, g)
+        new_mst, sorted_time, sorted_peak = measure(min_spanning_tree, g)
+        assert to_set(old_mst) == to_set(new_mst)
+        m = n * avg_degree // 2
+        print(f"{n:<10} {m:<10} {heap_time:<12.3f} {heap_peak / 2**20:<12.1f} "
+              f"{sorted_time:<15.3f} {sorted_peak / 2**20:<14.1f} {heap_time / sorted_time:<10.1f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Каждое ребро выписывается один раз без сортировки списков смежности")
+    print("  и без множества просмотренных пар; на ребро приходится 24 байта массивов")
+    print("  и элемент списка порядка вместо кортежа в куче и кортежа в множестве.")
+    print("- Одна сортировка номеров по весу дешевле E извлечений из кучи,")
+    print("  а проход обрывается после V - 1 принятых рёбер.")
+
+
+def run_density_benchmark(n=2000, degrees=(4, 16, 64, 128, 256, 512, 1024, 1800, 1999)):
+    print("\n" + "="*80)
+    print(f"MST: ВЫБОР АЛГОРИТМА ПО ПЛОТНОСТИ ({n} вершин)")
+    print("="*80)
+    print(f"{'Ср. степень':<12} {'Плотность':<10} {'Крускал':<10} {'Prim-куча':<10} "
+          f"{'Prim-O(V^2)':<12} {'auto выбрал':<12}")
+    print("-"*80)
+
+    for degree in degrees:
+        g = generate_connected_graph(n, avg_degree=degree, seed=20)
+        times = []
+        for algorithm in ('kruskal', 'prim', 'prim_array'):
+            start_time = time.perf_counter()
+            min_spanning_tree(g, algorithm)
+            times.append(time.perf_counter() - start_time)
+        stats = {}
+        min_spanning_tree(g, stats=stats)
+        density = degree / (n - 1)
+        print(f"{degree:<12} {density:<10.3f} {times[0]:<10.3f} {times[1]:<10.3f} "
+              f"{times[2]:<12.3f} {stats['algorithm']:<12}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Сортировка в Крускале выполняется в C, поэтому он лучший на разреженных")
+    print(f"  графах; Prim с кучей обгоняет его со средней степени ~{PRIM_HEAP_MIN_DEGREE},")
+    print("  когда E log E перевешивает работу кучи на V вершинах.")
+    print("- Prim за O(V^2) не зависит от числа decrease_key и выигрывает только")
+    print(f"  на почти полных графах (плотность от {PRIM_ARRAY_MIN_DENSITY}); в чистом Python")
+    print("  его преимущество перед кучей невелико.")
+
+
+def run_boruvka_benchmark(n=400000, avg_degree=5, worker_counts=(1, 2, 4, 8)):
+    print("\n" + "="*80)
+    print(f"ПАРАЛЛЕЛЬНЫЙ БОРУВКА ({n * avg_degree // 2} рёбер, ядер: {os.cpu_count()})")
+    print("="*80)
+
+    us, vs, ws = generate_edge_arrays(n, avg_degree, seed=21)
+    start_time = time.perf_counter()
+    expected = kruskal_arrays(n, us, vs, ws)
+    kruskal_time = time.perf_counter() - start_time
+    expected_weight = sum(ws[k] for k in expected)
+    print(f"Крускал по массивам: {kruskal_time:.3f} сек")
+
+    print(f"\n{'Процессов':<12} {'Время (сек)':<12} {'Ускорение к 1':<14} {'К Крускалу':<12}")
+    print("-"*80)
+    base_time = None
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        accepted = boruvka_arrays(n, us, vs, ws, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        assert len(accepted) == n - 1
+        assert abs(sum(ws[k] for k in accepted) - expected_weight) < 1e-6 * expected_weight
+        base_time = base_time or elapsed
+        print(f"{workers:<12} {elapsed:<12.3f} {base_time / elapsed:<14.2f} {kruskal_time / elapsed:<12.2f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Раундов не больше log2(V). Каждый раунд переписывает концы рёбер в номера")
+    print("  компонент и выбрасывает внутренние рёбра, так что следующий раунд смотрит")
+    print("  только рёбра между компонентами (на случайном графе со степенью 5 — около")
+    print("  60% просмотров прежней схемы: параллельные рёбра между компонентами остаются).")
+    print("- Рёбра передаются процессам один раз через общую память, каждый уплотняет")
+    print("  свой отрезок на месте, обратно идут только длина отрезка и минимумы;")
+    print("  главный процесс перенумеровывает компоненты, а не все вершины.")
+    print("- В одном процессе Борувка медленнее Крускала: сортировка в C дешевле")
+    print("  log V проходов по рёбрам в Python, так что выигрыш возможен только")
+    print("  на многоядерной машине; на одном ядре процессы дают лишь накладные расходы.")
+
+
+def run_filter_kruskal_benchmark(n=20000, degrees=(4, 8, 16, 32, 64, 128)):
+    print("\n" + "="*80)
+    print(f"FILTER-KRUSKAL ПРОТИВ КРУСКАЛА ({n} вершин)")
+    print("="*80)
+    print(f"{'Ср. степень':<12} {'Рёбер':<10} {'Крускал (сек)':<15} {'Filter (сек)':<14} {'Ускорение':<10}")
+    print("-"*80)
+
+    for degree in degrees:
+        g = generate_connected_graph(n, avg_degree=degree, seed=22)
+        vertices, us, vs, ws = edge_arrays(g)
+        start_time = time.perf_counter()
+        expected = kruskal_arrays(n, us, vs, ws)
+        kruskal_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        accepted = filter_kruskal_arrays(n, us, vs, ws)
+        filter_time = time.perf_counter() - start_time
+        assert sorted(accepted) == sorted(expected)
+        print(f"{degree:<12} {len(ws):<10} {kruskal_time:<15.3f} {filter_time:<14.3f} "
+              f"{kruskal_time / filter_time:<10.2f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Чем выше средняя степень, тем больше тяжёлых рёбер отбрасывается")
+    print("  фильтром без сортировки, и тем больше выигрыш Filter-Kruskal.")
+    print("- На разреженных графах почти все части доходят до сортировки,")
+    print("  и лишние проходы разбиения не окупаются.")
+
+
+def run_dynamic_mst_benchmark(n=100000, avg_degree=5, updates=300):
+    print("\n" + "="*80)
+    print(f"ДИНАМИЧЕСКОЕ MST ({n} вершин, {updates} изменений)")
+    print("="*80)
+
+    g = generate_connected_graph(n, avg_degree, seed=23)
+    rng = random.Random(23)
+    start_time = time.perf_counter()
+    mst = DynamicMST(g)
+    build_time = time.perf_counter() - start_time
+
+    kinds = {'вставка': ([], []), 'изменение веса': ([], []), 'удаление': ([], [])}
+    for _ in range(updates):
+        u = rng.randrange(n)
+        action = rng.random()
+        start_time = time.perf_counter()
+        if action < 0.4:
+            kind = 'вставка'
+            mst.add_edge(u, rng.randrange(n), rng.uniform(0.5, 5.0))
+        elif action < 0.7:
+            kind = 'изменение веса'
+            v = rng.choice(g.get_adjacent_vertices(u))
+            mst.add_edge(u, v, g.edge_weight(u, v) * rng.choice((0.5, 2.0)))
+        else:
+            kind = 'удаление'
+            mst.remove_edge(u, rng.choice(g.get_adjacent_vertices(u)))
+        kinds[kind][0].append(time.perf_counter() - start_time)
+        kinds[kind][1].append(mst.last_touched)
+
+    print(f"{'Изменение':<18} {'Кол-во':<8} {'мс (среднее)':<14} {'Вершин (среднее)':<18} {'Вершин (макс.)':<14}")
+    print("-"*80)
+    for kind, (times, touched) in kinds.items():
+        if times:
+            print(f"{kind:<18} {len(times):<8} {sum(times) / len(times) * 1000:<14.3f} "
+                  f"{sum(touched) / len(touched):<18.1f} {max(touched):<14}")
+    start_time = time.perf_counter()
+    expected = min_spanning_tree(g)
+    rebuild_time = time.perf_counter() - start_time
+    assert len(expected) == len(mst.edges())
+    print(f"\nПостроение с нуля: {build_time:.2f} сек, пересчёт min_spanning_tree: {rebuild_time:.2f} сек")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Вставка стоит подъёма по лесу от обоих концов ребра до встречи, то есть")
+    print("  пропорциональна длине пути между ними, а не размеру дерева.")
+    print("- Удаление ребра леса просматривает меньшую из двух частей дерева и её")
+    print("  рёбра; если ребро делит дерево пополам, это много вершин, но не весь граф.")
+    print("- Изменения рёбер вне леса, которые их не удешевляют, бесплатны.")
+
+
+def run_external_mst_benchmark(n=300000, avg_degree=4, budgets=(1 << 20, 4 << 20, 16 << 20, 64 << 20)):
+    print("\n" + "="*80)
+    print(f"MST ВО ВНЕШНЕЙ ПАМЯТИ ({n} вершин, {n * avg_degree // 2} рёбер)")
+    print("="*80)
+
+    us, vs, ws = generate_edge_arrays(n, avg_degree, seed=24)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'edges.txt')
+        with open(path, 'w') as f:
+            for u, v, w in zip(us, vs, ws):
+                f.write(f"{u} {v} {w!r}\n")
+        file_size = os.path.getsize(path)
+
+        tracemalloc.start()
+        expected = kruskal_arrays(n, us, vs, ws)
+        in_memory_peak = tracemalloc.get_traced_memory()[1] + 3 * 8 * len(ws)
+        tracemalloc.stop()
+        expected_edges = {(us[k], vs[k]) for k in expected}
+        del us, vs, ws
+        print(f"Файл: {file_size / 2**20:.1f} МБ; Крускал в памяти: пик {in_memory_peak / 2**20:.1f} МБ "
+              f"(с массивами рёбер)")
+
+        print(f"\n{'Бюджет (МБ)':<12} {'Прогонов':<10} {'Проходов':<10} {'Время (сек)':<12} "
+              f"{'Пик (МБ)':<10} {'Прогон (МБ)':<12} {'Результат':<10} {'O(V) (МБ)':<10}")
+        print("-"*90)
+        for budget in budgets:
+            timed = {}
+            mst = external_min_spanning_tree(path, memory_budget=budget, tmp_dir=workdir, stats=timed)
+            del mst[:]
+            stats = {}
+            tracemalloc.start()
+            mst = external_min_spanning_tree(path, memory_budget=budget, tmp_dir=workdir, stats=stats)
+            result_size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            assert to_set(mst) == expected_edges
+            print(f"{budget / 2**20:<12.2f} {stats['runs']:<10} {stats['merge_passes']:<10} "
+                  f"{timed['seconds']:<12.2f} {stats['peak_bytes'] / 2**20:<10.1f} "
+                  f"{stats['run_buffer_bytes'] / 2**20:<12.1f} {result_size / 2**20:<10.1f} "
+                  f"{stats['vertex_bytes'] / 2**20:<10.1f}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Пиковая память растёт с бюджетом, а не с числом рёбер: сверх бюджета")
+    print("  остаются только O(V) словарь номеров вершин (около 120 байт на вершину")
+    print("  при чтении), DisjointSet и сам результат — список кортежей, который в")
+    print("  Python заметно тяжелее массивов. Зато номера вершин могут быть любыми:")
+    print("  память зависит от числа вершин, а не от наибольшего номера.")
+    print("- Малый бюджет означает больше прогонов и проходов слияния, то есть")
+    print("  больше чтения с диска, но результат тот же.")
+
+
+def clustered_points(n: int, clusters: int = 5, spread: float = 0.01, side: float = 1000.0,
+                     seed: Optional[int] = None) -> List[Tuple[float, float]]:
+    """n точек в нескольких плотных скоплениях (нормальный разброс spread) на квадрате side x side."""
+    rng = random.Random(seed)
+    centers = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(clusters)]
+    points = []
+    for _ in range(n):
+        cx, cy = rng.choice(centers)
+        points.append((cx + rng.gauss(0, spread), cy + rng.gauss(0, spread)))
+    return points
+
+
+def run_euclidean_mst_benchmark(sizes=(10000, 100000, 1000000), complete_sizes=(500, 1000, 2000),
+                                clustered_sizes=(5000, 10000, 100000)):
+    print("\n" + "="*80)
+    print("ЕВКЛИДОВО MST: ПОЛНЫЙ ГРАФ ПРОТИВ K-D ДЕРЕВА И БОРУВКИ")
+    print("="*80)
+    rng = random.Random(25)
+
+    print(f"{'Точек':<10} {'Полный граф (сек)':<20} {'euclidean_mst (сек)':<20}")
+    print("-"*80)
+    for n in complete_sizes:
+        points = [(rng.random(), rng.random()) for _ in range(n)]
+        start_time = time.perf_counter()
+        g = Graph()
+        for i in range(n):
+            g.add_vertex(i)
+            for j in range(i):
+                g.add_edge(i, j, math.dist(points[i], points[j]))
+        min_spanning_tree(g)
+        complete_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        euclidean_mst(points)
+        tree_time = time.perf_counter() - start_time
+        print(f"{n:<10} {complete_time:<20.2f} {tree_time:<20.3f}")
+
+    print(f"\n{'Точки':<12} {'Точек':<10} {'Время (сек)':<12} {'Раундов':<10} {'Поисков по дереву':<18}")
+    print("-"*80)
+    cases = [('равномерно', n) for n in sizes] + [('скопления', n) for n in clustered_sizes]
+    for name, n in cases:
+        if name == 'равномерно':
+            points = [(rng.random(), rng.random()) for _ in range(n)]
+        else:
+            points = clustered_points(n, seed=n)
+        stats = {}
+        start_time = time.perf_counter()
+        mst = euclidean_mst(points, stats=stats)
+        elapsed = time.perf_counter() - start_time
+        assert len(mst) == n - 1
+        print(f"{name:<12} {n:<10} {elapsed:<12.2f} {stats['rounds']:<10} {stats['tree_searches']:<18}")
+
+    print("\n" + "="*80)
+    print("ВЫВОДЫ:")
+    print("- Полный граф требует O(n^2) рёбер и упирается в память и время уже")
+    print("  на нескольких тысячах точек.")
+    print("- k-d дерево даёт k ближайших соседей, обрабатывая точки по листьям; Борувка")
+    print("  берёт ближайшую чужую точку из этих списков, а поиск по дереву нужен только")
+    print("  точкам, чей k-й сосед ближе лучшего ребра их компоненты, и пропускает")
+    print("  поддеревья своей компоненты.")
+    print("- Листья делятся по числу точек, поэтому плотные скопления на большом")
+    print("  квадрате обрабатываются так же быстро, как равномерные точки (равномерная")
+    print("  сетка по габаритам складывала скопление в несколько ячеек, и 10^4 точек")
+    print("  в скоплениях считались почти две минуты вместо секунды).")
+    print("- Время растёт почти линейно: 10^6 точек обрабатываются примерно за")
+    print("  полторы минуты вместо O(n^2) рёбер полного графа.")
+
+if __name__ == "__main__":
     # Запуск всех тестов
     test_empty_graph()
     test_single_vertex()
@@ -228,7 +1966,24 @@ if __name__ == "__main__":
     test_two_edges()
     test_three_edges()
     test_many_edges()
+    test_generate_connected_graph()
+    test_disjoint_set()
+    test_edge_arrays_kruskal()
+    test_prim()
+    test_boruvka()
+    test_filter_kruskal()
+    test_dynamic_mst()
+    test_external_min_spanning_tree()
+    test_euclidean_mst()
     print("✅ Все юнит-тесты пройдены успешно!")
 
     # Запуск замеров
-    run_benchmark()
\ No newline at end of file
+    run_benchmark()
+    run_disjoint_set_benchmark()
+    run_sorted_kruskal_benchmark()
+    run_density_benchmark()
+    run_boruvka_benchmark()
+    run_filter_kruskal_benchmark()
+    run_dynamic_mst_benchmark()
+    run_external_mst_benchmark()
+    run_euclidean_mst_benchmark()
\ No newline at end of file